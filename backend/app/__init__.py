@@ -1,15 +1,20 @@
-from flask import Flask, send_from_directory
+from flask import Flask, send_from_directory, request
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 import os
 from dotenv import load_dotenv
+from app.config import Config
+from app.utils import metrics
+from app.utils.db_pool import build_engine_options, register_pool_metrics, pool_status, database_roundtrip_ms
+from app.utils.db_routing import RoutingSession, init_replica_routing, REPLICA_BIND
+from app.utils.compression import init_compression
 
 # Load .env variables
 load_dotenv()
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 
 # Create uploads directories if they don't exist
@@ -20,8 +25,9 @@ os.makedirs(SERVICES_UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(PROFILE_UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(PAYMENT_UPLOAD_FOLDER, exist_ok=True)
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
+    app.config.from_object(config_class)
     
     # Configure upload folders
     app.config['SERVICES_UPLOAD_FOLDER'] = SERVICES_UPLOAD_FOLDER
@@ -38,11 +44,26 @@ def create_app():
         print("WARNING: DATABASE_URL not set")
 
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config, database_url)
+    replica_url = app.config['DATABASE_REPLICA_URL']
+    if replica_url:
+        app.config['SQLALCHEMY_BINDS'] = {
+            REPLICA_BIND: {'url': replica_url, **build_engine_options(app.config, replica_url)}
+        }
+    # Set RATELIMIT_ENABLED=false only for local load testing
+    app.config['RATELIMIT_ENABLED'] = os.getenv('RATELIMIT_ENABLED', 'true').lower() != 'false'
 
     # Init extensions
     CORS(app, resources={r"/api/*": {"origins": ["http://localhost:3000", "http://127.0.0.1:3000"]}}, supports_credentials=True)
     db.init_app(app)
     migrate.init_app(app, db)
+    init_replica_routing(app)
+    init_compression(app)
+    
+    if database_url:
+        with app.app_context():
+            for engine in db.engines.values():
+                register_pool_metrics(engine)
     
     # Add security headers
     @app.after_request
@@ -58,7 +79,7 @@ def create_app():
         return response
 
     # Import models (for Flask-Migrate)
-    from app.models import User, Service, Appointment, WorkingHour
+    from app.models import User, Service, Appointment, WorkingHour, WorkingHourOverride, SlotGrid, SlotGridDay, IdempotencyKey
 
 
     # Import and register blueprints
@@ -66,11 +87,25 @@ def create_app():
     from app.routes.services import services_bp
     from app.routes.appointments import appointments_bp
     from app.routes.working_hours import working_bp
+    from app.routes.analytics import analytics_bp
+    from app.routes.customers import customers_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(services_bp)
     app.register_blueprint(appointments_bp)
     app.register_blueprint(working_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(customers_bp)
+
+    # Keep the slot grid, dashboard counts and rollups in step with writes, and register CLI commands
+    from app.services.slot_grid_service import init_slot_grid
+    from app.services.dashboard_service import init_dashboard_counters
+    from app.services.rollup_service import init_rollups
+    from app.commands import register_commands
+    init_slot_grid(RoutingSession)
+    init_dashboard_counters(RoutingSession)
+    init_rollups(RoutingSession)
+    register_commands(app)
 
     # Serve uploaded images
     @app.route('/uploads/services/<filename>')
@@ -92,6 +127,21 @@ def create_app():
 
     @app.route('/api/health')
     def health():
-        return {'status': 'healthy', 'database_configured': bool(database_url)}
+        result = {'status': 'healthy', 'database_configured': bool(database_url)}
+        
+        # Pool state and DB round-trip time (opt-in: HEALTH_DETAILS=true and ?details=1)
+        if app.config['HEALTH_DETAILS'] and request.args.get('details') and database_url:
+            roundtrip = database_roundtrip_ms(db.engine)
+            result['database'] = {
+                'reachable': roundtrip is not None,
+                'roundtrip_ms': roundtrip,
+                'pool': pool_status(db.engine)
+            }
+            result['metrics'] = metrics.snapshot()
+            if roundtrip is None:
+                result['status'] = 'degraded'
+                return result, 503
+        
+        return result
 
     return app
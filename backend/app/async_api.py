@@ -0,0 +1,264 @@
+"""
+Async Public API
+ASGI app serving the public read endpoints with async SQLAlchemy sessions
+
+One process can hold thousands of concurrent slot lookups because a request
+waiting on the database no longer ties up a worker. It shares the models and
+slot computation with the Flask app and returns the same JSON.
+
+Served by uvicorn (see asgi.py); route only these paths to it:
+    GET /api/services/
+    GET /api/services/<id>
+    GET /api/working-hours/
+    GET /api/appointments/available-slots?date=YYYY-MM-DD&service_id=N
+    GET /api/appointments/reference/<reference_number>
+"""
+import json
+import os
+import re
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from sqlalchemy import select, case
+
+from app.config import Config
+from app.models import Appointment, AppointmentArchive, Service, WorkingHour, WorkingHourOverride
+from app.services.appointment_service import find_free_slots
+from app.services.calendar_service import resolve_open_interval
+
+# Optional async stack (pip install -r requirements-async.txt)
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    ASYNC_AVAILABLE = True
+except ImportError:
+    ASYNC_AVAILABLE = False
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def async_database_url(database_url):
+    """Switch a sync DATABASE_URL to its async driver (asyncpg / aiosqlite)"""
+    if database_url.startswith('postgres://'):
+        database_url = 'postgresql://' + database_url[len('postgres://'):]
+    database_url = re.sub(r'^postgresql(\+\w+)?://', 'postgresql+asyncpg://', database_url)
+    database_url = re.sub(r'^sqlite(\+\w+)?://', 'sqlite+aiosqlite://', database_url)
+    return database_url
+
+
+def service_to_dict(s):
+    return {
+        'id': s.id,
+        'name': s.name,
+        'description': s.description,
+        'category': s.category,
+        'image_url': s.image_url,
+        'duration_minutes': s.duration_minutes,
+        'price': float(s.price)
+    }
+
+
+def working_hour_to_dict(h):
+    return {
+        'id': h.id,
+        'day_of_week': h.day_of_week,
+        'open_time': str(h.open_time),
+        'close_time': str(h.close_time),
+        'is_closed': h.is_closed
+    }
+
+
+class AsyncPublicAPI:
+    """Minimal ASGI application; each handler returns (status, payload)"""
+
+    def __init__(self, database_url, config=Config):
+        if not ASYNC_AVAILABLE:
+            raise RuntimeError('Async SQLAlchemy is not available. Run: pip install -r requirements-async.txt')
+
+        url = async_database_url(database_url)
+        engine_options = {}
+        if not url.startswith('sqlite'):
+            engine_options = {
+                'pool_size': config.DB_POOL_SIZE,
+                'max_overflow': config.DB_MAX_OVERFLOW,
+                'pool_timeout': config.DB_POOL_TIMEOUT,
+                'pool_recycle': config.DB_POOL_RECYCLE,
+                'pool_pre_ping': config.DB_POOL_PRE_PING
+            }
+        self.engine = create_async_engine(url, **engine_options)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.slot_step = config.SLOT_GRANULARITY_MINUTES
+        self.routes = [
+            (re.compile(r'^/api/services/?$'), self.list_services),
+            (re.compile(r'^/api/services/(?P<id>\d+)$'), self.get_service),
+            (re.compile(r'^/api/working-hours/?$'), self.list_hours),
+            (re.compile(r'^/api/appointments/available-slots$'), self.available_slots),
+            (re.compile(r'^/api/appointments/reference/(?P<reference_number>[^/]+)$'), self.reference_lookup),
+            (re.compile(r'^/api/health$'), self.health)
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        status, payload = 404, {'error': 'Not found'}
+        if scope['method'] in ('GET', 'HEAD'):
+            query = {k: v[0] for k, v in parse_qs(scope.get('query_string', b'').decode()).items()}
+            for pattern, handler in self.routes:
+                match = pattern.match(scope['path'])
+                if match:
+                    status, payload = await handler(query, **match.groupdict())
+                    break
+        else:
+            status, payload = 405, {'error': 'Method not allowed'}
+
+        body = json.dumps(payload).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'x-content-type-options', b'nosniff')
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body if scope['method'] == 'GET' else b''})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # ---- handlers (same responses as the Flask blueprints) ----
+
+    async def health(self, query):
+        return 200, {'status': 'healthy', 'mode': 'async'}
+
+    async def list_services(self, query):
+        async with self.sessions() as session:
+            result = await session.execute(
+                select(Service.__table__).where(Service.is_active.is_(True))
+            )
+            return 200, [service_to_dict(s) for s in result]
+
+    async def get_service(self, query, id):
+        async with self.sessions() as session:
+            service = (await session.execute(
+                select(Service.__table__).where(Service.id == int(id))
+            )).first()
+        if not service:
+            return 404, {'error': 'Not found'}
+        if not service.is_active:
+            return 404, {'error': 'Service not available'}
+        return 200, dict(service_to_dict(service), is_active=service.is_active)
+
+    async def list_hours(self, query):
+        order = case(*[(WorkingHour.day_of_week == day, i + 1) for i, day in enumerate(DAY_ORDER)], else_=8)
+        async with self.sessions() as session:
+            result = await session.execute(select(WorkingHour.__table__).order_by(order))
+            return 200, [working_hour_to_dict(h) for h in result]
+
+    async def available_slots(self, query):
+        date_str = query.get('date')
+        service_id = query.get('service_id')
+        if not date_str:
+            return 400, {'error': 'Date parameter is required (YYYY-MM-DD)'}
+        if not service_id or not service_id.isdigit():
+            return 400, {'error': 'service_id parameter is required'}
+        try:
+            date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except ValueError:
+            return 400, {'error': 'Invalid date format. Use YYYY-MM-DD'}
+        service_id = int(service_id)
+
+        slots = []
+        async with self.sessions() as session:
+            service = (await session.execute(
+                select(Service.duration_minutes).where(Service.id == service_id)
+            )).first()
+            working_hour = (await session.execute(
+                select(WorkingHour.open_time, WorkingHour.close_time, WorkingHour.is_closed)
+                .where(WorkingHour.day_of_week == date_obj.strftime('%A'))
+            )).first()
+            override = (await session.execute(
+                select(WorkingHourOverride.open_time, WorkingHourOverride.close_time,
+                       WorkingHourOverride.is_closed, WorkingHourOverride.reason)
+                .where(WorkingHourOverride.date == date_obj)
+            )).first()
+            open_time, close_time, reason = resolve_open_interval(date_obj, working_hour, override)
+            if service and not reason:
+                booked = (await session.execute(
+                    select(Appointment.appointment_time).where(
+                        Appointment.appointment_date == date_obj,
+                        Appointment.service_id == service_id,
+                        Appointment.status != 'cancelled'
+                    )
+                )).scalars().all()
+                slots = find_free_slots(
+                    date_obj,
+                    open_time,
+                    close_time,
+                    service.duration_minutes,
+                    [(start, service.duration_minutes) for start in booked],
+                    step_minutes=self.slot_step
+                )
+
+        return 200, {'date': str(date_obj), 'service_id': service_id, 'available_slots': slots}
+
+    async def reference_lookup(self, query, reference_number):
+        row = None
+        async with self.sessions() as session:
+            # Old completed and cancelled appointments live in the archive
+            for table in (Appointment.__table__, AppointmentArchive.__table__):
+                row = (await session.execute(
+                    select(
+                        table,
+                        Service.name.label('service_name'),
+                        Service.duration_minutes.label('service_duration'),
+                        Service.price.label('service_price')
+                    )
+                    .join(Service, Service.id == table.c.service_id)
+                    .where(table.c.reference_number == reference_number)
+                )).first()
+                if row:
+                    break
+        if not row:
+            return 404, {'error': 'Not found'}
+
+        required_deposit = float(row.service_price) * 0.10
+        return 200, {
+            'id': row.id,
+            'reference_number': row.reference_number,
+            'customer_name': row.customer_name,
+            'customer_phone': row.customer_phone,
+            'customer_email': row.customer_email,
+            'service_id': row.service_id,
+            'service_name': row.service_name,
+            'service_duration': row.service_duration,
+            'service_price': float(row.service_price),
+            'required_deposit': round(required_deposit, 2),
+            'appointment_date': str(row.appointment_date),
+            'appointment_time': str(row.appointment_time),
+            'status': row.status,
+            'payment_screenshot_url': row.payment_screenshot_url,
+            'payment_amount': float(row.payment_amount) if row.payment_amount else None,
+            'payment_verification_status': row.payment_verification_status,
+            'payment_verification_notes': row.payment_verification_notes,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'archived': 'archived_at' in row._fields
+        }
+
+
+def create_asgi_app(database_url=None):
+    """Build the async public API from DATABASE_URL"""
+    database_url = database_url or os.getenv('DATABASE_URL')
+    if not database_url:
+        raise RuntimeError('DATABASE_URL not set')
+    return AsyncPublicAPI(database_url)
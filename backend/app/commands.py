@@ -0,0 +1,119 @@
+"""
+CLI Commands
+Maintenance commands registered on the Flask CLI (flask <group> <command>)
+"""
+import click
+from flask.cli import AppGroup
+from app import db
+
+slot_grid_cli = AppGroup('slot-grid', help='Materialized availability grid')
+
+
+@slot_grid_cli.command('rebuild')
+def slot_grid_rebuild():
+    """Rebuild the grid for the whole horizon (run daily to roll it forward)"""
+    from app.services.slot_grid_service import rebuild, horizon
+    rows = rebuild(db.session.connection())
+    db.session.commit()
+    first, last = horizon()
+    click.echo(f'Slot grid rebuilt: {rows} slots from {first} to {last}')
+
+
+@slot_grid_cli.command('verify')
+def slot_grid_verify():
+    """Diff the grid against live computation (exit code 1 on any mismatch)"""
+    from app.services.slot_grid_service import verify
+    mismatches = verify()
+    for service_id, day, grid, live in mismatches:
+        if grid is None:
+            click.echo(f'service {service_id} {day}: not materialized')
+        else:
+            click.echo(f'service {service_id} {day}: grid-only {sorted(set(grid) - set(live))} '
+                       f'live-only {sorted(set(live) - set(grid))}')
+    if mismatches:
+        raise SystemExit(1)
+    click.echo('Slot grid matches live availability')
+
+
+idempotency_cli = AppGroup('idempotency', help='Stored Idempotency-Key responses')
+
+
+@idempotency_cli.command('purge')
+def idempotency_purge():
+    """Delete stored responses whose TTL has passed"""
+    from datetime import datetime
+    from app.models import IdempotencyKey
+    deleted = IdempotencyKey.query.filter(IdempotencyKey.expires_at < datetime.utcnow()).delete()
+    db.session.commit()
+    click.echo(f'Deleted {deleted} expired idempotency keys')
+
+
+dashboard_cli = AppGroup('dashboard', help='Dashboard summary counters')
+
+
+@dashboard_cli.command('recount')
+def dashboard_recount():
+    """Recompute the per-status appointment counts (after bulk loads)"""
+    from app.services.dashboard_service import recount
+    counts = recount(db.session.connection())
+    db.session.commit()
+    click.echo('Status counts: ' + ', '.join(f'{status}={count}' for status, count in sorted(counts.items())))
+
+
+rollups_cli = AppGroup('rollups', help='Daily revenue and utilization rollups')
+
+
+@rollups_cli.command('backfill')
+@click.option('--from', 'first', type=click.DateTime(['%Y-%m-%d']), help='First appointment date (default: all)')
+@click.option('--to', 'last', type=click.DateTime(['%Y-%m-%d']), help='Last appointment date (default: all)')
+def rollups_backfill(first, last):
+    """Recompute the daily rollups from the appointments table"""
+    from app.services.rollup_service import backfill
+    rows = backfill(db.session.connection(),
+                    first.date() if first else None,
+                    last.date() if last else None)
+    db.session.commit()
+    click.echo(f'Rollups rebuilt: {rows} service-days')
+
+
+archive_cli = AppGroup('archive', help='Cold storage for old appointments')
+
+
+@archive_cli.command('run')
+@click.option('--before', type=click.DateTime(['%Y-%m-%d']),
+              help='Archive appointments before this date (default: ARCHIVE_AFTER_DAYS ago)')
+@click.option('--batch-size', type=int, help='Rows per transaction (default: ARCHIVE_BATCH_SIZE)')
+@click.option('--max-batches', type=int, help='Stop after this many batches (default: until done)')
+def archive_run(before, batch_size, max_batches):
+    """Move old completed and cancelled appointments to appointments_archive"""
+    from datetime import date
+    from flask import current_app
+    from app.services.archive_service import default_cutoff, run_archive
+    cutoff = before.date() if before else default_cutoff()
+    if cutoff > date.today():
+        raise click.BadParameter('must not be in the future', param_hint='--before')
+    moved = run_archive(cutoff, batch_size or current_app.config['ARCHIVE_BATCH_SIZE'], max_batches)
+    click.echo(f'Archived {moved} appointments before {cutoff}')
+
+
+customers_cli = AppGroup('customers', help='Customer records behind appointments')
+
+
+@customers_cli.command('backfill')
+def customers_backfill():
+    """Link appointments without a customer or client account (after bulk loads)"""
+    from app.services.customer_service import backfill, link_user_appointments
+    customers, linked = backfill(db.session.connection())
+    owned = link_user_appointments(db.session.connection())
+    db.session.commit()
+    click.echo(f'Customers: {customers} created or refreshed, {linked} appointments linked')
+    click.echo(f'Client accounts: {owned} appointments linked by email')
+
+
+def register_commands(app):
+    app.cli.add_command(slot_grid_cli)
+    app.cli.add_command(idempotency_cli)
+    app.cli.add_command(dashboard_cli)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(customers_cli)
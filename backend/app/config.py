@@ -7,6 +7,16 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def env_bool(name, default=False):
+    """Read a true/false environment variable"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -19,6 +29,62 @@ class Config:
     # JWT Configuration (if you use JWT)
     JWT_SECRET_KEY = os.getenv('SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = 86400  # 24 hours
+    
+    # Database connection pool (PostgreSQL; SQLite keeps SQLAlchemy defaults)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # seconds before a connection is replaced
+    DB_POOL_PRE_PING = env_bool('DB_POOL_PRE_PING', True)
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '0'))  # 0 = no limit
+    DB_PGBOUNCER = env_bool('DB_PGBOUNCER', False)  # PgBouncer does the pooling (NullPool here)
+    
+    # Optional read replica for read-only GET endpoints
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL') or None
+    DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', '10'))  # read own writes from primary
+    
+    # Shared folder for cache version stamps (must be the same for all workers)
+    CACHE_STAMP_FOLDER = os.getenv('CACHE_STAMP_FOLDER', os.path.join(BASE_DIR, 'instance', 'stamps'))
+    
+    # Allow /api/health?details=1 to report pool state and DB round-trip time
+    HEALTH_DETAILS = env_bool('HEALTH_DETAILS', False)
+    
+    # Response compression (gzip, plus brotli when the brotli package is installed)
+    COMPRESSION_ENABLED = env_bool('COMPRESSION_ENABLED', True)
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))  # bytes; smaller bodies go out as-is
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', '6'))  # gzip level for per-request compression
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))  # brotli quality per request
+    
+    # Identical concurrent slot lookups share one computation
+    SINGLE_FLIGHT_ENABLED = env_bool('SINGLE_FLIGHT_ENABLED', True)
+    SINGLE_FLIGHT_SHARED = env_bool('SINGLE_FLIGHT_SHARED', False)  # also across workers (lock files)
+    SINGLE_FLIGHT_FOLDER = os.getenv('SINGLE_FLIGHT_FOLDER', os.path.join(BASE_DIR, 'instance', 'single_flight'))
+    SINGLE_FLIGHT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_TIMEOUT', '5'))  # seconds to wait for another worker
+    SINGLE_FLIGHT_LOCK_FILES = int(os.getenv('SINGLE_FLIGHT_LOCK_FILES', '64'))  # fixed pool keys are hashed onto
+    
+    # Spacing of bookable start times (rebuild the slot grid after changing it)
+    SLOT_GRANULARITY_MINUTES = int(os.getenv('SLOT_GRANULARITY_MINUTES', '15'))
+    AVAILABILITY_MAX_DAYS = int(os.getenv('AVAILABILITY_MAX_DAYS', '90'))  # longest range per availability query
+    NEXT_AVAILABLE_MAX_DAYS = int(os.getenv('NEXT_AVAILABLE_MAX_DAYS', '60'))  # how far next-available searches
+    
+    # Idempotency-Key support for booking and payment upload
+    IDEMPOTENCY_TTL_HOURS = int(os.getenv('IDEMPOTENCY_TTL_HOURS', '24'))  # how long responses are replayed
+    IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '60'))  # then an unfinished request may be retried
+    
+    # Materialized slot grid (run `flask slot-grid rebuild` after enabling, then daily)
+    SLOT_GRID_ENABLED = env_bool('SLOT_GRID_ENABLED', False)
+    SLOT_GRID_HORIZON_DAYS = int(os.getenv('SLOT_GRID_HORIZON_DAYS', '60'))
+    
+    # Appointment reference numbers (never change the secret while references are in use)
+    REFERENCE_NUMBER_SECRET = os.getenv('REFERENCE_NUMBER_SECRET') or SECRET_KEY
+    REFERENCE_BLOCK_SIZE = int(os.getenv('REFERENCE_BLOCK_SIZE', '50'))  # counter values reserved per round trip
+    
+    # Longest date range per /api/analytics request
+    ANALYTICS_MAX_DAYS = int(os.getenv('ANALYTICS_MAX_DAYS', '400'))
+    
+    # `flask archive run`: completed/cancelled appointments older than this move to appointments_archive
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '180'))
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '1000'))  # rows moved per transaction
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -6,6 +6,15 @@ from .user import User
 from .service import Service
 from .appointment import Appointment
 from .working_hour import WorkingHour
+from .working_hour_override import WorkingHourOverride
+from .slot_grid import SlotGrid, SlotGridDay
+from .idempotency_key import IdempotencyKey
+from .reference_counter import ReferenceCounter
+from .appointment_status_count import AppointmentStatusCount
+from .daily_service_rollup import DailyServiceRollup
+from .appointment_archive import AppointmentArchive
+from .customer import Customer
 
-__all__ = ['User', 'Service', 'Appointment', 'WorkingHour']
+__all__ = ['User', 'Service', 'Appointment', 'WorkingHour', 'WorkingHourOverride', 'SlotGrid', 'SlotGridDay', 'IdempotencyKey', 'ReferenceCounter', 'AppointmentStatusCount',
+           'DailyServiceRollup', 'AppointmentArchive', 'Customer']
 
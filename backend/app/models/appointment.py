@@ -4,23 +4,33 @@ Central table - all bookings
 """
 from app import db
 from datetime import datetime
-import secrets
 
 
 class Appointment(db.Model):
     __tablename__ = 'appointments'
-    __table_args__ = {'extend_existing': True} 
+    __table_args__ = (
+        # LIKE 'APT-2024%' prefix search (typeahead); SQLite uses GLOB on the unique index
+        db.Index('ix_appointments_reference_number_pattern', 'reference_number',
+                 postgresql_ops={'reference_number': 'varchar_pattern_ops'}).ddl_if(dialect='postgresql'),
+        {'extend_existing': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     customer_name = db.Column(db.String(100), nullable=False)
     customer_phone = db.Column(db.String(20), nullable=False)
     customer_email = db.Column(db.String(120), nullable=True)  # Optional email for notifications
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=True, index=True)  # by normalized phone
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)  # client account that owns it
     service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
-    appointment_date = db.Column(db.Date, nullable=False)
+    appointment_date = db.Column(db.Date, nullable=False, index=True)
     appointment_time = db.Column(db.Time, nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending, confirmed, completed, cancelled
+    # pending, confirmed, completed, cancelled (old value kept on change for the dashboard counters)
+    status = db.column_property(db.Column(db.String(20), default='pending'), active_history=True)
     created_by = db.Column(db.String(20), nullable=False)  # admin, receptionist, customer, ai
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Service terms when booked (set on flush by rollup_service); later list-price changes don't touch them
+    charged_price = db.Column(db.Numeric(10, 2), nullable=True)  # NULL: rows bulk-loaded without it use the list price
+    booked_minutes = db.Column(db.Integer, nullable=True)
     
     # Payment fields
     reference_number = db.Column(db.String(20), unique=True, nullable=True)  # For clients to track without login
@@ -34,10 +44,9 @@ class Appointment(db.Model):
     def generate_reference_number(self):
         """Generate a unique reference number for the appointment"""
         if not self.reference_number:
-            # Format: APT-YYYYMMDD-XXXX (e.g., APT-20240115-A3B2)
-            date_str = datetime.utcnow().strftime('%Y%m%d')
-            random_str = secrets.token_hex(2).upper()
-            self.reference_number = f"APT-{date_str}-{random_str}"
+            # Format: APT-YYYYMMDD-XXXXC (e.g., APT-20240115-7KQ2M), from a per-day counter
+            from app.services.reference_service import next_reference
+            self.reference_number = next_reference()
         return self.reference_number
     
     def __repr__(self):
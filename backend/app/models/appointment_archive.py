@@ -0,0 +1,46 @@
+"""
+Appointment Archive Model
+Old completed and cancelled appointments moved out of the hot appointments table
+"""
+from app import db
+from datetime import datetime
+
+
+class AppointmentArchive(db.Model):
+    __tablename__ = 'appointments_archive'
+    # Monthly partitions on PostgreSQL (created by `flask archive run`), a plain table elsewhere
+    __table_args__ = (
+        # LIKE 'APT-2024%' prefix search (typeahead); SQLite uses GLOB on the reference_number index
+        db.Index('ix_appointments_archive_reference_number_pattern', 'reference_number',
+                 postgresql_ops={'reference_number': 'varchar_pattern_ops'}).ddl_if(dialect='postgresql'),
+        {'extend_existing': True, 'postgresql_partition_by': 'RANGE (appointment_date)'}
+    )
+    
+    # Same columns as appointments; the partition key has to be part of the primary key
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    appointment_date = db.Column(db.Date, primary_key=True, index=True)
+    customer_name = db.Column(db.String(100), nullable=False)
+    customer_phone = db.Column(db.String(20), nullable=False)
+    customer_email = db.Column(db.String(120), nullable=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=True, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
+    appointment_time = db.Column(db.Time, nullable=False)
+    status = db.Column(db.String(20))
+    created_by = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime)
+    charged_price = db.Column(db.Numeric(10, 2), nullable=True)
+    booked_minutes = db.Column(db.Integer, nullable=True)
+    reference_number = db.Column(db.String(20), nullable=True, index=True)  # unique across both tables (per-day counter)
+    payment_screenshot_url = db.Column(db.String(255), nullable=True)
+    payment_amount = db.Column(db.Numeric(10, 2), nullable=True)
+    payment_verification_status = db.Column(db.String(20))
+    payment_verified_at = db.Column(db.DateTime, nullable=True)
+    payment_verified_by = db.Column(db.String(50), nullable=True)
+    payment_verification_notes = db.Column(db.Text, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    service = db.relationship('Service', lazy=True)
+    
+    def __repr__(self):
+        return f'<AppointmentArchive {self.customer_name} - {self.appointment_date} {self.appointment_time}>'
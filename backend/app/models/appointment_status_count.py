@@ -0,0 +1,20 @@
+"""
+Appointment Status Count Model
+All-time number of appointments per status, for the dashboards
+
+Each status is split over several bucket rows so concurrent bookings update
+different rows; the total for a status is the sum of its buckets.
+"""
+from app import db
+
+
+class AppointmentStatusCount(db.Model):
+    __tablename__ = 'appointment_status_counts'
+    __table_args__ = {'extend_existing': True}
+    
+    status = db.Column(db.String(20), primary_key=True)
+    bucket = db.Column(db.SmallInteger, primary_key=True, default=0)
+    count = db.Column(db.BigInteger, nullable=False, default=0)  # may be negative in one bucket
+    
+    def __repr__(self):
+        return f'<AppointmentStatusCount {self.status}[{self.bucket}]={self.count}>'
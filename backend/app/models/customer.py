@@ -0,0 +1,41 @@
+"""
+Customer Model
+One row per customer, keyed by normalized phone number, linked from appointments
+"""
+from app import db
+from datetime import datetime
+from sqlalchemy import DDL, event
+
+
+class Customer(db.Model):
+    __tablename__ = 'customers'
+    __table_args__ = (
+        # Typeahead search (see search_service): trigram name matching and LIKE '0911%' phone prefixes.
+        # SQLite has neither; it uses an in-process name index and GLOB on the unique index.
+        db.Index('ix_customers_name_trgm', db.func.lower(db.column('name')).label('lower_name'),
+                 postgresql_using='gin', postgresql_ops={'lower_name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_customers_phone_normalized_pattern', 'phone_normalized',
+                 postgresql_ops={'phone_normalized': 'varchar_pattern_ops'}).ddl_if(dialect='postgresql'),
+        {'extend_existing': True}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    phone_normalized = db.Column(db.String(20), unique=True, nullable=False)  # E.164 digits without '+', see normalize_phone
+    phone = db.Column(db.String(20), nullable=False)  # as last entered
+    name = db.Column(db.String(100), nullable=False)  # name on the latest booking
+    email = db.Column(db.String(120), nullable=True, index=True)  # latest email given (not unique: shared inboxes)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # search index refreshes from here
+    
+    # Relationship: One customer can have many appointments
+    appointments = db.relationship('Appointment', backref='customer', lazy=True)
+    
+    def __repr__(self):
+        return f'<Customer {self.name} - {self.phone_normalized}>'
+
+
+# gin_trgm_ops needs the pg_trgm extension before the table's indexes are created
+event.listen(
+    Customer.__table__, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
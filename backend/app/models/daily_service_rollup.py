@@ -0,0 +1,23 @@
+"""
+Daily Service Rollup Model
+Per service and day business totals, kept up to date on every appointment write
+"""
+from app import db
+
+
+class DailyServiceRollup(db.Model):
+    __tablename__ = 'daily_service_rollups'
+    __table_args__ = {'extend_existing': True}
+    
+    # Primary key order matches the reads: a date range, all services
+    date = db.Column(db.Date, primary_key=True)  # appointment date
+    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), primary_key=True)
+    bookings = db.Column(db.Integer, nullable=False, default=0)  # appointments that day, any status
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    cancelled = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)  # service price of completed appointments
+    deposits_verified = db.Column(db.Numeric(12, 2), nullable=False, default=0)  # verified payment amounts
+    minutes_booked = db.Column(db.Integer, nullable=False, default=0)  # duration of appointments not cancelled
+    
+    def __repr__(self):
+        return f'<DailyServiceRollup {self.date} service={self.service_id} bookings={self.bookings}>'
@@ -0,0 +1,26 @@
+"""
+Idempotency Key Model
+Stored responses of POST requests sent with an Idempotency-Key header
+"""
+from datetime import datetime
+from app import db
+
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'key', name='uq_idempotency_keys_scope_key'),
+        {'extend_existing': True}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(255), nullable=False)
+    scope = db.Column(db.String(255), nullable=False)  # e.g. "POST /api/appointments/ user:42" or "... anonymous"
+    request_hash = db.Column(db.String(64), nullable=False)  # same key with a different payload is rejected
+    status_code = db.Column(db.Integer, nullable=True)  # NULL while the first request is still running
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.scope} {self.key} {self.status_code or "in progress"}>'
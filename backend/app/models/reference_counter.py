@@ -0,0 +1,16 @@
+"""
+Reference Counter Model
+Per-day counters behind appointment reference numbers
+"""
+from app import db
+
+
+class ReferenceCounter(db.Model):
+    __tablename__ = 'reference_counters'
+    __table_args__ = {'extend_existing': True}
+    
+    scope = db.Column(db.String(20), primary_key=True)  # e.g. "APT-20260115"
+    next_value = db.Column(db.BigInteger, nullable=False)  # first value not handed out yet
+    
+    def __repr__(self):
+        return f'<ReferenceCounter {self.scope} {self.next_value}>'
@@ -0,0 +1,33 @@
+"""
+Slot Grid Models
+Materialized availability: one row per candidate start time per service and day
+"""
+from datetime import datetime
+from app import db
+
+
+class SlotGrid(db.Model):
+    __tablename__ = 'slot_grid'
+    __table_args__ = {'extend_existing': True}
+    
+    # Primary key order matches the lookup: one service, one day, slots in order
+    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    slot_time = db.Column(db.Time, primary_key=True)
+    is_free = db.Column(db.Boolean, nullable=False, default=True)
+    
+    def __repr__(self):
+        return f'<SlotGrid {self.service_id} {self.date} {self.slot_time} {"free" if self.is_free else "booked"}>'
+
+
+class SlotGridDay(db.Model):
+    """Marks (service, date) pairs that are materialized, so a closed day reads as 'no slots'"""
+    __tablename__ = 'slot_grid_days'
+    __table_args__ = {'extend_existing': True}
+    
+    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    built_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<SlotGridDay {self.service_id} {self.date}>'
@@ -0,0 +1,22 @@
+"""
+Working Hour Override Model
+Date-specific exceptions to the weekly hours (holidays, one-off closures, special hours)
+"""
+from app import db
+
+
+class WorkingHourOverride(db.Model):
+    __tablename__ = 'working_hour_overrides'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False, unique=True, index=True)
+    open_time = db.Column(db.Time, nullable=True)  # Not needed when closed
+    close_time = db.Column(db.Time, nullable=True)
+    is_closed = db.Column(db.Boolean, default=True, nullable=False)  # True for holidays/closures
+    reason = db.Column(db.String(200), nullable=True)  # e.g. "Christmas", "Staff training"
+    
+    def __repr__(self):
+        if self.is_closed:
+            return f'<WorkingHourOverride {self.date} - CLOSED>'
+        return f'<WorkingHourOverride {self.date} - {self.open_time} to {self.close_time}>'
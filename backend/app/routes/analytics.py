@@ -0,0 +1,86 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.services.rollup_service import daily_report, service_report, rollup_rows, totals
+from app.services.heatmap_service import utilization_heatmaps, NUMPY_AVAILABLE
+from app.utils.decorators import manager_or_admin_required
+from app.utils.db_routing import read_only
+from datetime import datetime, timedelta
+
+analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
+
+
+def parse_range():
+    """
+    Read ?from=YYYY-MM-DD&to=YYYY-MM-DD (default: the 30 days up to today)
+
+    Returns:
+        tuple: (first, last, error message or None)
+    """
+    try:
+        last = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else datetime.now().date()
+        first = (datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from')
+                 else last - timedelta(days=29))
+    except ValueError:
+        return None, None, 'Invalid date format. Use YYYY-MM-DD'
+    if first > last:
+        return None, None, '"from" must not be after "to"'
+    max_days = current_app.config['ANALYTICS_MAX_DAYS']
+    if (last - first).days + 1 > max_days:
+        return None, None, f'Date range is limited to {max_days} days'
+    return first, last, None
+
+# Totals for a date range (manager/admin only)
+@analytics_bp.route('/summary', methods=['GET'])
+@manager_or_admin_required
+@read_only
+def get_summary(current_user):
+    first, last, error = parse_range()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    return jsonify(dict(totals(rollup_rows(first, last)), **{'from': str(first), 'to': str(last)}))
+
+# Totals and utilization per day (manager/admin only)
+@analytics_bp.route('/daily', methods=['GET'])
+@manager_or_admin_required
+@read_only
+def get_daily(current_user):
+    first, last, error = parse_range()
+    if error:
+        return jsonify({'error': error}), 400
+    service_id = request.args.get('service_id', type=int)
+    
+    return jsonify({
+        'from': str(first),
+        'to': str(last),
+        'service_id': service_id,
+        'days': daily_report(first, last, service_id)
+    })
+
+# Totals and utilization per service (manager/admin only)
+@analytics_bp.route('/services', methods=['GET'])
+@manager_or_admin_required
+@read_only
+def get_services(current_user):
+    first, last, error = parse_range()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    return jsonify({
+        'from': str(first),
+        'to': str(last),
+        'services': service_report(first, last)
+    })
+
+# Utilization heatmaps: weekday × hour and service × month (manager/admin only)
+@analytics_bp.route('/heatmap', methods=['GET'])
+@manager_or_admin_required
+@read_only
+def get_heatmap(current_user):
+    if not NUMPY_AVAILABLE:
+        return jsonify({'error': 'Heatmaps need NumPy on the server (pip install numpy)'}), 501
+    first, last, error = parse_range()
+    if error:
+        return jsonify({'error': error}), 400
+    service_id = request.args.get('service_id', type=int)
+    
+    return jsonify(utilization_heatmaps(first, last, service_id, as_json=request.args.get('format') == 'json'))
@@ -1,25 +1,38 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, abort, Response, stream_with_context
 from app import db
-from app.models import Appointment, Service
+from app.models import Appointment, AppointmentArchive, Service
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from app.utils.decorators import receptionist_or_admin_required, manager_or_admin_required, staff_required, token_required
+from app.utils.decorators import receptionist_or_admin_required, manager_or_admin_required, staff_required, token_required, optional_user
 from app.utils.validators import validate_appointment_data
 from app.utils.security import sanitize_input, validate_file_type, generate_secure_filename, is_safe_path
 from app.utils.rate_limiter import rate_limit
+from app.utils.db_routing import read_only
+from app.utils.idempotency import idempotent
 from app.services.appointment_service import (
     can_book_appointment, 
     check_appointment_conflict,
     get_available_time_slots
 )
+from app.services.catalog_service import resolve_service
+from app.services.slot_grid_service import read_slot_grid
+from app.services.availability_engine import compute_availability, find_next_available
+from app.services.dashboard_service import dashboard_summary, STATUSES
+from app.services.export_service import export_query, csv_chunks, ndjson_chunks
+from app.services.archive_service import find_by_reference
+from app.services.customer_service import link_customer
+from app.services.search_service import search_appointments
 import os
 import secrets
 
 appointments_bp = Blueprint('appointments', __name__, url_prefix='/api/appointments')
 
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
 # Create an appointment (public - customers can book without login)
 @appointments_bp.route('/', methods=['POST'])
 @rate_limit(max_requests=10, window_seconds=60)  # 10 appointments per minute per IP
+@idempotent
 def create_appointment():
     # Handle both JSON and form-data (for file uploads)
     if request.is_json:
@@ -53,20 +66,20 @@ def create_appointment():
     if not can_book:
         return jsonify({'error': message}), 400
     
-    # Get service to calculate deposit
-    service = Service.query.get(data['service_id'])
+    # Get service to calculate deposit (already loaded by can_book_appointment)
+    service = resolve_service(data['service_id'])
     if not service:
         return jsonify({'error': 'Service not found'}), 404
     
-    # Determine who created it
+    # Determine who created it; a logged-in client's booking belongs to their account
     created_by = data.get('created_by', 'customer')
-    # If token is provided, use authenticated user
-    if 'Authorization' in request.headers:
-        try:
-            from app.utils.decorators import token_required
-            created_by = 'receptionist'  # Default for authenticated users
-        except:
-            pass
+    current_user = optional_user()
+    user_id = None
+    if current_user and current_user.is_client():
+        created_by = 'customer'
+        user_id = current_user.id
+    elif current_user:
+        created_by = 'receptionist'  # Default for staff
     
     # Create appointment
     appointment = Appointment(
@@ -76,7 +89,8 @@ def create_appointment():
         service_id=data['service_id'],
         appointment_date=appointment_date,
         appointment_time=appointment_time,
-        created_by=created_by
+        created_by=created_by,
+        user_id=user_id
     )
     
     # Generate reference number
@@ -121,11 +135,15 @@ def create_appointment():
                 except (ValueError, TypeError):
                     pass
     
+    # Read the price before the commit expires the service (it would be loaded again)
+    service_price = float(service.price)
+    
+    link_customer(appointment)
     db.session.add(appointment)
     db.session.commit()
     
     # Calculate required deposit (10% of service price)
-    required_deposit = float(service.price) * 0.10
+    required_deposit = service_price * 0.10
     
     return jsonify({
         'message': 'Appointment created successfully. Please upload payment screenshot to confirm.',
@@ -137,7 +155,7 @@ def create_appointment():
             'appointment_time': str(appointment.appointment_time),
             'status': appointment.status,
             'required_deposit': round(required_deposit, 2),
-            'service_price': float(service.price)
+            'service_price': service_price
         }
     }), 201
 
@@ -149,16 +167,13 @@ def list_appointments(current_user):
     status = request.args.get('status')
     date = request.args.get('date')
     service_id = request.args.get('service_id', type=int)
+    customer_id = request.args.get('customer_id', type=int)
     
     query = Appointment.query
     
-    # If client, filter to only their appointments (by name or email)
+    # If client, filter to only their appointments (booked while logged in, or linked by verified email)
     if current_user.is_client():
-        # Clients can only see appointments matching their name
-        # When clients book, they should use their registered name
-        query = query.filter(
-            Appointment.customer_name.ilike(f'%{current_user.name}%')
-        )
+        query = query.filter(Appointment.user_id == current_user.id)
     
     # Apply filters
     if status:
@@ -171,6 +186,8 @@ def list_appointments(current_user):
             return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
     if service_id:
         query = query.filter(Appointment.service_id == service_id)
+    if customer_id:
+        query = query.filter(Appointment.customer_id == customer_id)
     
     appointments = query.order_by(Appointment.appointment_date, Appointment.appointment_time).all()
     
@@ -180,6 +197,7 @@ def list_appointments(current_user):
             'id': a.id,
             'customer_name': a.customer_name,
             'customer_phone': a.customer_phone,
+            'customer_id': a.customer_id,
             'service_id': a.service_id,
             'service_name': a.service.name,
             'appointment_date': str(a.appointment_date),
@@ -190,21 +208,78 @@ def list_appointments(current_user):
         })
     return jsonify(result)
 
+# Export appointments with service and payment fields as CSV or NDJSON (staff only, streamed)
+@appointments_bp.route('/export', methods=['GET'])
+@staff_required
+@read_only
+def export_appointments(current_user):
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_MIMETYPES:
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    try:
+        first = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None
+        last = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    if first and last and first > last:
+        return jsonify({'error': '"from" must not be after "to"'}), 400
+    statuses = [s.strip() for s in request.args.get('status', '').split(',') if s.strip()]
+    unknown = [s for s in statuses if s not in STATUSES]
+    if unknown:
+        return jsonify({'error': f'Unknown status: {", ".join(unknown)}'}), 400
+    
+    query = export_query(first, last, statuses, request.args.get('service_id', type=int))
+    chunks = csv_chunks(query) if export_format == 'csv' else ndjson_chunks(query)
+    filename = f'appointments_{first or "start"}_{last or "end"}.{export_format}'
+    return Response(stream_with_context(chunks), mimetype=EXPORT_MIMETYPES[export_format], headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store'
+    })
+
+# Typeahead search by partial reference number, phone number or customer name (staff only)
+@appointments_bp.route('/search', methods=['GET'])
+@staff_required
+@read_only
+def typeahead_search(current_user):
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 10, type=int)
+    if not query.strip():
+        return jsonify({'error': 'q parameter is required'}), 400
+    if not 1 <= limit <= 50:
+        return jsonify({'error': 'limit must be between 1 and 50'}), 400
+    
+    return jsonify({'query': query, 'results': search_appointments(query, limit)})
+
+# Dashboard counts (staff only; user counts for admins)
+@appointments_bp.route('/summary', methods=['GET'])
+@staff_required
+@read_only
+def get_dashboard_summary(current_user):
+    # "Today" as the dashboard sees it, so the counts match the browser's date
+    date = request.args.get('date')
+    try:
+        day = datetime.strptime(date, '%Y-%m-%d').date() if date else datetime.now().date()
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    return jsonify(dashboard_summary(day, include_users=current_user.is_admin()))
+
 # Get single appointment (staff can view any, client can view their own)
 @appointments_bp.route('/<int:id>', methods=['GET'])
 @token_required
 def get_appointment(current_user, id):
     appointment = Appointment.query.get_or_404(id)
     
-    # If client, only allow viewing their own appointments (by name)
+    # If client, only allow viewing their own appointments
     if current_user.is_client():
-        if current_user.name.lower() not in appointment.customer_name.lower():
+        if appointment.user_id != current_user.id:
             return jsonify({'error': 'Access denied. You can only view your own appointments'}), 403
     
     return jsonify({
         'id': appointment.id,
         'customer_name': appointment.customer_name,
         'customer_phone': appointment.customer_phone,
+        'customer_id': appointment.customer_id,
         'service_id': appointment.service_id,
         'service_name': appointment.service.name,
         'service_duration': appointment.service.duration_minutes,
@@ -229,7 +304,7 @@ def update_appointment(current_user, id):
     if 'customer_phone' in data:
         appointment.customer_phone = data['customer_phone']
     if 'service_id' in data:
-        service = Service.query.get(data['service_id'])
+        service = resolve_service(data['service_id'])
         if not service or not service.is_active:
             return jsonify({'error': 'Service not available'}), 400
         appointment.service_id = data['service_id']
@@ -249,6 +324,9 @@ def update_appointment(current_user, id):
         if has_conflict:
             return jsonify({'error': 'Time slot is already booked'}), 400
     
+    if 'customer_name' in data or 'customer_phone' in data:
+        link_customer(appointment)
+    
     db.session.commit()
     
     return jsonify({
@@ -299,6 +377,7 @@ def delete_appointment(current_user, id):
 
 # Get available time slots
 @appointments_bp.route('/available-slots', methods=['GET'])
+@read_only
 def get_available_slots():
     date_str = request.args.get('date')
     service_id = request.args.get('service_id', type=int)
@@ -313,7 +392,10 @@ def get_available_slots():
     except ValueError:
         return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
     
-    slots = get_available_time_slots(date_obj, service_id)
+    # One indexed range read when the slot grid covers this day, live computation otherwise
+    slots = read_slot_grid(date_obj, service_id)
+    if slots is None:
+        slots = get_available_time_slots(date_obj, service_id)
     
     return jsonify({
         'date': str(date_obj),
@@ -321,10 +403,91 @@ def get_available_slots():
         'available_slots': slots
     })
 
-# Get appointment by reference number (public - for clients without login)
+# Get available slots for a date range and several services (public)
+@appointments_bp.route('/availability', methods=['GET'])
+@read_only
+def get_availability_range():
+    start_str = request.args.get('start_date')
+    days = request.args.get('days', 7, type=int)
+    max_days = current_app.config['AVAILABILITY_MAX_DAYS']
+    
+    if not start_str:
+        return jsonify({'error': 'start_date parameter is required (YYYY-MM-DD)'}), 400
+    try:
+        start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    if not 1 <= days <= max_days:
+        return jsonify({'error': f'days must be between 1 and {max_days}'}), 400
+    
+    # Optional comma-separated service_ids; defaults to every active service
+    service_ids = request.args.get('service_ids')
+    if service_ids:
+        try:
+            service_ids = [int(s) for s in service_ids.split(',') if s.strip()]
+        except ValueError:
+            return jsonify({'error': 'service_ids must be comma-separated integers'}), 400
+    else:
+        service_ids = [s.id for s in Service.query.with_entities(Service.id).filter_by(is_active=True)]
+    
+    step = current_app.config['SLOT_GRANULARITY_MINUTES']
+    availability = compute_availability(start_date, days, service_ids, step)
+    
+    return jsonify({
+        'start_date': str(start_date),
+        'days': days,
+        'slot_minutes': step,
+        'availability': availability
+    })
+
+# Find the earliest free slots across one or more services (public)
+@appointments_bp.route('/next-available', methods=['GET'])
+@read_only
+def get_next_available():
+    service_ids = request.args.get('service_ids') or request.args.get('service_id')
+    limit = request.args.get('limit', 5, type=int)
+    max_days = current_app.config['NEXT_AVAILABLE_MAX_DAYS']
+    days = request.args.get('days', max_days, type=int)
+    
+    if not service_ids:
+        return jsonify({'error': 'service_ids parameter is required'}), 400
+    try:
+        service_ids = [int(s) for s in service_ids.split(',') if s.strip()]
+    except ValueError:
+        return jsonify({'error': 'service_ids must be comma-separated integers'}), 400
+    if not 1 <= limit <= 50:
+        return jsonify({'error': 'limit must be between 1 and 50'}), 400
+    if not 1 <= days <= max_days:
+        return jsonify({'error': f'days must be between 1 and {max_days}'}), 400
+    
+    start_date = datetime.now().date()
+    if request.args.get('from'):
+        try:
+            start_date = max(start_date, datetime.strptime(request.args['from'], '%Y-%m-%d').date())
+        except ValueError:
+            return jsonify({'error': 'Invalid from date. Use YYYY-MM-DD'}), 400
+    
+    slots, searched_until = find_next_available(
+        service_ids, start_date, limit, days, current_app.config['SLOT_GRANULARITY_MINUTES']
+    )
+    
+    return jsonify({
+        'slots': [{
+            'date': str(day),
+            'time': slot,
+            'service_id': service_id
+        } for day, slot, service_id in slots],
+        'searched_from': str(start_date),
+        'searched_until': str(searched_until)
+    })
+
+# Get appointment by reference number (public - for clients without login, archived ones too)
 @appointments_bp.route('/reference/<reference_number>', methods=['GET'])
+@read_only
 def get_appointment_by_reference(reference_number):
-    appointment = Appointment.query.filter_by(reference_number=reference_number).first_or_404()
+    appointment = find_by_reference(reference_number)
+    if appointment is None:
+        abort(404)
     
     service = appointment.service
     required_deposit = float(service.price) * 0.10
@@ -347,12 +510,14 @@ def get_appointment_by_reference(reference_number):
         'payment_amount': float(appointment.payment_amount) if appointment.payment_amount else None,
         'payment_verification_status': appointment.payment_verification_status,
         'payment_verification_notes': appointment.payment_verification_notes,
-        'created_at': appointment.created_at.isoformat() if appointment.created_at else None
+        'created_at': appointment.created_at.isoformat() if appointment.created_at else None,
+        'archived': isinstance(appointment, AppointmentArchive)
     })
 
 # Upload payment screenshot to existing appointment (public)
 @appointments_bp.route('/<int:id>/upload-payment', methods=['POST'])
 @rate_limit(max_requests=5, window_seconds=60)  # 5 uploads per minute
+@idempotent
 def upload_payment_screenshot(id):
     appointment = Appointment.query.get_or_404(id)
     
@@ -9,6 +9,7 @@ from app.utils.validators import validate_user_data
 from app.utils.rate_limiter import rate_limit
 from app.utils.security import sanitize_input
 from app.utils.email_utils import send_email, build_verification_email, build_password_reset_email
+from app.services.customer_service import link_user_appointments
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -204,6 +205,10 @@ def verify_email():
     user.email_verified = True
     user.verification_code = None
     user.verification_expires_at = None
+    db.session.flush()
+    # Earlier bookings made with this email now show in the client's account
+    if user.is_client():
+        link_user_appointments(db.session.connection(), user)
     db.session.commit()
 
     return jsonify({'message': 'Email verified successfully'}), 200
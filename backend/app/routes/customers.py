@@ -0,0 +1,38 @@
+from flask import Blueprint, request, jsonify
+from app.models import Customer
+from app.services.customer_service import customer_to_dict, find_customers, customer_history
+from app.utils.decorators import staff_required
+from app.utils.db_routing import read_only
+
+customers_bp = Blueprint('customers', __name__, url_prefix='/api/customers')
+
+# Find customers by phone number (any formatting) or email (staff only)
+@customers_bp.route('/', methods=['GET'])
+@staff_required
+@read_only
+def search_customers(current_user):
+    phone = request.args.get('phone', '').strip()
+    email = request.args.get('email', '').strip()
+    if not phone and not email:
+        return jsonify({'error': 'phone or email is required'}), 400
+    
+    return jsonify([customer_to_dict(c) for c in find_customers(phone=phone, email=email)])
+
+# Get single customer (staff only)
+@customers_bp.route('/<int:id>', methods=['GET'])
+@staff_required
+@read_only
+def get_customer(current_user, id):
+    customer = Customer.query.get_or_404(id)
+    return jsonify(customer_to_dict(customer))
+
+# All bookings of a customer, archived ones included (staff only)
+@customers_bp.route('/<int:id>/appointments', methods=['GET'])
+@staff_required
+@read_only
+def get_customer_appointments(current_user, id):
+    customer = Customer.query.get_or_404(id)
+    return jsonify({
+        'customer': customer_to_dict(customer),
+        'appointments': customer_history(customer.id)
+    })
@@ -6,6 +6,9 @@ from app.utils.decorators import admin_required, manager_or_admin_required, toke
 from app.utils.validators import validate_service_data
 from app.utils.security import validate_file_type, generate_secure_filename, is_safe_path, sanitize_input
 from app.utils.rate_limiter import rate_limit
+from app.utils.db_routing import read_only
+from app.utils.compression import send_precompressed
+from app.services.catalog_service import get_catalog_snapshot, refresh_catalog
 import os
 import uuid
 from datetime import datetime
@@ -14,20 +17,16 @@ services_bp = Blueprint('services', __name__, url_prefix='/api/services')
 
 # List all active services (public)
 @services_bp.route('/', methods=['GET'])
+@read_only
 def list_services():
-    services = Service.query.filter_by(is_active=True).all()
-    return jsonify([{
-        'id': s.id,
-        'name': s.name,
-        'description': s.description,
-        'category': s.category,
-        'image_url': s.image_url,
-        'duration_minutes': s.duration_minutes,
-        'price': float(s.price)
-    } for s in services])
+    # Served from the pre-serialized, pre-compressed catalog snapshot
+    # (no query unless the catalog changed)
+    snapshot = get_catalog_snapshot()
+    return send_precompressed(snapshot['bodies'], snapshot['etag'])
 
 # Get single service
 @services_bp.route('/<int:id>', methods=['GET'])
+@read_only
 def get_service(id):
     service = Service.query.get_or_404(id)
     if not service.is_active:
@@ -66,6 +65,7 @@ def add_service(current_user):
     )
     db.session.add(service)
     db.session.commit()
+    refresh_catalog()
     
     return jsonify({
         'message': f'Service {service.name} added successfully',
@@ -103,6 +103,7 @@ def update_service(current_user, id):
     service.price = data.get('price', service.price)
     service.is_active = data.get('is_active', service.is_active)
     db.session.commit()
+    refresh_catalog()
     
     return jsonify({
         'message': f'Service {service.name} updated successfully',
@@ -173,4 +174,5 @@ def delete_service(current_user, id):
     service = Service.query.get_or_404(id)
     service.is_active = False
     db.session.commit()
+    refresh_catalog()
     return jsonify({'message': f'Service {service.name} deactivated'})
@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify
 from app import db
-from app.models import WorkingHour
+from app.models import WorkingHour, WorkingHourOverride
+from app.services.calendar_service import get_calendar, refresh_calendar, override_to_dict
 from app.utils.decorators import manager_or_admin_required
+from app.utils.db_routing import read_only
+from app.utils.compression import send_precompressed
 from datetime import datetime
-from sqlalchemy import case
 
 working_bp = Blueprint('working_hours', __name__, url_prefix='/api/working-hours')
 
@@ -34,6 +36,7 @@ def initialize_hours(current_user):
     
     if created_count > 0:
         db.session.commit()
+        refresh_calendar()
         return jsonify({
             'message': f'Initialized {created_count} working hour records',
             'created': created_count
@@ -46,30 +49,15 @@ def initialize_hours(current_user):
 
 # List all working hours (public)
 @working_bp.route('/', methods=['GET'])
+@read_only
 def list_hours():
-    hours = WorkingHour.query.order_by(
-        case(
-            (WorkingHour.day_of_week == 'Monday', 1),
-            (WorkingHour.day_of_week == 'Tuesday', 2),
-            (WorkingHour.day_of_week == 'Wednesday', 3),
-            (WorkingHour.day_of_week == 'Thursday', 4),
-            (WorkingHour.day_of_week == 'Friday', 5),
-            (WorkingHour.day_of_week == 'Saturday', 6),
-            (WorkingHour.day_of_week == 'Sunday', 7),
-            else_=8
-        )
-    ).all()
-    
-    return jsonify([{
-        'id': h.id,
-        'day_of_week': h.day_of_week,
-        'open_time': str(h.open_time),
-        'close_time': str(h.close_time),
-        'is_closed': h.is_closed
-    } for h in hours])
+    # Served from the compiled calendar (already in Monday..Sunday order)
+    calendar = get_calendar()
+    return send_precompressed(calendar.hours_bodies, calendar.hours_etag)
 
 # Get single day working hours
 @working_bp.route('/<int:id>', methods=['GET'])
+@read_only
 def get_hours(id):
     hours = WorkingHour.query.get_or_404(id)
     return jsonify({
@@ -110,6 +98,7 @@ def update_hours(current_user, id):
             return jsonify({'error': 'Close time must be after open time'}), 400
     
     db.session.commit()
+    refresh_calendar()
     
     return jsonify({
         'message': f'Working hours for {h.day_of_week} updated',
@@ -121,3 +110,79 @@ def update_hours(current_user, id):
             'is_closed': h.is_closed
         }
     })
+
+# List date overrides (holidays, one-off closures or special hours) - public
+@working_bp.route('/overrides', methods=['GET'])
+@read_only
+def list_overrides():
+    overrides = get_calendar().overrides.values()
+    
+    # Optional ?from=YYYY-MM-DD to hide past overrides
+    date_from = request.args.get('from')
+    if date_from:
+        try:
+            date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Invalid from date. Use YYYY-MM-DD'}), 400
+        overrides = [o for o in overrides if o.date >= date_from]
+    
+    return jsonify([override_to_dict(o) for o in sorted(overrides, key=lambda o: o.date)])
+
+# Create or replace the override for a date (manager or admin only)
+@working_bp.route('/overrides', methods=['POST'])
+@manager_or_admin_required
+def set_override(current_user):
+    data = request.json or {}
+    
+    try:
+        override_date = datetime.strptime(data.get('date', ''), '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    is_closed = bool(data.get('is_closed', True))
+    open_time = close_time = None
+    
+    # Special hours for the day instead of a full closure
+    if not is_closed:
+        try:
+            open_time = datetime.strptime(data.get('open_time', ''), '%H:%M').time()
+            close_time = datetime.strptime(data.get('close_time', ''), '%H:%M').time()
+        except (ValueError, TypeError):
+            return jsonify({'error': 'open_time and close_time (HH:MM) are required when the salon is open'}), 400
+        
+        if open_time >= close_time:
+            return jsonify({'error': 'Close time must be after open time'}), 400
+    
+    reason = (data.get('reason') or '').strip()[:200] or None
+    
+    override = WorkingHourOverride.query.filter_by(date=override_date).first()
+    created = override is None
+    if created:
+        override = WorkingHourOverride(date=override_date)
+        db.session.add(override)
+    
+    override.is_closed = is_closed
+    override.open_time = open_time
+    override.close_time = close_time
+    override.reason = reason
+    
+    db.session.commit()
+    refresh_calendar()
+    
+    return jsonify({
+        'message': f'Override for {override_date} saved',
+        'override': override_to_dict(override)
+    }), 201 if created else 200
+
+# Remove a date override (manager or admin only)
+@working_bp.route('/overrides/<int:id>', methods=['DELETE'])
+@manager_or_admin_required
+def delete_override(current_user, id):
+    override = WorkingHourOverride.query.get_or_404(id)
+    override_date = override.date
+    
+    db.session.delete(override)
+    db.session.commit()
+    refresh_calendar()
+    
+    return jsonify({'message': f'Override for {override_date} removed'})
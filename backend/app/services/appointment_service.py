@@ -3,8 +3,12 @@ Appointment Business Logic
 Handles appointment availability, conflicts, and scheduling
 """
 from datetime import datetime, date, time, timedelta
+from flask import current_app
 from app import db
-from app.models import Appointment, Service, WorkingHour
+from app.models import Appointment
+from app.services.calendar_service import get_open_interval
+from app.services.catalog_service import resolve_service
+from app.utils.single_flight import coalesce
 
 
 def check_appointment_conflict(service_id, appointment_date, appointment_time, exclude_id=None):
@@ -14,7 +18,7 @@ def check_appointment_conflict(service_id, appointment_date, appointment_time, e
     Returns:
         tuple: (has_conflict: bool, conflicting_appointment: Appointment or None)
     """
-    service = Service.query.get(service_id)
+    service = resolve_service(service_id)
     if not service:
         return False, None
     
@@ -36,8 +40,8 @@ def check_appointment_conflict(service_id, appointment_date, appointment_time, e
     
     for existing in existing_appointments:
         existing_start = datetime.combine(existing.appointment_date, existing.appointment_time)
-        existing_service = Service.query.get(existing.service_id)
-        existing_end = existing_start + timedelta(minutes=existing_service.duration_minutes)
+        # Same service as the new booking, so the same duration
+        existing_end = existing_start + timedelta(minutes=service.duration_minutes)
         
         # Check for overlap
         if (start_datetime < existing_end and end_datetime > existing_start):
@@ -53,78 +57,109 @@ def is_within_working_hours(appointment_date, appointment_time, service_duration
     Returns:
         tuple: (is_valid: bool, message: str)
     """
-    # Get day of week
-    day_name = appointment_date.strftime('%A')  # Monday, Tuesday, etc.
+    # Compiled calendar: weekly hours plus date overrides, no query per call
+    open_time, close_time, reason = get_open_interval(appointment_date)
     
-    working_hour = WorkingHour.query.filter_by(day_of_week=day_name).first()
-    
-    if not working_hour:
-        return False, f'No working hours set for {day_name}'
-    
-    if working_hour.is_closed:
-        return False, f'Salon is closed on {day_name}'
+    if reason:
+        return False, reason
     
     # Check if appointment time is within working hours
     appointment_datetime = datetime.combine(appointment_date, appointment_time)
     end_datetime = appointment_datetime + timedelta(minutes=service_duration)
     
-    open_datetime = datetime.combine(appointment_date, working_hour.open_time)
-    close_datetime = datetime.combine(appointment_date, working_hour.close_time)
+    open_datetime = datetime.combine(appointment_date, open_time)
+    close_datetime = datetime.combine(appointment_date, close_time)
     
     if appointment_datetime < open_datetime:
-        return False, f'Appointment time is before opening time ({working_hour.open_time})'
+        return False, f'Appointment time is before opening time ({open_time})'
     
     if end_datetime > close_datetime:
-        return False, f'Appointment would end after closing time ({working_hour.close_time})'
+        return False, f'Appointment would end after closing time ({close_time})'
     
     return True, 'Valid'
 
 
+def find_free_slots(date_obj, open_time, close_time, duration_minutes, booked, step_minutes=15):
+    """
+    Pure slot computation shared by the Flask routes and the async API
+    
+    Args:
+        booked: (start_time, duration_minutes) of the active bookings that day
+    
+    Returns:
+        list: Start times (HH:MM) where the service fits without overlapping a booking
+    """
+    busy = []
+    for start_time, booked_duration in booked:
+        start = datetime.combine(date_obj, start_time)
+        busy.append((start, start + timedelta(minutes=booked_duration)))
+    
+    slots = []
+    current_time = datetime.combine(date_obj, open_time)
+    close_datetime = datetime.combine(date_obj, close_time)
+    duration = timedelta(minutes=duration_minutes)
+    
+    while current_time + duration <= close_datetime:
+        end_time = current_time + duration
+        if not any(current_time < busy_end and end_time > busy_start for busy_start, busy_end in busy):
+            slots.append(current_time.strftime('%H:%M'))
+        current_time += timedelta(minutes=step_minutes)
+    
+    return slots
+
+
 def get_available_time_slots(date_obj, service_id):
     """
-    Get available time slots for a given date and service
+    Get available time slots for a given date and service.
+    Identical concurrent calls share one computation (see single_flight),
+    but only with calls that read from the same database: a client pinned
+    to the primary must not be handed a result read from the replica.
     
     Returns:
         list: Available time slots as strings (HH:MM format)
     """
-    service = Service.query.get(service_id)
+    database = db.session.get_bind().url.render_as_string(hide_password=True)
+    slots = coalesce(
+        f'slots:{database}:{service_id}:{date_obj}',
+        lambda: compute_available_time_slots(date_obj, service_id)
+    )
+    return list(slots)  # callers get their own copy of the shared result
+
+
+def compute_available_time_slots(date_obj, service_id):
+    """
+    Compute available slots from working hours and the day's bookings
+    
+    Returns:
+        list: Available time slots as strings (HH:MM format)
+    """
+    service = resolve_service(service_id)
     if not service:
         return []
     
-    day_name = date_obj.strftime('%A')
-    working_hour = WorkingHour.query.filter_by(day_of_week=day_name).first()
-    
-    if not working_hour or working_hour.is_closed:
+    open_time, close_time, reason = get_open_interval(date_obj)
+    if reason:
         return []
     
-    # Get existing appointments for this date and service
+    # Get existing appointments for this date and service (one query for the whole day)
     existing_appointments = Appointment.query.filter(
         Appointment.appointment_date == date_obj,
         Appointment.service_id == service_id,
         Appointment.status != 'cancelled'
     ).all()
     
-    # Generate time slots (every 15 minutes)
-    slots = []
-    current_time = datetime.combine(date_obj, working_hour.open_time)
-    close_time = datetime.combine(date_obj, working_hour.close_time)
-    
-    while current_time + timedelta(minutes=service.duration_minutes) <= close_time:
-        slot_time = current_time.time()
-        
-        # Check if this slot conflicts with existing appointments
-        has_conflict, _ = check_appointment_conflict(
-            service_id, 
-            date_obj, 
-            slot_time
-        )
-        
-        if not has_conflict:
-            slots.append(slot_time.strftime('%H:%M'))
-        
-        current_time += timedelta(minutes=15)
-    
-    return slots
+    # Bookings are for this same service, so they share its duration
+    booked = [(a.appointment_time, service.duration_minutes) for a in existing_appointments]
+    
+    # Generate time slots (every SLOT_GRANULARITY_MINUTES, 15 by default)
+    return find_free_slots(
+        date_obj,
+        open_time,
+        close_time,
+        service.duration_minutes,
+        booked,
+        step_minutes=current_app.config['SLOT_GRANULARITY_MINUTES']
+    )
 
 
 def can_book_appointment(service_id, appointment_date, appointment_time):
@@ -134,7 +169,7 @@ def can_book_appointment(service_id, appointment_date, appointment_time):
     Returns:
         tuple: (can_book: bool, message: str)
     """
-    service = Service.query.get(service_id)
+    service = resolve_service(service_id)
     if not service:
         return False, 'Service not found'
     
@@ -0,0 +1,145 @@
+"""
+Appointment Archive
+Move old completed and cancelled appointments out of the hot table in batches
+
+Bookings, availability and the staff lists only ever look at recent and
+future appointments, so `appointments` (and its indexes) only needs those.
+`flask archive run` moves completed and cancelled appointments older than
+ARCHIVE_AFTER_DAYS into appointments_archive, one batch per transaction:
+lock a batch of ids, copy the rows with INSERT ... SELECT, delete them.
+
+On PostgreSQL the archive is partitioned by month of appointment_date (the
+partitions are created as needed), so date-range reads only scan the
+months they cover and an old month can be detached or dropped on its own.
+
+The move uses plain SQL, so the dashboard status counts and the daily
+rollups keep counting archived appointments. Reference lookups, the
+heatmaps, `flask dashboard recount` and `flask rollups backfill` read both
+tables.
+"""
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, insert, delete, func, literal, text, union_all, Boolean, DateTime
+from app import db
+from app.models import Appointment, AppointmentArchive
+
+ARCHIVED_STATUSES = ('completed', 'cancelled')
+PARTITION_PREFIX = 'appointments_archive_'
+
+
+def default_cutoff(today=None):
+    """Appointments before this date may be archived"""
+    return (today or date.today()) - timedelta(days=current_app.config['ARCHIVE_AFTER_DAYS'])
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def is_partitioned(connection):
+    """True when appointments_archive is a partitioned PostgreSQL table"""
+    if connection.dialect.name != 'postgresql':
+        return False
+    return connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('appointments_archive')"
+    )).first() is not None
+
+
+def ensure_partitions(connection, first, last):
+    """Create the monthly partitions covering first..last (PostgreSQL only)"""
+    month = month_start(first)
+    while month <= last:
+        following = next_month(month)
+        connection.execute(text(
+            f'CREATE TABLE IF NOT EXISTS {PARTITION_PREFIX}{month:%Y_%m} PARTITION OF appointments_archive '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        ))
+        month = following
+
+
+def archive_batch(connection, cutoff, batch_size, partitioned=False):
+    """
+    Move one batch of archivable appointments, oldest ids first
+
+    Returns:
+        int: Number of appointments moved
+    """
+    hot = Appointment.__table__
+    batch = select(hot.c.id, hot.c.appointment_date).where(
+        hot.c.appointment_date < cutoff,
+        hot.c.status.in_(ARCHIVED_STATUSES)
+    ).order_by(hot.c.id).limit(batch_size).with_for_update(skip_locked=True)
+    if connection.dialect.name == 'sqlite':
+        # SQLite hands out max(id) + 1 again once the highest row is deleted
+        batch = batch.where(hot.c.id < select(func.max(hot.c.id)).scalar_subquery())
+
+    rows = connection.execute(batch).all()
+    if not rows:
+        return 0
+    ids = [row.id for row in rows]
+    if partitioned:
+        ensure_partitions(connection, min(row.appointment_date for row in rows),
+                          max(row.appointment_date for row in rows))
+
+    columns = [column.name for column in hot.columns]
+    connection.execute(insert(AppointmentArchive.__table__).from_select(
+        columns + ['archived_at'],
+        select(*[hot.c[name] for name in columns], literal(datetime.utcnow(), DateTime)).where(hot.c.id.in_(ids))
+    ))
+    connection.execute(delete(hot).where(hot.c.id.in_(ids)))
+    return len(ids)
+
+
+def run_archive(cutoff, batch_size, max_batches=None):
+    """
+    Archive everything before cutoff, committing after each batch
+
+    Returns:
+        int: Number of appointments moved
+    """
+    partitioned = is_partitioned(db.session.connection())
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(db.session.connection(), cutoff, batch_size, partitioned)
+        db.session.commit()
+        moved += count
+        batches += 1
+        if count < batch_size:
+            break
+    return moved
+
+
+def appointment_rows(names, where=None, mark_archived=False):
+    """
+    The given columns of hot and archived appointments as one subquery.
+    where(table) returns the conditions for each side, so they filter before the union.
+    With mark_archived, an extra boolean column "archived" tells the two apart.
+    """
+    selects = []
+    for table in (Appointment.__table__, AppointmentArchive.__table__):
+        columns = [table.c[name] for name in names]
+        if mark_archived:
+            columns.append(literal(table is AppointmentArchive.__table__, Boolean).label('archived'))
+        query = select(*columns)
+        if where is not None:
+            query = query.where(*where(table))
+        selects.append(query)
+    return union_all(*selects).subquery('all_appointments')
+
+
+def find_by_reference(reference_number):
+    """
+    Appointment with this reference number, looked up in the archive when it is not in the hot table
+
+    Returns:
+        Appointment, AppointmentArchive or None
+    """
+    appointment = Appointment.query.filter_by(reference_number=reference_number).first()
+    if appointment is None:
+        appointment = AppointmentArchive.query.filter_by(reference_number=reference_number).first()
+    return appointment
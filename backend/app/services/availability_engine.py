@@ -0,0 +1,226 @@
+"""
+Availability Engine
+Vectorized availability for long date ranges (NumPy), with a pure-Python fallback
+
+Each (service, day) is a row of a minute-resolution occupancy matrix: minutes
+outside opening hours and minutes covered by a booking are 1, free minutes 0.
+With a running sum P along each row, a start minute s fits a service of
+duration d exactly when P[s + d] - P[s] == 0. That is the same rule as
+find_free_slots (a slot may not overlap any booking or run past closing),
+evaluated for every start of every day at once.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from app import db
+from app.models import Appointment, Service
+from app.services.appointment_service import find_free_slots
+from app.services.calendar_service import get_open_interval
+
+# Optional NumPy support (the Python loop is used without it)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minute(t):
+    return t.hour * 60 + t.minute
+
+
+def format_minute(minute):
+    return f'{minute // 60:02d}:{minute % 60:02d}'
+
+
+def to_time(minute):
+    return datetime.strptime(format_minute(minute), '%H:%M').time()
+
+
+def free_starts_numpy(open_minutes, close_minutes, bookings, duration, step):
+    """
+    Feasible start minutes for many days of one service at once
+
+    Args:
+        open_minutes, close_minutes: per-day opening interval in minutes (None if closed)
+        bookings: (day_index, start_minute) of each active booking
+        duration: service duration in minutes (also the length of each booking)
+        step: slot granularity in minutes, counted from opening time
+
+    Returns:
+        list: For each day, the list of feasible start minutes
+    """
+    days = len(open_minutes)
+    open_days = [m for m in open_minutes if m is not None]
+    if not open_days or duration <= 0:
+        return [[] for _ in range(days)]
+
+    # Only the minutes between the earliest opening and the latest closing matter
+    first_minute = min(open_days)
+    width = max(m for m in close_minutes if m is not None) - first_minute
+    if duration > width:
+        return [[] for _ in range(days)]
+
+    # Difference array: +1 where a busy stretch starts, -1 where it ends
+    diff = np.zeros((days, width + 1), dtype=np.int32)
+    open_col = np.zeros(days, dtype=np.int32)
+    is_open = np.zeros(days, dtype=bool)
+    for day, (open_minute, close_minute) in enumerate(zip(open_minutes, close_minutes)):
+        if open_minute is None:
+            continue
+        is_open[day] = True
+        open_col[day] = open_minute - first_minute
+        diff[day, 0] += 1  # closed until opening...
+        diff[day, open_minute - first_minute] -= 1
+        diff[day, close_minute - first_minute] += 1  # ...and again from closing
+
+    if bookings:
+        booked = np.asarray(bookings, dtype=np.int32)
+        starts = np.clip(booked[:, 1] - first_minute, 0, width)
+        ends = np.clip(booked[:, 1] + duration - first_minute, 0, width)
+        np.add.at(diff, (booked[:, 0], starts), 1)
+        np.add.at(diff, (booked[:, 0], ends), -1)
+
+    occupied = np.cumsum(diff[:, :width], axis=1) > 0
+
+    # Running sum of occupied minutes; window [s, s + duration) is free when its sum is 0
+    prefix = np.zeros((days, width + 1), dtype=np.int32)
+    np.cumsum(occupied, axis=1, out=prefix[:, 1:])
+    window = prefix[:, duration:] - prefix[:, :-duration]  # column s = busy minutes in [s, s + duration)
+
+    # Only test the offered starts: every `step` minutes from each day's opening time
+    candidates = open_col[:, None] + np.arange(0, width, step)[None, :]
+    in_day = candidates < window.shape[1]
+    busy = np.take_along_axis(window, np.where(in_day, candidates, 0), axis=1)
+    feasible = in_day & (busy == 0) & is_open[:, None]
+
+    rows, cols = np.nonzero(feasible)
+    result = [[] for _ in range(days)]
+    for row, start in zip(rows.tolist(), (candidates[rows, cols] + first_minute).tolist()):
+        result[row].append(start)
+    return result
+
+
+def free_starts_python(open_minutes, close_minutes, bookings, duration, step, dates):
+    """Same contract as free_starts_numpy, using find_free_slots day by day"""
+    per_day = defaultdict(list)
+    for day, start in bookings:
+        per_day[day].append(start)
+
+    result = []
+    for day, (open_minute, close_minute) in enumerate(zip(open_minutes, close_minutes)):
+        if open_minute is None:
+            result.append([])
+            continue
+        slots = find_free_slots(
+            dates[day],
+            to_time(open_minute),
+            to_time(close_minute),
+            duration,
+            [(to_time(start), duration) for start in per_day[day]],
+            step
+        )
+        result.append([to_minute(datetime.strptime(s, '%H:%M').time()) for s in slots])
+    return result
+
+
+def compute_availability(start_date, days, service_ids, step, use_numpy=None):
+    """
+    Free slots for several services over a date range, with two queries in total
+
+    Returns:
+        dict: {date (YYYY-MM-DD): {service_id: [HH:MM, ...]}}
+    """
+    if use_numpy is None:
+        use_numpy = NUMPY_AVAILABLE
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    end_date = dates[-1]
+
+    durations = dict(Service.query.with_entities(Service.id, Service.duration_minutes)
+                     .filter(Service.id.in_(service_ids)).all())
+
+    open_minutes, close_minutes = [], []
+    for day in dates:
+        open_time, close_time, reason = get_open_interval(day)
+        open_minutes.append(None if reason else to_minute(open_time))
+        close_minutes.append(None if reason else to_minute(close_time))
+
+    # All bookings of all requested services in the range, in one query
+    bookings = defaultdict(list)
+    rows = Appointment.query.with_entities(
+        Appointment.service_id, Appointment.appointment_date, Appointment.appointment_time
+    ).filter(
+        Appointment.service_id.in_(list(durations)),
+        Appointment.appointment_date.between(start_date, end_date),
+        Appointment.status != 'cancelled'
+    ).all()
+    for service_id, appointment_date, appointment_time in rows:
+        bookings[service_id].append(((appointment_date - start_date).days, to_minute(appointment_time)))
+
+    result = {str(day): {} for day in dates}
+    for service_id, duration in durations.items():
+        if use_numpy:
+            starts = free_starts_numpy(open_minutes, close_minutes, bookings[service_id], duration, step)
+        else:
+            starts = free_starts_python(open_minutes, close_minutes, bookings[service_id], duration, step, dates)
+        for day, day_starts in zip(dates, starts):
+            result[str(day)][service_id] = [format_minute(m) for m in day_starts]
+    return result
+
+
+def find_next_available(service_ids, start_date, limit, max_days, step, now=None):
+    """
+    Earliest free slots from start_date on, across one or more services.
+    Bookings are fetched a chunk of days at a time (7, 14, 28 ... days) and the
+    walk stops as soon as `limit` slots are found or max_days is exhausted.
+
+    Returns:
+        tuple: (slots: list of (date, HH:MM, service_id), last date searched)
+    """
+    now = now or datetime.now()
+    services = Service.query.with_entities(Service.id, Service.duration_minutes).filter(
+        Service.id.in_(service_ids),
+        Service.is_active.is_(True)
+    ).order_by(Service.id).all()
+    if not services:
+        return [], start_date
+
+    end_date = start_date + timedelta(days=max_days - 1)
+    found = []
+    chunk_start, chunk_days = start_date, 7
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+
+        booked = defaultdict(list)
+        for service_id, appointment_date, appointment_time in db.session.query(
+            Appointment.service_id, Appointment.appointment_date, Appointment.appointment_time
+        ).filter(
+            Appointment.service_id.in_([s.id for s in services]),
+            Appointment.appointment_date.between(chunk_start, chunk_end),
+            Appointment.status != 'cancelled'
+        ):
+            booked[(service_id, appointment_date)].append(appointment_time)
+
+        day = chunk_start
+        while day <= chunk_end:
+            open_time, close_time, reason = get_open_interval(day)
+            if not reason:
+                day_slots = []
+                for service in services:
+                    for slot in find_free_slots(
+                        day, open_time, close_time, service.duration_minutes,
+                        [(t, service.duration_minutes) for t in booked[(service.id, day)]], step
+                    ):
+                        # Today's slots that have already started are not bookable
+                        if day > now.date() or slot > now.strftime('%H:%M'):
+                            day_slots.append((slot, service.id))
+                for slot, service_id in sorted(day_slots):
+                    found.append((day, slot, service_id))
+                    if len(found) >= limit:
+                        return found, day
+            day += timedelta(days=1)
+
+        chunk_start = chunk_end + timedelta(days=1)
+        chunk_days *= 2
+    return found, end_date
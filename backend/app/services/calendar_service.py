@@ -0,0 +1,132 @@
+"""
+Working Hours Calendar
+Compiled in-memory view of the weekly hours plus date-specific overrides
+
+Availability checks ask "when is the salon open on date D" many times per
+request. The calendar answers that with two dict lookups instead of a
+WorkingHour query, and is rebuilt only when hours or overrides change
+(update_hours, initialize_hours, override endpoints and the bulk loaders
+seed.py and generate_data.py bump the stamp). Each database gets its own.
+"""
+import hashlib
+import threading
+from flask import current_app
+from app.models import WorkingHour, WorkingHourOverride
+from app.utils import version_stamp
+from app.utils.compression import precompress
+from app.utils.db_routing import use_primary
+
+CALENDAR_STAMP = 'working_hours'
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+_calendars = {}  # version_stamp.database_key() -> CompiledCalendar
+_lock = threading.Lock()
+
+
+def working_hour_to_dict(h):
+    return {
+        'id': h.id,
+        'day_of_week': h.day_of_week,
+        'open_time': str(h.open_time),
+        'close_time': str(h.close_time),
+        'is_closed': h.is_closed
+    }
+
+
+def override_to_dict(o):
+    return {
+        'id': o.id,
+        'date': str(o.date),
+        'open_time': str(o.open_time) if o.open_time else None,
+        'close_time': str(o.close_time) if o.close_time else None,
+        'is_closed': o.is_closed,
+        'reason': o.reason
+    }
+
+
+def resolve_open_interval(date_obj, working_hour, override=None):
+    """
+    Opening interval for one date from its weekly row and optional override.
+    Shared by the compiled calendar and the async API.
+
+    Returns:
+        tuple: (open_time, close_time, None) if open, or (None, None, reason) if not
+    """
+    if override is not None:
+        if override.is_closed or not override.open_time or not override.close_time:
+            reason = f' ({override.reason})' if override.reason else ''
+            return None, None, f'Salon is closed on {date_obj}{reason}'
+        return override.open_time, override.close_time, None
+
+    day_name = DAYS[date_obj.weekday()]
+    if working_hour is None:
+        return None, None, f'No working hours set for {day_name}'
+    if working_hour.is_closed:
+        return None, None, f'Salon is closed on {day_name}'
+    return working_hour.open_time, working_hour.close_time, None
+
+
+class CompiledCalendar:
+    """Weekly template indexed by weekday plus overrides indexed by date"""
+
+    def __init__(self, version, working_hours, overrides):
+        self.version = version
+        by_day = {h.day_of_week: h for h in working_hours}
+        self.weekly = [by_day.get(day) for day in DAYS]  # index = date.weekday()
+        self.overrides = {o.date: o for o in overrides}
+        # Pre-serialized and pre-compressed for GET /api/working-hours/
+        self.hours_payload = [working_hour_to_dict(h) for h in self.weekly if h is not None]
+        body = current_app.json.dumps(self.hours_payload).encode('utf-8')
+        self.hours_bodies = precompress(body)
+        self.hours_etag = hashlib.sha256(body).hexdigest()[:32]
+
+    def open_interval(self, date_obj):
+        """(open_time, close_time, None) or (None, None, reason) for date_obj, in O(1)"""
+        return resolve_open_interval(
+            date_obj,
+            self.weekly[date_obj.weekday()],
+            self.overrides.get(date_obj)
+        )
+
+
+def build_calendar(version):
+    # Plain rows (not ORM objects) so the cache never holds expired instances.
+    # Always compiled from the primary so a lagging replica can't get cached.
+    with use_primary():
+        working_hours = WorkingHour.query.with_entities(
+            WorkingHour.id, WorkingHour.day_of_week, WorkingHour.open_time,
+            WorkingHour.close_time, WorkingHour.is_closed
+        ).all()
+        overrides = WorkingHourOverride.query.with_entities(
+            WorkingHourOverride.id, WorkingHourOverride.date, WorkingHourOverride.open_time,
+            WorkingHourOverride.close_time, WorkingHourOverride.is_closed, WorkingHourOverride.reason
+        ).all()
+    return CompiledCalendar(version, working_hours, overrides)
+
+
+def get_calendar():
+    """Current compiled calendar, rebuilt only after hours or overrides changed"""
+    database = version_stamp.database_key()
+    version = version_stamp.current(CALENDAR_STAMP)
+    calendar = _calendars.get(database)
+    if calendar is not None and calendar.version == version:
+        return calendar
+
+    with _lock:
+        calendar = _calendars.get(database)
+        if calendar is None or calendar.version != version:
+            calendar = _calendars[database] = build_calendar(version)
+        return calendar
+
+
+def refresh_calendar():
+    """Recompile after a working-hours change (and invalidate other workers)"""
+    version = version_stamp.bump(CALENDAR_STAMP)
+    with _lock:
+        calendar = _calendars[version_stamp.database_key()] = build_calendar(version)
+    return calendar
+
+
+def get_open_interval(date_obj):
+    """Shortcut for get_calendar().open_interval(date_obj)"""
+    return get_calendar().open_interval(date_obj)
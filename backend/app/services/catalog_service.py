@@ -0,0 +1,93 @@
+"""
+Service Catalog Snapshot
+Pre-serialized, pre-compressed JSON for GET /api/services/ with a strong ETag
+
+The catalog changes a few times a month but is read on every gallery view,
+so the JSON is built once per database and reused until add/update/delete_service
+(or a bulk load: seed.py, generate_data.py) bump the 'catalog' version stamp.
+Serving the snapshot never queries the database.
+"""
+import hashlib
+import threading
+from flask import current_app, g
+from app import db
+from app.models import Service
+from app.utils import version_stamp
+from app.utils.compression import precompress
+from app.utils.db_routing import use_primary
+
+CATALOG_STAMP = 'catalog'
+
+_snapshots = {}  # database_key() -> snapshot
+_lock = threading.Lock()
+
+
+def build_catalog_snapshot(version):
+    """
+    Query active services and serialize them once
+
+    Returns:
+        dict: version, bodies (encoding -> bytes), etag
+    """
+    # Build from the primary so a lagging replica can't get cached
+    with use_primary():
+        services = Service.query.filter_by(is_active=True).order_by(Service.id).all()
+
+    body = current_app.json.dumps([{
+        'id': s.id,
+        'name': s.name,
+        'description': s.description,
+        'category': s.category,
+        'image_url': s.image_url,
+        'duration_minutes': s.duration_minutes,
+        'price': float(s.price)
+    } for s in services]).encode('utf-8')
+
+    return {
+        'version': version,
+        'bodies': precompress(body),
+        'etag': hashlib.sha256(body).hexdigest()[:32]
+    }
+
+
+def get_catalog_snapshot():
+    """Return the current snapshot, rebuilding it only if the catalog changed"""
+    database = version_stamp.database_key()
+    version = version_stamp.current(CATALOG_STAMP)
+    snapshot = _snapshots.get(database)
+    if snapshot is not None and snapshot['version'] == version:
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshots.get(database)
+        if snapshot is None or snapshot['version'] != version:
+            snapshot = _snapshots[database] = build_catalog_snapshot(version)
+        return snapshot
+
+
+def refresh_catalog():
+    """Regenerate the snapshot after a service change (and invalidate other workers)"""
+    version = version_stamp.bump(CATALOG_STAMP)
+    with _lock:
+        snapshot = _snapshots[version_stamp.database_key()] = build_catalog_snapshot(version)
+    return snapshot
+
+
+def resolve_service(service_id):
+    """
+    Service by id, loaded at most once per request. The booking path
+    (appointment_service and the appointment routes) shares it instead of
+    each step calling Service.query.get.
+
+    Returns:
+        Service or None
+    """
+    try:
+        service_id = int(service_id)
+    except (TypeError, ValueError):
+        return None
+
+    services = g.setdefault('resolved_services', {})
+    if service_id not in services:
+        services[service_id] = db.session.get(Service, service_id)
+    return services[service_id]
@@ -0,0 +1,224 @@
+"""
+Customers
+Appointments linked to one customer row per normalized phone number
+
+A booking upserts its customer on phone_normalized (one statement, so two
+bookings from a new number at the same moment still get one customer) and
+stores customer_id on the appointment. The customer keeps the name, phone
+and email of the latest booking. "All bookings for this customer" is then
+the customer_id index on appointments and appointments_archive.
+
+Appointments also carry user_id, the client account they belong to: set
+when a logged-in client books, and linked by email once a client verifies
+it. Client views filter on that index instead of matching names.
+
+`flask customers backfill` links appointments that have no customer or
+account yet (after bulk loads that bypass the routes), and has the
+typeahead search rebuild its name index.
+"""
+from datetime import datetime
+from sqlalchemy import select, update, func, case, Table, MetaData, Column, Integer, String
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models import Appointment, AppointmentArchive, Customer, Service, User
+from app.services.archive_service import appointment_rows
+from app.services.search_service import invalidate_name_index
+from app.utils.validators import normalize_phone
+
+BATCH_SIZE = 1000
+
+
+def customer_to_dict(customer):
+    return {
+        'id': customer.id,
+        'name': customer.name,
+        'phone': customer.phone,
+        'email': customer.email,
+        'created_at': customer.created_at.isoformat() if customer.created_at else None,
+        'updated_at': customer.updated_at.isoformat() if customer.updated_at else None
+    }
+
+
+def clean_email(email):
+    return email.strip().lower() if email and email.strip() else None
+
+
+def upsert_statement(connection, rows):
+    """
+    INSERT customers; on a known phone the newer of the two rows decides
+    name, phone and email (an empty email never replaces one we have)
+    """
+    table = Customer.__table__
+    dialect_insert = sqlite.insert if connection.dialect.name == 'sqlite' else postgresql.insert
+    statement = dialect_insert(table).values(rows)
+    new = statement.excluded
+    newer = func.coalesce(new.updated_at >= table.c.updated_at, True)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.phone_normalized],
+        set_={
+            'name': case((newer, new.name), else_=table.c.name),
+            'phone': case((newer, new.phone), else_=table.c.phone),
+            'email': case((newer, func.coalesce(new.email, table.c.email)), else_=func.coalesce(table.c.email, new.email)),
+            'created_at': case((new.created_at < table.c.created_at, new.created_at), else_=table.c.created_at),
+            'updated_at': case((newer, new.updated_at), else_=table.c.updated_at)
+        }
+    )
+
+
+def upsert_customer(connection, name, phone, email=None):
+    """
+    Customer id for this phone number, creating or refreshing the customer
+
+    Returns:
+        int or None: None when the phone number has too few digits
+    """
+    normalized = normalize_phone(phone)
+    if not normalized:
+        return None
+    now = datetime.utcnow()
+    statement = upsert_statement(connection, [{
+        'phone_normalized': normalized,
+        'phone': phone,
+        'name': name,
+        'email': clean_email(email),
+        'created_at': now,
+        'updated_at': now
+    }])
+    return connection.execute(statement.returning(Customer.__table__.c.id)).scalar_one()
+
+
+def link_customer(appointment):
+    """Set appointment.customer_id from its customer name, phone and email"""
+    appointment.customer_id = upsert_customer(
+        db.session.connection(), appointment.customer_name, appointment.customer_phone, appointment.customer_email
+    )
+    return appointment.customer_id
+
+
+def backfill(connection):
+    """
+    Create customers for the appointments (hot and archived) that have none and link them,
+    oldest booking first so each customer ends up with the latest name and email
+
+    Returns:
+        tuple: (customers created or refreshed, appointments linked)
+    """
+    unlinked = appointment_rows(
+        ('id', 'customer_name', 'customer_phone', 'customer_email', 'created_at'),
+        lambda table: [table.c.customer_id.is_(None)]
+    )
+    result = connection.execute(
+        select(unlinked).order_by(unlinked.c.created_at, unlinked.c.id),
+        execution_options={'yield_per': BATCH_SIZE}
+    )
+    customers = {}
+    phones = {}
+    now = datetime.utcnow()
+    for row in result:
+        normalized = normalize_phone(row.customer_phone)
+        if not normalized:
+            continue
+        phones[row.customer_phone] = normalized
+        known = customers.get(normalized)
+        customers[normalized] = {
+            'phone_normalized': normalized,
+            'phone': row.customer_phone,
+            'name': row.customer_name,
+            'email': clean_email(row.customer_email) or (known['email'] if known else None),
+            'created_at': known['created_at'] if known else (row.created_at or now),
+            'updated_at': row.created_at or now
+        }
+    if not customers:
+        return 0, 0
+
+    rows = list(customers.values())
+    ids = {}
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        connection.execute(upsert_statement(connection, batch))
+        ids.update(connection.execute(select(Customer.phone_normalized, Customer.id).where(
+            Customer.phone_normalized.in_([row['phone_normalized'] for row in batch])
+        )).all())
+
+    # Raw phone -> customer id, then one correlated UPDATE per table
+    phone_map = Table('customer_phone_map', MetaData(),
+                      Column('phone', String(20), primary_key=True),
+                      Column('customer_id', Integer, nullable=False),
+                      prefixes=['TEMPORARY'])
+    phone_map.create(connection)
+    mapping = [{'phone': phone, 'customer_id': ids[normalized]} for phone, normalized in phones.items()]
+    for start in range(0, len(mapping), BATCH_SIZE):
+        connection.execute(phone_map.insert(), mapping[start:start + BATCH_SIZE])
+
+    linked = 0
+    for table in (Appointment.__table__, AppointmentArchive.__table__):
+        customer_id = select(phone_map.c.customer_id).where(phone_map.c.phone == table.c.customer_phone)
+        linked += connection.execute(update(table).where(
+            table.c.customer_id.is_(None), customer_id.exists()
+        ).values(customer_id=customer_id.scalar_subquery())).rowcount
+    phone_map.drop(connection)
+    # Backfilled customers keep their historical updated_at, which the search index's top-ups skip
+    invalidate_name_index()
+    return len(customers), linked
+
+
+def link_user_appointments(connection, user=None):
+    """
+    Give unowned appointments (hot and archived) to the verified client account with
+    their email, for all clients or one. Bookings made while logged in are linked at booking.
+
+    Returns:
+        int: Appointments linked
+    """
+    clients = select(User.id).where(User.role == 'client', User.email_verified.is_(True))
+    if user is not None:
+        clients = clients.where(User.id == user.id)
+
+    linked = 0
+    for table in (Appointment.__table__, AppointmentArchive.__table__):
+        owner = clients.where(User.email == func.lower(table.c.customer_email))
+        linked += connection.execute(update(table).where(
+            table.c.user_id.is_(None), table.c.customer_email.isnot(None), owner.exists()
+        ).values(user_id=owner.scalar_subquery())).rowcount
+    return linked
+
+
+def find_customers(phone=None, email=None):
+    """Customers with this phone number (normalized) or email, newest first"""
+    query = Customer.query
+    if phone:
+        query = query.filter(Customer.phone_normalized == normalize_phone(phone))
+    if email:
+        query = query.filter(Customer.email == clean_email(email))
+    return query.order_by(Customer.updated_at.desc()).limit(50).all()
+
+
+def customer_history(customer_id):
+    """
+    All appointments of a customer, archived ones included, newest first
+
+    Returns:
+        list: Appointment dicts with service name and an "archived" flag
+    """
+    rows = appointment_rows(
+        ('id', 'reference_number', 'service_id', 'appointment_date', 'appointment_time', 'status',
+         'customer_name', 'payment_verification_status', 'created_at'),
+        lambda table: [table.c.customer_id == customer_id],
+        mark_archived=True
+    )
+    query = select(rows, Service.name.label('service_name')).join(Service, Service.id == rows.c.service_id).order_by(
+        rows.c.appointment_date.desc(), rows.c.appointment_time.desc()
+    )
+    return [{
+        'id': row.id,
+        'reference_number': row.reference_number,
+        'customer_name': row.customer_name,
+        'service_id': row.service_id,
+        'service_name': row.service_name,
+        'appointment_date': str(row.appointment_date),
+        'appointment_time': str(row.appointment_time),
+        'status': row.status,
+        'payment_verification_status': row.payment_verification_status,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+        'archived': bool(row.archived)
+    } for row in db.session.execute(query)]
@@ -0,0 +1,164 @@
+"""
+Dashboard Summary
+Constant-size counts for the staff dashboards, however long the booking history
+
+All-time totals per status come from appointment_status_counts, kept in step
+by session flush hooks inside the writing transaction (appointment created,
+status changed, appointment deleted). Each flush adds its deltas to one of
+COUNTER_BUCKETS rows per status picked at random, so concurrent bookings
+rarely wait on the same row lock; reads sum the buckets. Archiving old
+appointments leaves them counted. Today's counts
+and the coming week are GROUP BY queries on the appointment_date index, so
+they only read those days.
+
+Bulk loads that bypass the session (seed scripts, raw SQL) must run
+`flask dashboard recount` afterwards.
+"""
+import random
+from collections import Counter
+from datetime import timedelta
+from sqlalchemy import event, inspect, func, select, delete, insert, literal, cast, BigInteger
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models import Appointment, AppointmentStatusCount, Service, User
+from app.services.archive_service import appointment_rows
+
+PENDING_KEY = 'status_count_deltas'
+COUNTER_BUCKETS = 16  # rows per status; changing it needs no migration (reads sum whatever exists)
+STATUSES = ('pending', 'confirmed', 'completed', 'cancelled')
+ROLES = ('admin', 'manager', 'receptionist', 'client')
+UPCOMING_DAYS = 7
+PREVIEW_SIZE = 5
+
+
+def stored_status(appointment):
+    """Status as it is in the database (before any unflushed change)"""
+    history = inspect(appointment).attrs.status.history
+    if history.deleted:
+        return history.deleted[0] or 'pending'
+    return appointment.status or 'pending'
+
+
+def collect_status_deltas(session, flush_context, instances):
+    """before_flush: net change of each status count in this flush"""
+    deltas = session.info.setdefault(PENDING_KEY, Counter())
+    for obj in session.new:
+        if isinstance(obj, Appointment):
+            deltas[obj.status or 'pending'] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Appointment):
+            deltas[stored_status(obj)] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, Appointment) and inspect(obj).attrs.status.history.has_changes():
+            deltas[stored_status(obj)] -= 1
+            deltas[obj.status or 'pending'] += 1
+
+
+def apply_status_deltas(session, flush_context):
+    """after_flush: add the deltas in the same transaction as the write"""
+    deltas = session.info.pop(PENDING_KEY, None)
+    bucket = random.randrange(COUNTER_BUCKETS)
+    rows = [{'status': status, 'bucket': bucket, 'count': delta}
+            for status, delta in sorted((deltas or {}).items()) if delta]
+    if not rows:
+        return
+
+    connection = session.connection()
+    table = AppointmentStatusCount.__table__
+    dialect_insert = sqlite.insert if connection.dialect.name == 'sqlite' else postgresql.insert
+    statement = dialect_insert(table).values(rows)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.status, table.c.bucket],
+        set_={'count': table.c.count + statement.excluded['count']}
+    ))
+
+
+def discard_status_deltas(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
+
+
+def init_dashboard_counters(session_class):
+    """Register the flush hooks that keep the status counts in step with writes"""
+    if not event.contains(session_class, 'before_flush', collect_status_deltas):
+        event.listen(session_class, 'before_flush', collect_status_deltas)
+        event.listen(session_class, 'after_flush', apply_status_deltas)
+        event.listen(session_class, 'after_soft_rollback', discard_status_deltas)
+
+
+def recount(connection):
+    """
+    Recompute the status counts from the appointments table and its archive
+    (into bucket 0; later writes spread over the other buckets again)
+
+    Returns:
+        dict: {status: count}
+    """
+    status = func.coalesce(appointment_rows(('status',)).c.status, 'pending')
+    connection.execute(delete(AppointmentStatusCount.__table__))
+    connection.execute(insert(AppointmentStatusCount.__table__).from_select(
+        ['status', 'bucket', 'count'],
+        select(status, literal(0), func.count()).group_by(status)
+    ))
+    return dict(connection.execute(status_totals()).all())
+
+
+def status_totals():
+    """(status, count) per status, summed over its buckets"""
+    total = cast(func.sum(AppointmentStatusCount.count), BigInteger)  # SUM(bigint) is numeric on PostgreSQL
+    return select(AppointmentStatusCount.status, total).group_by(AppointmentStatusCount.status)
+
+
+def status_breakdown(rows):
+    """Every known status (0 if absent) plus any other status found"""
+    counts = dict.fromkeys(STATUSES, 0)
+    for status, count in rows:
+        counts[status or 'pending'] = counts.get(status or 'pending', 0) + count
+    return {'total': sum(counts.values()), 'by_status': counts}
+
+
+def dashboard_summary(day, include_users=False):
+    """
+    Counts shown on the staff dashboards for a given "today"
+
+    Returns:
+        dict: appointments (all time), today, upcoming (next UPCOMING_DAYS days, with
+              a short preview), active services and, for admins, users by role
+    """
+    totals = db.session.execute(status_totals()).all()
+    today = db.session.query(Appointment.status, func.count()).filter(
+        Appointment.appointment_date == day
+    ).group_by(Appointment.status).all()
+
+    upcoming = Appointment.query.filter(
+        Appointment.appointment_date.between(day, day + timedelta(days=UPCOMING_DAYS)),
+        Appointment.status != 'cancelled'
+    )
+    preview = upcoming.join(Service).with_entities(
+        Appointment.id, Appointment.customer_name, Service.name, Appointment.appointment_date,
+        Appointment.appointment_time, Appointment.status
+    ).order_by(Appointment.appointment_date, Appointment.appointment_time).limit(PREVIEW_SIZE).all()
+
+    summary = {
+        'date': str(day),
+        'appointments': status_breakdown(totals),
+        'today': status_breakdown(today),
+        'upcoming': {
+            'days': UPCOMING_DAYS,
+            'total': upcoming.count(),
+            'preview': [{
+                'id': row.id,
+                'customer_name': row.customer_name,
+                'service_name': row.name,
+                'appointment_date': str(row.appointment_date),
+                'appointment_time': str(row.appointment_time),
+                'status': row.status
+            } for row in preview]
+        },
+        'services': Service.query.filter(Service.is_active.is_(True)).count()
+    }
+
+    if include_users:
+        by_role = dict.fromkeys(ROLES, 0)
+        by_role.update(db.session.query(User.role, func.count()).group_by(User.role).all())
+        summary['users'] = {'total': sum(by_role.values()), 'by_role': by_role}
+    return summary
@@ -0,0 +1,111 @@
+"""
+Appointment Export
+Full appointment exports (CSV or NDJSON) streamed from a server-side cursor
+
+Rows are read YIELD_PER at a time (a named cursor on PostgreSQL) and each
+batch is written out as one chunk of the response, so memory stays flat
+however many appointments are exported. Archived appointments are included
+and marked as such. service_price and service_duration are what the booking
+was charged (charged_price, booked_minutes), as in the rollups, so a later
+list-price change does not re-price past rows.
+"""
+import csv
+import io
+import json
+from decimal import Decimal
+from sqlalchemy import select, func
+from app import db
+from app.models import Service
+from app.services.archive_service import appointment_rows
+
+YIELD_PER = 2000
+APPOINTMENT_FIELDS = (
+    'id', 'reference_number', 'appointment_date', 'appointment_time', 'status',
+    'customer_name', 'customer_phone', 'customer_email', 'service_id',
+    'payment_amount', 'payment_verification_status', 'payment_verified_at', 'payment_verified_by',
+    'payment_verification_notes', 'created_by', 'created_at', 'customer_id', 'user_id'
+)
+CHARGED_FIELDS = ('charged_price', 'booked_minutes')
+SERVICE_FIELDS = ('service_name', 'service_category', 'service_price', 'service_duration')
+FIELDS = APPOINTMENT_FIELDS[:9] + SERVICE_FIELDS + APPOINTMENT_FIELDS[9:] + ('archived',)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_query(first=None, last=None, statuses=None, service_id=None):
+    """Export rows (appointment, service and payment fields) in date and time order"""
+    def conditions(table):
+        found = []
+        if first is not None:
+            found.append(table.c.appointment_date >= first)
+        if last is not None:
+            found.append(table.c.appointment_date <= last)
+        if statuses:
+            found.append(table.c.status.in_(statuses))
+        if service_id is not None:
+            found.append(table.c.service_id == service_id)
+        return found
+
+    rows = appointment_rows(APPOINTMENT_FIELDS + CHARGED_FIELDS, conditions, mark_archived=True)
+    query = select(
+        *[rows.c[name] for name in APPOINTMENT_FIELDS[:9]],
+        Service.name.label('service_name'),
+        Service.category.label('service_category'),
+        func.coalesce(rows.c.charged_price, Service.price).label('service_price'),
+        func.coalesce(rows.c.booked_minutes, Service.duration_minutes).label('service_duration'),
+        *[rows.c[name] for name in APPOINTMENT_FIELDS[9:]],
+        rows.c.archived
+    ).join(Service, Service.id == rows.c.service_id)
+    return query.order_by(rows.c.appointment_date, rows.c.appointment_time, rows.c.id)
+
+
+def plain_value(value):
+    """JSON-friendly value: dates and times as ISO strings, amounts as numbers"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return float(value)  # Decimal
+
+
+def csv_cell(value):
+    """Text cell that a spreadsheet will not run as a formula"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, Decimal):
+        return str(value)  # keep the cents as stored
+    value = plain_value(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_batches(query):
+    """Lists of at most YIELD_PER rows, read from a server-side cursor"""
+    result = db.session.execute(query, execution_options={'yield_per': YIELD_PER})
+    try:
+        for batch in result.partitions():
+            yield batch
+    finally:
+        result.close()
+
+
+def csv_chunks(query):
+    """Header line, then one CSV chunk per batch of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    yield buffer.getvalue()
+    for batch in stream_batches(query):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([csv_cell(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(query):
+    """One JSON object per line, one chunk per batch of rows"""
+    for batch in stream_batches(query):
+        yield ''.join(
+            json.dumps(dict(zip(FIELDS, (plain_value(value) for value in row))), separators=(',', ':')) + '\n'
+            for row in batch
+        )
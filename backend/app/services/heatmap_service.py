@@ -0,0 +1,223 @@
+"""
+Utilization Heatmaps
+Occupancy by weekday × hour and by service × month, computed with NumPy
+
+Appointments (date, start, service, duration), archived ones included, are
+fetched as plain columns in one query and turned into arrays. The duration
+is the one booked (booked_minutes), as in the daily rollups, so the heatmap
+and the utilization report agree after a service's duration changes. For
+every booking and every hour of the day the overlap in minutes is
+min(end, hour end) - max(start, hour start), clipped at 0: one
+(bookings × 24) array operation instead of a loop over minutes. Opening
+minutes per day come from the compiled calendar (weekly hours plus date
+overrides) and go through the same overlap formula.
+
+Utilization is booked minutes / opening minutes, with every service counted
+as its own chair. Matrices are sent as uint8 (0-200 = 0-100% in half-percent
+steps, 255 = closed) in base64, which is 168 bytes for a whole weekday × hour
+grid, or as plain nested lists with ?format=json.
+"""
+import base64
+from datetime import date, timedelta
+from sqlalchemy import select, type_coerce, func, String
+from app import db
+from app.models import Service
+from app.services.archive_service import appointment_rows
+from app.services.calendar_service import get_calendar
+
+# Optional NumPy support (heatmaps are unavailable without it)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+SCALE = 200  # uint8 value for 100% utilization
+CLOSED = 255  # uint8 value where there were no opening minutes
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday (Monday = 0)
+
+
+def hour_overlap(starts, ends):
+    """
+    Minutes of each [start, end) interval that fall in each hour of the day
+
+    Returns:
+        ndarray: shape (len(starts), 24)
+    """
+    hour_starts = np.arange(24, dtype=np.int32) * 60
+    overlap = (np.minimum(ends[:, None], hour_starts + 60) - np.maximum(starts[:, None], hour_starts))
+    return np.clip(overlap, 0, 60)
+
+
+def day_numbers(values):
+    """Days since 1970-01-01 from dates (PostgreSQL) or ISO date strings (SQLite)"""
+    if values and isinstance(values[0], str):
+        return np.array(values, dtype='datetime64[D]').astype(np.int32)
+    return np.fromiter((d.toordinal() for d in values), dtype=np.int32, count=len(values)) - EPOCH_ORDINAL
+
+
+def minute_numbers(values):
+    """Minutes since midnight from times (PostgreSQL) or HH:MM:SS strings (SQLite)"""
+    if values and isinstance(values[0], str):
+        digits = np.array(values, dtype='S5').view(np.uint8).reshape(-1, 5).astype(np.int32) - ord('0')
+        return (digits[:, 0] * 10 + digits[:, 1]) * 60 + digits[:, 3] * 10 + digits[:, 4]
+    return np.fromiter((t.hour * 60 + t.minute for t in values), dtype=np.int32, count=len(values))
+
+
+def load_bookings(first, last, service_id=None):
+    """
+    Bookings in the range as columns: day numbers (since 1970-01-01), start minute,
+    service id and duration. Cancelled appointments are left out.
+    """
+    def conditions(table):
+        found = [table.c.appointment_date.between(first, last), table.c.status != 'cancelled']
+        if service_id is not None:
+            found.append(table.c.service_id == service_id)
+        return found
+
+    # Hot and archived rows; raw column values skip building date/time objects where the driver returns text
+    rows = appointment_rows(('appointment_date', 'appointment_time', 'service_id', 'booked_minutes'), conditions)
+    query = select(
+        type_coerce(rows.c.appointment_date, String), type_coerce(rows.c.appointment_time, String),
+        rows.c.service_id, func.coalesce(rows.c.booked_minutes, Service.duration_minutes)
+    ).join(Service, Service.id == rows.c.service_id)
+
+    rows = db.session.connection().execute(query).all()
+    if not rows:
+        empty = np.zeros(0, dtype=np.int32)
+        return empty, empty, empty, empty
+    dates, times, service_ids, durations = zip(*rows)
+    return (day_numbers(dates), minute_numbers(times),
+            np.array(service_ids, dtype=np.int32), np.array(durations, dtype=np.int32))
+
+
+def load_opening(first, last):
+    """
+    Opening interval of every day in the range as columns (closed days open and close at 0)
+
+    Returns:
+        tuple: (day numbers, open minute, close minute)
+    """
+    calendar = get_calendar()
+    count = (last - first).days + 1
+    opens = np.zeros(count, dtype=np.int32)
+    closes = np.zeros(count, dtype=np.int32)
+    for index in range(count):
+        open_time, close_time, reason = calendar.open_interval(first + timedelta(days=index))
+        if not reason:
+            opens[index] = open_time.hour * 60 + open_time.minute
+            closes[index] = close_time.hour * 60 + close_time.minute
+    days = np.arange(count, dtype=np.int32) + (first.toordinal() - EPOCH_ORDINAL)
+    return days, opens, closes
+
+
+def weekday_of(days):
+    return (days + EPOCH_WEEKDAY) % 7
+
+
+def month_of(days):
+    """Months since 1970-01 for day numbers"""
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int32)
+
+
+def sum_by_weekday(days, overlap):
+    """Add up (n × 24) hour overlaps into a (7 × 24) matrix by weekday"""
+    cells = (weekday_of(days)[:, None] * 24 + np.arange(24)).ravel()
+    return np.bincount(cells, weights=overlap.ravel(), minlength=7 * 24).reshape(7, 24).astype(np.int64)
+
+
+def weekday_hour_matrix(bookings, opening, chairs):
+    """
+    Booked and available minutes per weekday × hour
+
+    Returns:
+        tuple: (booked, available), each shape (7, 24)
+    """
+    days, starts, _, durations = bookings
+    booked = sum_by_weekday(days, hour_overlap(starts, starts + durations))
+
+    open_days, opens, closes = opening
+    available = sum_by_weekday(open_days, hour_overlap(opens, closes))
+    return booked, available * chairs
+
+
+def service_month_matrix(bookings, opening, service_ids, first_month, months):
+    """
+    Booked and available minutes per service × month (each service is one chair)
+
+    Returns:
+        tuple: (booked shape (services, months), available shape (months,))
+    """
+    days, _, booking_services, durations = bookings
+    booked = np.zeros((len(service_ids), months), dtype=np.int64)
+    if len(days) and service_ids:
+        # Row of each booking's service (-1 for services not in the matrix)
+        row_of = np.full(max(max(service_ids), int(booking_services.max())) + 1, -1, dtype=np.int64)
+        row_of[service_ids] = np.arange(len(service_ids))
+        rows = row_of[booking_services]
+        known = rows >= 0
+        cells = rows[known] * months + month_of(days)[known] - first_month
+        booked += np.bincount(cells, weights=durations[known], minlength=booked.size).reshape(booked.shape).astype(np.int64)
+
+    open_days, opens, closes = opening
+    available = np.bincount(month_of(open_days) - first_month, weights=closes - opens, minlength=months)
+    return booked, available.astype(np.int64)
+
+
+def encode(booked, available, as_json=False):
+    """
+    Utilization matrix as a compact uint8 base64 payload, or nested lists (None = closed)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(available > 0, booked / np.maximum(available, 1), np.nan)
+    if as_json:
+        return {
+            'shape': list(ratio.shape),
+            'values': [[None if np.isnan(v) else round(float(v), 4) for v in row] for row in np.atleast_2d(ratio)]
+        }
+    values = np.where(np.isnan(ratio), CLOSED, np.clip(np.rint(ratio * SCALE), 0, SCALE)).astype(np.uint8)
+    return {
+        'shape': list(ratio.shape),
+        'dtype': 'uint8',
+        'scale': SCALE,
+        'closed': CLOSED,
+        'data': base64.b64encode(values.tobytes()).decode('ascii')
+    }
+
+
+def utilization_heatmaps(first, last, service_id=None, as_json=False):
+    """
+    Weekday × hour and service × month utilization for a date range
+
+    Returns:
+        dict: weekday_hour (rows Monday..Sunday, columns hours 0-23) and service_month
+              (rows = services, columns = months), each encoded by encode()
+    """
+    services = Service.query.with_entities(Service.id, Service.name).filter(Service.is_active.is_(True))
+    if service_id is not None:
+        services = Service.query.with_entities(Service.id, Service.name).filter(Service.id == service_id)
+    services = services.order_by(Service.id).all()
+    service_ids = [s.id for s in services]
+
+    bookings = load_bookings(first, last, service_id)
+    opening = load_opening(first, last)
+
+    first_month = int(month_of(np.array([opening[0][0]]))[0])
+    months = int(month_of(np.array([opening[0][-1]]))[0]) - first_month + 1
+
+    booked, available = weekday_hour_matrix(bookings, opening, max(len(service_ids), 1))
+    service_booked, month_available = service_month_matrix(bookings, opening, service_ids, first_month, months)
+
+    month_labels = [str(np.datetime64(first_month + i, 'M')) for i in range(months)]
+    return {
+        'from': str(first),
+        'to': str(last),
+        'bookings': int(len(bookings[0])),
+        'weekday_hour': encode(booked, available, as_json),
+        'service_month': dict(
+            encode(service_booked, np.broadcast_to(month_available, service_booked.shape), as_json),
+            services=[{'id': s.id, 'name': s.name} for s in services],
+            months=month_labels
+        )
+    }
@@ -0,0 +1,170 @@
+"""
+Reference Numbers
+Collision-free appointment references: APT-YYYYMMDD-XXXXC
+
+Every booking day has a counter row in reference_counters. A worker reserves
+a block of REFERENCE_BLOCK_SIZE values with one atomic upsert in a short
+transaction of its own and hands them out from memory, so two bookings never
+get the same counter value - across threads, workers or hosts - and a booking
+never has to retry on the unique constraint.
+
+The counter value goes through a keyed permutation (a small Feistel network)
+before it is encoded, so references are not sequential and one customer's
+reference does not reveal the next one. A permutation is a bijection, so
+distinct counter values still give distinct references.
+
+XXXX is Crockford base32 (no I, L, O or U) and C is a Luhn mod 32 check
+character, which catches any single mistyped character and most swapped
+neighbours. The first 2^20 (about a million) bookings of a day get four
+characters, later ones six (APT-YYYYMMDD-XXXXXXC, still 20 characters).
+Older references (APT-YYYYMMDD-XXXX, hex) are 17 characters and never equal
+a new one.
+
+Keep REFERENCE_NUMBER_SECRET stable: a different key is a different
+permutation, which could map a new counter value onto a reference already
+handed out that day.
+"""
+import hashlib
+import os
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models import ReferenceCounter
+from app.utils import metrics
+from app.utils.version_stamp import database_key
+
+PREFIX = 'APT'
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'  # Crockford base32
+SHORT_BITS = 20  # 4 characters
+LONG_BITS = 30  # 6 characters
+FEISTEL_ROUNDS = 4
+
+_VALUES = {char: value for value, char in enumerate(ALPHABET)}
+
+
+def check_character(body):
+    """Luhn mod 32 check character for a base32 string"""
+    total = 0
+    for position, char in enumerate(reversed(body)):
+        value = _VALUES[char]
+        if position % 2 == 0:
+            value *= 2
+            value = value // 32 + value % 32
+        total += value
+    return ALPHABET[-total % 32]
+
+
+def permute(value, bits, key):
+    """Keyed bijection on [0, 2**bits) - a balanced Feistel network, so bits must be even"""
+    half = bits // 2
+    mask = (1 << half) - 1
+    left, right = value >> half, value & mask
+    for round_number in range(FEISTEL_ROUNDS):
+        digest = hashlib.blake2b(bytes([round_number]) + right.to_bytes(4, 'big'),
+                                 key=key, digest_size=4).digest()
+        left, right = right, left ^ (int.from_bytes(digest, 'big') & mask)
+    return (left << half) | right
+
+
+def to_base32(value, length):
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def format_reference(day_str, counter, key):
+    """
+    Reference for the counter-th booking (from 0) of a day
+
+    Returns:
+        str: e.g. APT-20260115-7KQ2M
+    """
+    if counter < 1 << SHORT_BITS:
+        body = to_base32(permute(counter, SHORT_BITS, key), SHORT_BITS // 5)
+    elif counter < (1 << SHORT_BITS) + (1 << LONG_BITS):
+        body = to_base32(permute(counter - (1 << SHORT_BITS), LONG_BITS, key), LONG_BITS // 5)
+    else:
+        raise ValueError(f'Reference numbers for {day_str} are exhausted')
+    return f'{PREFIX}-{day_str}-{body}{check_character(body)}'
+
+
+def is_valid_reference(reference):
+    """True if reference has the counter-based format and a matching check character"""
+    parts = reference.split('-')
+    if len(parts) != 3 or parts[0] != PREFIX or len(parts[1]) != 8 or not parts[1].isdigit():
+        return False
+    code = parts[2]
+    if len(code) not in (SHORT_BITS // 5 + 1, LONG_BITS // 5 + 1) or any(c not in _VALUES for c in code):
+        return False
+    return check_character(code[:-1]) == code[-1]
+
+
+def secret_key():
+    return hashlib.sha256(current_app.config['REFERENCE_NUMBER_SECRET'].encode('utf-8')).digest()
+
+
+def reserve_block(scope, size):
+    """
+    Take the next `size` values of a counter with one atomic upsert. It commits
+    on its own connection right away, so the counter row is locked only for
+    that statement, not for the rest of the booking.
+
+    Returns:
+        tuple: (first value, end value (exclusive))
+    """
+    engine = db.engine
+    table = ReferenceCounter.__table__
+    dialect_insert = sqlite.insert if engine.dialect.name == 'sqlite' else postgresql.insert
+    statement = dialect_insert(table).values(scope=scope, next_value=size).on_conflict_do_update(
+        index_elements=[table.c.scope],
+        set_={'next_value': table.c.next_value + size}
+    ).returning(table.c.next_value)
+
+    with engine.begin() as connection:
+        end = connection.execute(statement).scalar_one()
+    metrics.increment('reference_blocks_reserved')
+    return end - size, end
+
+
+class BlockAllocator:
+    """
+    Hands out the values of the current block; one per process, with a
+    current block per database (a block is only reserved in its own database)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._blocks = {}  # database -> [scope, next value, end]
+
+    def next_value(self, scope, size, database):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked with blocks: the parent may hand out the same values
+                self._pid = os.getpid()
+                self._blocks.clear()
+            block = self._blocks.get(database)
+            if block is None or block[0] != scope or block[1] >= block[2]:
+                block = self._blocks[database] = [scope, *reserve_block(scope, size)]
+            value = block[1]
+            block[1] += 1
+            return value
+
+
+_allocator = BlockAllocator()
+
+
+def next_reference(now=None):
+    """
+    New reference number for a booking made at `now` (UTC, defaults to the current time)
+
+    Returns:
+        str: Reference number, unique without checking the appointments table
+    """
+    day_str = (now or datetime.utcnow()).strftime('%Y%m%d')
+    counter = _allocator.next_value(f'{PREFIX}-{day_str}', current_app.config['REFERENCE_BLOCK_SIZE'], database_key())
+    return format_reference(day_str, counter, secret_key())
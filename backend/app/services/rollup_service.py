@@ -0,0 +1,283 @@
+"""
+Daily Rollups
+Revenue, bookings and utilization per service and day, without scanning appointments
+
+daily_service_rollups holds one row per (date, service). Session flush hooks
+keep it in step inside the writing transaction: before the flush the stored
+state of each changed appointment is read (and locked) and its contribution
+subtracted; after the flush its new state is read back and added. Creating,
+moving, cancelling, completing, deleting and payment verification are
+therefore all handled the same way.
+
+Revenue and booked minutes use the price and duration stored on each
+appointment when it was booked (or moved to another service), so a change
+to a service's list price or duration only applies to bookings made after
+it and never rewrites past rollups. Rows loaded without them fall back to
+the service's current values.
+
+`flask rollups backfill` recomputes them from the appointments table and its
+archive (after bulk loads that bypass the session, or for a date range).
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from sqlalchemy import event, inspect, select, delete, insert, func, case
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models import Appointment, Service, DailyServiceRollup
+from app.services.calendar_service import get_open_interval
+from app.services.archive_service import appointment_rows
+
+PENDING_KEY = 'rollup_pending'
+FIELDS = ('bookings', 'completed', 'cancelled', 'revenue', 'deposits_verified', 'minutes_booked')
+APPOINTMENT_FIELDS = ('service_id', 'appointment_date', 'status', 'payment_verification_status', 'payment_amount',
+                      'charged_price', 'booked_minutes')
+
+
+def contribution_query():
+    """Appointment rows with what each one adds to its (date, service) rollup"""
+    status = func.coalesce(Appointment.status, 'pending')
+    return select(
+        Appointment.id,
+        Appointment.appointment_date,
+        Appointment.service_id,
+        status.label('status'),
+        Appointment.payment_verification_status,
+        Appointment.payment_amount,
+        func.coalesce(Appointment.charged_price, Service.price).label('price'),
+        func.coalesce(Appointment.booked_minutes, Service.duration_minutes).label('duration_minutes')
+    ).join(Service, Service.id == Appointment.service_id)
+
+
+def contribution(row):
+    completed = row.status == 'completed'
+    cancelled = row.status == 'cancelled'
+    verified = row.payment_verification_status == 'verified'
+    return {
+        'bookings': 1,
+        'completed': 1 if completed else 0,
+        'cancelled': 1 if cancelled else 0,
+        'revenue': Decimal(row.price) if completed else Decimal(0),
+        'deposits_verified': Decimal(row.payment_amount or 0) if verified else Decimal(0),
+        'minutes_booked': 0 if cancelled else row.duration_minutes
+    }
+
+
+def add_rows(pending, rows, sign):
+    for row in rows:
+        delta = pending['deltas'][(row.appointment_date, row.service_id)]
+        for field, value in contribution(row).items():
+            delta[field] = delta.get(field, 0) + sign * value
+
+
+def stamp_service_terms(session, appointment):
+    """Store the service's current price and duration on a new or moved appointment"""
+    service = session.get(Service, appointment.service_id) if appointment.service_id is not None else None
+    if service is not None:
+        appointment.charged_price = service.price
+        appointment.booked_minutes = service.duration_minutes
+
+
+def collect_rollup_changes(session, flush_context, instances):
+    """before_flush: subtract the stored state of every appointment this flush changes"""
+    pending = session.info.setdefault(PENDING_KEY, {'deltas': defaultdict(dict), 'changed': []})
+
+    old_ids = []
+    for obj in session.deleted:
+        if isinstance(obj, Appointment):
+            old_ids.append(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Appointment):
+            state = inspect(obj)
+            if state.attrs.service_id.history.has_changes():
+                stamp_service_terms(session, obj)
+            if any(state.attrs[field].history.has_changes() for field in APPOINTMENT_FIELDS):
+                old_ids.append(obj.id)
+                pending['changed'].append(obj)
+    for obj in session.new:
+        if isinstance(obj, Appointment):
+            if obj.charged_price is None:
+                stamp_service_terms(session, obj)
+            pending['changed'].append(obj)
+
+    if old_ids:
+        # Locked, so a concurrent change to the same appointment is counted after this one
+        rows = session.connection().execute(
+            contribution_query().where(Appointment.id.in_(old_ids)).with_for_update(of=Appointment)
+        ).all()
+        add_rows(pending, rows, -1)
+
+
+def apply_rollup_changes(session, flush_context):
+    """after_flush: add the new state and write the net deltas in the same transaction"""
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    connection = session.connection()
+
+    ids = [obj.id for obj in pending['changed'] if obj.id is not None and obj not in session.deleted]
+    if ids:
+        add_rows(pending, connection.execute(contribution_query().where(Appointment.id.in_(ids))).all(), 1)
+
+    rows = []
+    for (date_obj, service_id), delta in sorted(pending['deltas'].items()):
+        if any(delta.values()):
+            rows.append(dict({field: 0 for field in FIELDS}, date=date_obj, service_id=service_id, **delta))
+    if not rows:
+        return
+
+    table = DailyServiceRollup.__table__
+    dialect_insert = sqlite.insert if connection.dialect.name == 'sqlite' else postgresql.insert
+    statement = dialect_insert(table).values(rows)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.date, table.c.service_id],
+        set_={field: table.c[field] + statement.excluded[field] for field in FIELDS}
+    ))
+
+
+def discard_rollup_changes(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
+
+
+def init_rollups(session_class):
+    """Register the flush hooks that keep the rollups in step with writes"""
+    if not event.contains(session_class, 'before_flush', collect_rollup_changes):
+        event.listen(session_class, 'before_flush', collect_rollup_changes)
+        event.listen(session_class, 'after_flush', apply_rollup_changes)
+        event.listen(session_class, 'after_soft_rollback', discard_rollup_changes)
+
+
+def backfill(connection, first=None, last=None, service_ids=None):
+    """
+    Recompute rollups from the appointments table with one GROUP BY,
+    optionally limited to a date range and some services
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    def conditions(table):
+        found = []
+        if first is not None:
+            found.append(table.c.appointment_date >= first)
+        if last is not None:
+            found.append(table.c.appointment_date <= last)
+        if service_ids is not None:
+            found.append(table.c.service_id.in_(list(service_ids)))
+        return found
+
+    rollup_conditions = []
+    if first is not None:
+        rollup_conditions.append(DailyServiceRollup.date >= first)
+    if last is not None:
+        rollup_conditions.append(DailyServiceRollup.date <= last)
+    if service_ids is not None:
+        rollup_conditions.append(DailyServiceRollup.service_id.in_(list(service_ids)))
+    connection.execute(delete(DailyServiceRollup.__table__).where(*rollup_conditions))
+
+    # Archived appointments still count
+    rows = appointment_rows(APPOINTMENT_FIELDS, conditions)
+    status = func.coalesce(rows.c.status, 'pending')
+    completed = status == 'completed'
+    cancelled = status == 'cancelled'
+    verified = rows.c.payment_verification_status == 'verified'
+    aggregate = select(
+        rows.c.appointment_date,
+        rows.c.service_id,
+        func.count(),
+        func.sum(case((completed, 1), else_=0)),
+        func.sum(case((cancelled, 1), else_=0)),
+        func.sum(case((completed, func.coalesce(rows.c.charged_price, Service.price)), else_=0)),
+        func.sum(case((verified, func.coalesce(rows.c.payment_amount, 0)), else_=0)),
+        func.sum(case((cancelled, 0), else_=func.coalesce(rows.c.booked_minutes, Service.duration_minutes)))
+    ).join(Service, Service.id == rows.c.service_id).group_by(rows.c.appointment_date, rows.c.service_id)
+
+    result = connection.execute(insert(DailyServiceRollup.__table__).from_select(
+        ['date', 'service_id', *FIELDS], aggregate
+    ))
+    return result.rowcount
+
+
+def rollup_rows(first, last):
+    """Rollup rows of a date range as plain rows (no ORM objects)"""
+    columns = [getattr(DailyServiceRollup, field) for field in FIELDS]
+    return db.session.query(DailyServiceRollup.date, DailyServiceRollup.service_id, *columns).filter(
+        DailyServiceRollup.date.between(first, last)
+    )
+
+
+def totals(rows):
+    """Sum rollup rows into plain JSON numbers"""
+    summed = {field: 0 for field in FIELDS}
+    for row in rows:
+        for field in FIELDS:
+            summed[field] += getattr(row, field) or 0
+    summed['revenue'] = float(summed['revenue'])
+    summed['deposits_verified'] = float(summed['deposits_verified'])
+    return summed
+
+
+def open_minutes(day):
+    open_time, close_time, reason = get_open_interval(day)
+    if reason:
+        return 0
+    return (close_time.hour * 60 + close_time.minute) - (open_time.hour * 60 + open_time.minute)
+
+
+def utilization(minutes_booked, available_minutes):
+    return round(minutes_booked / available_minutes, 4) if available_minutes else None
+
+
+def daily_report(first, last, service_id=None):
+    """
+    Totals per day (all services, or one) read from the rollups only.
+    Utilization is booked minutes over opening minutes × services.
+
+    Returns:
+        list: One dict per day from first to last
+    """
+    query = rollup_rows(first, last)
+    if service_id is not None:
+        query = query.filter(DailyServiceRollup.service_id == service_id)
+        services = 1
+    else:
+        services = Service.query.filter(Service.is_active.is_(True)).count()
+
+    per_day = defaultdict(list)
+    for row in query:
+        per_day[row.date].append(row)
+
+    days = []
+    day = first
+    while day <= last:
+        entry = dict(date=str(day), **totals(per_day[day]))
+        entry['open_minutes'] = open_minutes(day)
+        entry['utilization'] = utilization(entry['minutes_booked'], entry['open_minutes'] * services)
+        days.append(entry)
+        day += timedelta(days=1)
+    return days
+
+
+def service_report(first, last):
+    """
+    Totals per service over a date range read from the rollups only
+
+    Returns:
+        list: One dict per service that has any rollup in the range
+    """
+    per_service = defaultdict(list)
+    for row in rollup_rows(first, last).filter(DailyServiceRollup.bookings > 0):  # deletes leave zero rows
+        per_service[row.service_id].append(row)
+    names = dict(Service.query.with_entities(Service.id, Service.name).filter(Service.id.in_(list(per_service))).all())
+
+    available = 0
+    day = first
+    while day <= last:
+        available += open_minutes(day)
+        day += timedelta(days=1)
+
+    report = []
+    for service_id in sorted(per_service):
+        entry = dict(service_id=service_id, service_name=names.get(service_id), **totals(per_service[service_id]))
+        entry['utilization'] = utilization(entry['minutes_booked'], available)
+        report.append(entry)
+    return report
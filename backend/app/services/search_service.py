@@ -0,0 +1,393 @@
+"""
+Typeahead Search
+Ranked appointment search for the reception desk, on every keystroke
+
+A query is matched three ways, each on an index:
+- reference number prefix (upper-cased) on appointments.reference_number
+- phone prefix on customers.phone_normalized, in the canonical form normalize_phone
+  stores ("0911…" is looked up as "2519…", a bare "911…" as both "911…" and "2519…")
+- customer name by trigram similarity
+
+Names are compared the way pg_trgm does it: each word is lower-cased, padded
+("  sara "), and cut into trigrams. A name matches when it contains at least
+SIMILARITY_THRESHOLD of the query's trigrams, so "sar" already finds "Sara"
+and "Sarah". On PostgreSQL that is the `<%` (word similarity) operator on a
+GIN trigram index over lower(customers.name). SQLite has no trigram index,
+so every worker keeps a NameIndex in memory instead: trigram -> distinct
+names -> customer ids. It is built on first use and then topped up with the
+customers updated since the last look (the updated_at index; bookings set
+it to the current time); `flask customers backfill` bumps its stamp so bulk
+loads rebuild it.
+
+Customer matches bring their appointments, archived ones included:
+upcoming ones first (soonest first), then the latest past ones, at most
+PER_CUSTOMER each. Results are ranked by score: exact reference, exact
+phone, prefixes, then names by similarity.
+"""
+import bisect
+import math
+import re
+import threading
+import time as timer
+from array import array
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, func, case, literal, Boolean
+from app import db
+from app.models import Appointment, AppointmentArchive, Customer, Service
+from app.services.archive_service import appointment_rows
+from app.utils import version_stamp
+from app.utils.db_routing import use_primary
+from app.utils.validators import DEFAULT_COUNTRY_CODE, NATIONAL_NUMBER_LENGTH
+
+SEARCH_STAMP = 'customer_search'
+SIMILARITY_THRESHOLD = 0.6  # pg_trgm's default word_similarity_threshold
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 100
+MIN_PHONE_DIGITS = 3
+PER_CUSTOMER = 3
+REFRESH_INTERVAL = 1.0  # seconds between top-ups of the in-process index
+REFRESH_OVERLAP = timedelta(minutes=1)  # re-read recent updates: late commits and clock skew between workers
+
+# Scores of each kind of match (names score NAME_WEIGHT × similarity)
+REFERENCE_EXACT = 1.0
+PHONE_EXACT = 0.95
+REFERENCE_PREFIX = 0.9
+PHONE_PREFIX = 0.85
+NAME_WEIGHT = 0.8
+
+REFERENCE_PATTERN = re.compile(r'[A-Z0-9-]+')
+PHONE_PATTERN = re.compile(r'[\d\s+().-]+')
+WORD_PATTERN = re.compile(r'[^\W_]+')
+RESULT_FIELDS = ('id', 'reference_number', 'customer_id', 'customer_name', 'customer_phone', 'service_id',
+                 'appointment_date', 'appointment_time', 'status')
+
+_indexes = {}  # version_stamp.database_key() -> NameIndex
+_lock = threading.Lock()
+
+
+def name_words(text):
+    """Lower-cased words of a name (letters and digits of any script)"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+def padded_words(text):
+    """Each word padded with two spaces in front and one behind, as pg_trgm does, run together"""
+    return ''.join(f'  {word} ' for word in name_words(text))
+
+
+def padded_trigrams(padded):
+    # Windows spanning two words ("a  ", "   ") are never trigrams of a single word
+    return {padded[i:i + 3] for i in range(len(padded) - 2) if padded[i + 1:i + 3] != '  '}
+
+
+def trigrams(text):
+    """pg_trgm style trigrams of a name or query"""
+    return padded_trigrams(padded_words(text))
+
+
+class NameIndex:
+    """
+    Distinct normalized names with trigram postings, and the customers using each name.
+    Renamed customers leave a stale entry under the old name; name_of (customer id ->
+    name position) tells current entries from stale ones.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.loaded_at = None  # this worker's clock when the last load started
+        self.refreshed_at = 0.0
+        self.names = []  # position -> padded name (see padded_words)
+        self.positions = {}  # padded name -> position
+        self.postings = {}  # trigram -> array of name positions, ascending
+        self.customers = []  # name position -> array of customer ids, ascending
+        self.name_of = array('i')  # customer id -> name position (-1: none)
+
+    def add(self, customer_id, name):
+        padded = padded_words(name or '')
+        if not padded:
+            return
+        position = self.positions.get(padded)
+        if position is None:
+            position = len(self.names)
+            self.names.append(padded)
+            self.positions[padded] = position
+            self.customers.append(array('i'))
+            for gram in padded_trigrams(padded):
+                self.postings.setdefault(gram, array('i')).append(position)
+
+        if customer_id >= len(self.name_of):
+            self.name_of.extend([-1] * (customer_id + 1 - len(self.name_of)))
+        if self.name_of[customer_id] == position:
+            return
+        self.name_of[customer_id] = position
+        ids = self.customers[position]
+        if not ids or ids[-1] < customer_id:
+            ids.append(customer_id)
+        else:
+            # An older customer renamed to a name already indexed: keep the ids sorted
+            at = bisect.bisect_left(ids, customer_id)
+            if at == len(ids) or ids[at] != customer_id:
+                ids.insert(at, customer_id)
+
+    def load(self, connection, since=None):
+        """Add all customers, or those whose updated_at is between since and now"""
+        started = datetime.utcnow()
+        query = select(Customer.id, Customer.name).order_by(Customer.id)
+        if since is not None:
+            # Upper bound: backfilled customers may carry a booking's future created_at
+            query = query.where(Customer.updated_at.between(since, started + REFRESH_OVERLAP))
+        for row in connection.execute(query, execution_options={'yield_per': 5000}):
+            self.add(row.id, row.name)
+        self.loaded_at = started
+        self.refreshed_at = timer.monotonic()
+
+    def refresh(self, connection):
+        self.load(connection, self.loaded_at - REFRESH_OVERLAP)
+
+    def search(self, query, limit):
+        """
+        Customers whose name contains at least SIMILARITY_THRESHOLD of the query's trigrams,
+        best first (newest customer first on a tie)
+
+        Returns:
+            list: (customer id, similarity) pairs
+        """
+        wanted = trigrams(query)
+        if not wanted:
+            return []
+        needed = max(1, math.ceil(round(SIMILARITY_THRESHOLD * len(wanted), 6)))
+
+        # A name sharing `needed` trigrams shares at least one of any len - needed + 1 of them,
+        # so only the postings of the rarest ones have to be read
+        rarest = sorted(wanted, key=lambda gram: len(self.postings.get(gram, ())))[:len(wanted) - needed + 1]
+        candidates = set()
+        for gram in rarest:
+            candidates.update(self.postings.get(gram, ()))
+
+        # Every trigram of a padded name is a substring of it and vice versa, so no sets per name
+        scored = []
+        names = self.names
+        for position in candidates:
+            name = names[position]
+            common = sum(gram in name for gram in wanted)
+            if common >= needed:
+                scored.append((common / len(wanted), position))
+
+        matches = []
+        for similarity, position in scored:
+            taken = 0
+            ids = self.customers[position]
+            for index in range(len(ids) - 1, -1, -1):
+                customer_id = ids[index]
+                if self.name_of[customer_id] != position:
+                    continue  # renamed since
+                matches.append((similarity, customer_id))
+                taken += 1
+                if taken == limit:
+                    break
+        matches.sort(reverse=True)
+        return [(customer_id, similarity) for similarity, customer_id in matches[:limit]]
+
+
+def get_name_index():
+    """This worker's name index, rebuilt after a backfill and topped up at most every REFRESH_INTERVAL"""
+    database = version_stamp.database_key()
+    version = version_stamp.current(SEARCH_STAMP)
+    index = _indexes.get(database)
+    if index is not None and index.version == version and timer.monotonic() - index.refreshed_at < REFRESH_INTERVAL:
+        return index
+
+    with _lock:
+        # Read from the primary so a lagging replica can't hide updates from a top-up
+        with use_primary():
+            connection = db.session.connection()
+            index = _indexes.get(database)
+            if index is None or index.version != version:
+                index = NameIndex(version)
+                index.load(connection)
+                _indexes[database] = index
+            elif timer.monotonic() - index.refreshed_at >= REFRESH_INTERVAL:
+                index.refresh(connection)
+        return index
+
+
+def invalidate_name_index():
+    """Rebuild every worker's name index on its next search (after bulk customer changes)"""
+    version_stamp.bump(SEARCH_STAMP)
+
+
+def prefix_condition(column, prefix, dialect_name):
+    """
+    column starts with prefix, in a form the dialect's B-tree index can serve
+    (prefix holds only letters, digits and '-', so there is nothing to escape)
+    """
+    if dialect_name == 'sqlite':
+        return column.op('GLOB')(f'{prefix}*')  # case-sensitive, unlike LIKE, so the index applies
+    return column.like(f'{prefix}%')  # varchar_pattern_ops index
+
+
+def match_names(connection, query, limit):
+    """(customer id, similarity) pairs for a name query, best first"""
+    if connection.dialect.name == 'postgresql':
+        wanted = ' '.join(name_words(query))
+        if not wanted:
+            return []
+        name = func.lower(Customer.name)
+        similarity = func.word_similarity(wanted, name)
+        rows = connection.execute(
+            select(Customer.id, similarity.label('similarity')).where(
+                literal(wanted).op('<%')(name)
+            ).order_by(similarity.desc(), Customer.id.desc()).limit(limit)
+        ).all()
+        return [(row.id, float(row.similarity)) for row in rows]
+    return get_name_index().search(query, limit)
+
+
+def phone_prefixes(digits):
+    """
+    The canonical forms (see normalize_phone) a partly typed phone number can start
+
+    Returns:
+        list: Digit prefixes to look up
+    """
+    if digits.startswith('00'):
+        return [digits[2:]]  # international call prefix
+    if digits.startswith('0'):
+        return [DEFAULT_COUNTRY_CODE + digits[1:]]  # local number: trunk prefix 0
+    if digits.startswith(DEFAULT_COUNTRY_CODE) or len(digits) > NATIONAL_NUMBER_LENGTH:
+        return [digits]
+    # Without a prefix it may be the start of an international or of a national number
+    return [digits, DEFAULT_COUNTRY_CODE + digits]
+
+
+def match_phones(connection, digits, limit):
+    """
+    (customer id, score) pairs for customers whose normalized phone starts with any form
+    of digits, in phone order straight off the index (an exact match sorts first)
+    """
+    prefixes = [prefix for prefix in phone_prefixes(digits) if prefix]
+    rows = []
+    for prefix in prefixes:
+        # One query per form: each reads at most `limit` entries of the index
+        rows.extend(connection.execute(
+            select(Customer.id, Customer.phone_normalized).where(
+                prefix_condition(Customer.phone_normalized, prefix, connection.dialect.name)
+            ).order_by(Customer.phone_normalized).limit(limit)
+        ).all())
+    rows = sorted(set(rows), key=lambda row: (row.phone_normalized not in prefixes, row.phone_normalized))[:limit]
+    return [(row.id, PHONE_EXACT if row.phone_normalized in prefixes else PHONE_PREFIX) for row in rows]
+
+
+def match_references(connection, reference, limit):
+    """Appointments (hot and archived) whose reference starts with reference, exact match first"""
+    rows = []
+    for table in (Appointment.__table__, AppointmentArchive.__table__):
+        # One query per table: each reads at most `limit` entries of its own index
+        rows.extend(connection.execute(
+            select(*[table.c[name] for name in RESULT_FIELDS], Service.name.label('service_name'),
+                   literal(table is AppointmentArchive.__table__, Boolean).label('archived'))
+            .join(Service, Service.id == table.c.service_id)
+            .where(prefix_condition(table.c.reference_number, reference, connection.dialect.name))
+            .order_by(table.c.reference_number).limit(limit)
+        ).all())
+    return sorted(rows, key=lambda row: (row.reference_number != reference, row.reference_number))[:limit]
+
+
+def customer_appointments(connection, customer_ids, today):
+    """
+    Up to PER_CUSTOMER appointments (hot and archived) of each customer:
+    upcoming ones soonest first, then past ones latest first
+
+    Returns:
+        dict: {customer id: [rows]}
+    """
+    rows = appointment_rows(RESULT_FIELDS, lambda table: [table.c.customer_id.in_(customer_ids)], mark_archived=True)
+    upcoming = rows.c.appointment_date >= today
+    rank = func.row_number().over(partition_by=rows.c.customer_id, order_by=(
+        case((upcoming, 0), else_=1),
+        case((upcoming, rows.c.appointment_date)),
+        case((upcoming, rows.c.appointment_time)),
+        rows.c.appointment_date.desc(),
+        rows.c.appointment_time.desc()
+    ))
+    ranked = select(rows, Service.name.label('service_name'), rank.label('rank')).join(
+        Service, Service.id == rows.c.service_id
+    ).subquery()
+    by_customer = {}
+    for row in connection.execute(
+        select(ranked).where(ranked.c.rank <= PER_CUSTOMER).order_by(ranked.c.customer_id, ranked.c.rank)
+    ):
+        by_customer.setdefault(row.customer_id, []).append(row)
+    return by_customer
+
+
+def result_to_dict(row, match, score):
+    return {
+        'id': row.id,
+        'reference_number': row.reference_number,
+        'customer_id': row.customer_id,
+        'customer_name': row.customer_name,
+        'customer_phone': row.customer_phone,
+        'service_id': row.service_id,
+        'service_name': row.service_name,
+        'appointment_date': str(row.appointment_date),
+        'appointment_time': str(row.appointment_time),
+        'status': row.status,
+        'archived': bool(row.archived),
+        'match': match,
+        'score': round(score, 3)
+    }
+
+
+def search_appointments(query, limit=10, today=None):
+    """
+    Appointments matching a partial reference number, phone number or customer name
+
+    Returns:
+        list: Appointment dicts with "match" (reference, phone or name) and "score", best first
+    """
+    query = (query or '').strip()[:MAX_QUERY_LENGTH]
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+    today = today or date.today()
+    connection = db.session.connection()
+
+    # (score, order, match, row or customer id): order keeps each matcher's own ranking on a tie
+    found = []
+    reference = query.upper()
+    if len(reference) >= 3 and REFERENCE_PATTERN.fullmatch(reference):
+        for order, row in enumerate(match_references(connection, reference, limit)):
+            score = REFERENCE_EXACT if row.reference_number == reference else REFERENCE_PREFIX
+            found.append((score, order, 'reference', row))
+
+    customers = {}  # customer id -> (score, match), the best match per customer
+    digits = ''.join(filter(str.isdigit, query))
+    if PHONE_PATTERN.fullmatch(query) and len(digits) >= MIN_PHONE_DIGITS:
+        for customer_id, score in match_phones(connection, digits, limit):
+            customers.setdefault(customer_id, (score, 'phone'))
+    if any(character.isalpha() for character in query):
+        for customer_id, similarity in match_names(connection, query, limit):
+            score = NAME_WEIGHT * similarity
+            if customer_id not in customers or customers[customer_id][0] < score:
+                customers[customer_id] = (score, 'name')
+
+    if customers:
+        by_customer = customer_appointments(connection, list(customers), today)
+        ranked = sorted(customers.items(), key=lambda item: item[1][0], reverse=True)
+        order = len(found)
+        for customer_id, (score, match) in ranked:
+            for row in by_customer.get(customer_id, ()):
+                found.append((score, order, match, row))
+                order += 1
+
+    found.sort(key=lambda item: (-item[0], item[1]))
+    results = []
+    seen = set()
+    for score, _, match, row in found:
+        if row.id in seen:
+            continue
+        seen.add(row.id)
+        results.append(result_to_dict(row, match, score))
+        if len(results) == limit:
+            break
+    return results
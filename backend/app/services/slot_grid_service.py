@@ -0,0 +1,271 @@
+"""
+Slot Grid
+Materialized availability: /available-slots reads one indexed range instead of computing
+
+The grid holds every candidate start time (SLOT_GRANULARITY_MINUTES steps inside opening hours)
+for each service and day in a rolling horizon, flagged free or booked. It is
+kept in step inside the writing transaction by session flush hooks:
+
+- appointment created, moved, cancelled or deleted: that (service, day) is recomputed
+- service added or its duration changed: that service's horizon is rebuilt
+- working hours or date overrides changed: the whole horizon is rebuilt
+
+Days outside the horizon, or not materialized yet, fall back to live computation.
+`flask slot-grid rebuild` (run daily) rolls the horizon forward and
+`flask slot-grid verify` diffs the grid against live computation.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select, delete, insert
+from app import db
+from app.models import Appointment, Service, WorkingHour, WorkingHourOverride, SlotGrid, SlotGridDay
+from app.services.appointment_service import find_free_slots, compute_available_time_slots
+from app.services.calendar_service import DAYS, get_open_interval, resolve_open_interval
+from app.utils import metrics
+
+PENDING_KEY = 'slot_grid_pending'
+APPOINTMENT_FIELDS = ('service_id', 'appointment_date', 'appointment_time', 'status')
+
+
+def grid_enabled():
+    return has_app_context() and current_app.config['SLOT_GRID_ENABLED']
+
+
+def horizon():
+    """First and last date kept in the grid"""
+    today = date.today()
+    return today, today + timedelta(days=current_app.config['SLOT_GRID_HORIZON_DAYS'] - 1)
+
+
+def load_open_intervals(connection):
+    """
+    Open-interval lookup from the hours visible to this transaction
+    (the cached calendar is only refreshed after commit)
+    """
+    weekly = {row.day_of_week: row for row in connection.execute(select(
+        WorkingHour.day_of_week, WorkingHour.open_time, WorkingHour.close_time, WorkingHour.is_closed
+    ))}
+    overrides = {row.date: row for row in connection.execute(select(
+        WorkingHourOverride.date, WorkingHourOverride.open_time, WorkingHourOverride.close_time,
+        WorkingHourOverride.is_closed, WorkingHourOverride.reason
+    ))}
+    return lambda d: resolve_open_interval(d, weekly.get(DAYS[d.weekday()]), overrides.get(d))
+
+
+def build_rows(service_id, duration, date_obj, open_interval, booked_times):
+    """Grid rows for one service and day, using the same slot rules as find_free_slots"""
+    open_time, close_time, reason = open_interval(date_obj)
+    if reason:
+        return []
+
+    step = current_app.config['SLOT_GRANULARITY_MINUTES']
+    candidates = find_free_slots(date_obj, open_time, close_time, duration, [], step)
+    free = set(find_free_slots(date_obj, open_time, close_time, duration,
+                               [(t, duration) for t in booked_times], step))
+    return [{
+        'service_id': service_id,
+        'date': date_obj,
+        'slot_time': datetime.strptime(slot, '%H:%M').time(),
+        'is_free': slot in free
+    } for slot in candidates]
+
+
+def rebuild(connection, service_ids=None):
+    """
+    Rematerialize the whole horizon for some services (all if service_ids is None)
+
+    Returns:
+        int: Number of grid rows written
+    """
+    first, last = horizon()
+    open_interval = load_open_intervals(connection)
+
+    query = select(Service.id, Service.duration_minutes)
+    if service_ids is not None:
+        query = query.where(Service.id.in_(service_ids))
+    durations = dict(connection.execute(query).all())
+    if not durations:
+        return 0
+    ids = list(durations)
+
+    # Drops the old window too, including days that have rolled into the past
+    connection.execute(delete(SlotGrid.__table__).where(SlotGrid.service_id.in_(ids)))
+    connection.execute(delete(SlotGridDay.__table__).where(SlotGridDay.service_id.in_(ids)))
+
+    # All bookings in the window in one query
+    booked = defaultdict(list)
+    for row in connection.execute(select(
+        Appointment.service_id, Appointment.appointment_date, Appointment.appointment_time
+    ).where(
+        Appointment.service_id.in_(ids),
+        Appointment.appointment_date.between(first, last),
+        Appointment.status != 'cancelled'
+    )):
+        booked[(row.service_id, row.appointment_date)].append(row.appointment_time)
+
+    rows, days = [], []
+    built_at = datetime.utcnow()
+    day = first
+    while day <= last:
+        for service_id in ids:
+            rows.extend(build_rows(service_id, durations[service_id], day, open_interval,
+                                   booked[(service_id, day)]))
+            days.append({'service_id': service_id, 'date': day, 'built_at': built_at})
+        day += timedelta(days=1)
+
+    if rows:
+        connection.execute(insert(SlotGrid.__table__), rows)
+    connection.execute(insert(SlotGridDay.__table__), days)
+    metrics.increment('slot_grid.rebuilt_days', len(days))
+    return len(rows)
+
+
+def refresh_day(connection, service_id, date_obj):
+    """Recompute one materialized (service, day) after an appointment write"""
+    first, last = horizon()
+    if service_id is None or date_obj is None or not first <= date_obj <= last:
+        return
+
+    # Lock the day so concurrent bookings for it recompute one after another,
+    # each seeing the bookings committed before it
+    materialized = connection.execute(select(SlotGridDay.service_id).where(
+        SlotGridDay.service_id == service_id,
+        SlotGridDay.date == date_obj
+    ).with_for_update()).first()
+    if materialized is None:
+        return  # reads for this day fall back to live computation
+
+    duration = connection.execute(
+        select(Service.duration_minutes).where(Service.id == service_id)
+    ).scalar()
+    booked = connection.execute(select(Appointment.appointment_time).where(
+        Appointment.service_id == service_id,
+        Appointment.appointment_date == date_obj,
+        Appointment.status != 'cancelled'
+    )).scalars().all()
+
+    connection.execute(delete(SlotGrid.__table__).where(
+        SlotGrid.service_id == service_id,
+        SlotGrid.date == date_obj
+    ))
+    rows = build_rows(service_id, duration, date_obj, get_open_interval, booked)
+    if rows:
+        connection.execute(insert(SlotGrid.__table__), rows)
+    metrics.increment('slot_grid.refreshed_days')
+
+
+def grid_slots(date_obj, service_id):
+    """
+    Free slots for one service and day straight from the grid
+
+    Returns:
+        list or None: Slot start times (HH:MM), or None if the day is not materialized
+    """
+    times = db.session.execute(select(SlotGrid.slot_time).where(
+        SlotGrid.service_id == service_id,
+        SlotGrid.date == date_obj,
+        SlotGrid.is_free.is_(True)
+    ).order_by(SlotGrid.slot_time)).scalars().all()
+    if times:
+        return [t.strftime('%H:%M') for t in times]
+
+    # No free rows: fully booked or closed if materialized, unknown otherwise
+    if db.session.get(SlotGridDay, (service_id, date_obj)) is None:
+        return None
+    return []
+
+
+def read_slot_grid(date_obj, service_id):
+    """Free slots from the grid, or None when the caller should compute them live"""
+    if not grid_enabled():
+        return None
+    first, last = horizon()
+    if not first <= date_obj <= last:
+        return None
+
+    slots = grid_slots(date_obj, service_id)
+    metrics.increment('slot_grid.misses' if slots is None else 'slot_grid.hits')
+    return slots
+
+
+def verify():
+    """
+    Compare every materialized day with live computation
+
+    Returns:
+        list: (service_id, date, grid_slots, live_slots) for each mismatch
+    """
+    first, last = horizon()
+    service_ids = db.session.execute(select(Service.id).order_by(Service.id)).scalars().all()
+    mismatches = []
+    day = first
+    while day <= last:
+        for service_id in service_ids:
+            grid = grid_slots(day, service_id)
+            live = compute_available_time_slots(day, service_id)
+            if grid != live:
+                mismatches.append((service_id, day, grid, live))
+        day += timedelta(days=1)
+    return mismatches
+
+
+def collect_changes(session, flush_context, instances):
+    """before_flush: note which parts of the grid this flush invalidates"""
+    if not grid_enabled():
+        return
+    pending = session.info.setdefault(PENDING_KEY, {'days': set(), 'services': set(), 'new_services': [], 'full': False})
+
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Appointment):
+            pending['days'].add((obj.service_id, obj.appointment_date))
+        elif isinstance(obj, (WorkingHour, WorkingHourOverride)):
+            pending['full'] = True
+        elif isinstance(obj, Service) and obj in session.new:
+            pending['new_services'].append(obj)
+
+    for obj in session.dirty:
+        if isinstance(obj, Appointment):
+            state = inspect(obj)
+            if not any(state.attrs[field].history.has_changes() for field in APPOINTMENT_FIELDS):
+                continue
+            # A moved booking frees its old day and takes the new one
+            service_ids = {obj.service_id, *state.attrs.service_id.history.deleted}
+            dates = {obj.appointment_date, *state.attrs.appointment_date.history.deleted}
+            pending['days'].update((s, d) for s in service_ids for d in dates)
+        elif isinstance(obj, Service):
+            if inspect(obj).attrs.duration_minutes.history.has_changes():
+                pending['services'].add(obj.id)
+        elif isinstance(obj, (WorkingHour, WorkingHourOverride)) and session.is_modified(obj):
+            pending['full'] = True
+
+
+def apply_changes(session, flush_context):
+    """after_flush: update the grid in the same transaction as the write"""
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    connection = session.connection()
+
+    if pending['full']:
+        rebuild(connection)
+        return
+
+    services = pending['services'] | {s.id for s in pending['new_services']}
+    if services:
+        rebuild(connection, services)
+    for service_id, date_obj in pending['days']:
+        if service_id not in services:
+            refresh_day(connection, service_id, date_obj)
+
+
+def discard_changes(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
+
+
+def init_slot_grid(session_class):
+    """Register the flush hooks that keep the grid in step with writes"""
+    if not event.contains(session_class, 'before_flush', collect_changes):
+        event.listen(session_class, 'before_flush', collect_changes)
+        event.listen(session_class, 'after_flush', apply_changes)
+        event.listen(session_class, 'after_soft_rollback', discard_changes)
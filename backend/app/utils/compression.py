@@ -0,0 +1,178 @@
+"""
+Response Compression
+Content-negotiated gzip/brotli for API responses
+
+Regular responses are compressed in an after_request hook once they reach
+COMPRESSION_MIN_SIZE. Streamed responses are compressed chunk by chunk so they
+keep streaming. Cached snapshots (service catalog, working hours) are
+compressed once with precompress() and served with send_precompressed(), so
+the hook never recompresses them.
+"""
+import gzip
+import zlib
+from flask import request, Response
+from app.utils import metrics
+
+# Optional brotli support (gzip is always available)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml'
+}
+
+
+def supported_encodings():
+    """Encodings this process can produce, preferred first"""
+    return ['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip']
+
+
+def choose_encoding(offered=None):
+    """
+    Pick the best encoding the client accepts
+
+    Returns:
+        str or None: 'br', 'gzip', or None for an uncompressed response
+    """
+    offered = offered or supported_encodings()
+    encoding = request.accept_encodings.best_match(offered)
+    if encoding and request.accept_encodings.quality(encoding) > 0:
+        return encoding
+    return None
+
+
+def compress(data, encoding, level=6, brotli_quality=4):
+    """Compress a whole body with the given encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding, level=6, brotli_quality=4):
+    """
+    Compress an iterable of chunks, flushing after each one so clients
+    receive data as soon as the server produces it
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def precompress(body):
+    """
+    Compress a cached body once, at the highest levels, for every supported encoding
+
+    Returns:
+        dict: encoding -> bytes (None holds the uncompressed body)
+    """
+    bodies = {None: body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if BROTLI_AVAILABLE:
+        bodies['br'] = brotli.compress(body, quality=11)
+    return bodies
+
+
+def send_precompressed(bodies, etag, mimetype='application/json'):
+    """
+    Serve a cached snapshot in the client's preferred encoding with a
+    per-representation strong ETag, answering If-None-Match with 304
+    """
+    encoding = choose_encoding([e for e in supported_encodings() if e in bodies])
+    representation_etag = f'{etag}-{encoding}' if encoding else etag
+
+    # Any representation's ETag means the client already has the current version
+    known_etags = [etag] + [f'{etag}-{e}' for e in bodies if e]
+    if any(request.if_none_match.contains(tag) for tag in known_etags):
+        response = Response(status=304)
+    else:
+        response = Response(bodies[encoding], mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+            metrics.increment('compression.precompressed_responses')
+            metrics.increment('compression.bytes_saved', len(bodies[None]) - len(bodies[encoding]))
+
+    response.set_etag(representation_etag)
+    response.headers['Cache-Control'] = 'no-cache'  # always revalidate, 304 is cheap
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def is_compressible(response):
+    mimetype = response.mimetype or ''
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+def init_compression(app):
+    """Register the after_request hook that compresses API responses"""
+    @app.after_request
+    def compress_response(response):
+        if not app.config['COMPRESSION_ENABLED']:
+            return response
+
+        # Only compressible, successful bodies that nobody has encoded yet
+        if (request.method == 'HEAD' or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or response.direct_passthrough  # send_file / uploads
+                or 'Content-Encoding' in response.headers
+                or 'no-transform' in response.headers.get('Cache-Control', '')
+                or not is_compressible(response)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding()
+        if not encoding:
+            return response
+
+        level = app.config['COMPRESSION_LEVEL']
+        quality = app.config['COMPRESSION_BROTLI_QUALITY']
+
+        if response.is_streamed:
+            # Chunked responses (exports): length is unknown, compress as chunks go out
+            response.response = compress_stream(response.response, encoding, level, quality)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+            metrics.increment('compression.streamed_responses')
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config['COMPRESSION_MIN_SIZE']:
+            return response
+
+        compressed = compress(data, encoding, level, quality)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        # A strong ETag must change with the encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f'{etag}-{encoding}')
+
+        metrics.increment('compression.responses')
+        metrics.increment('compression.bytes_in', len(data))
+        metrics.increment('compression.bytes_out', len(compressed))
+        metrics.increment('compression.bytes_saved', len(data) - len(compressed))
+        return response
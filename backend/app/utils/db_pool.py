@@ -0,0 +1,105 @@
+"""
+Database Pool Utilities
+Engine options from config, pool metrics and the database health check
+"""
+import time
+from sqlalchemy import event, exc, text
+from sqlalchemy.pool import NullPool, QueuePool
+from app.utils import metrics
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that counts waits, wait time, overflow connections and timeouts"""
+
+    def _do_get(self):
+        # The checkout will block if nothing is idle and overflow is used up
+        saturated = (self._pool.empty() and self._max_overflow > -1
+                     and self._overflow >= self._max_overflow)
+        overflow_before = self._overflow
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            metrics.increment('db_pool.timeouts')
+            raise
+        if saturated:
+            metrics.increment('db_pool.waits')
+            metrics.increment('db_pool.wait_ms', (time.perf_counter() - start) * 1000)
+        if self._overflow > overflow_before and self._overflow > 0:
+            metrics.increment('db_pool.overflow_connections')
+        return connection
+
+
+def build_engine_options(config, database_url):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS from the DB_* config values.
+
+    - SQLite keeps SQLAlchemy's defaults (its pools don't take size options).
+    - DB_PGBOUNCER=true uses NullPool: PgBouncer already pools server
+      connections, and it rejects the startup `options` parameter, so the
+      statement timeout must be set on the database role instead.
+
+    Returns:
+        dict: Engine options for Flask-SQLAlchemy
+    """
+    if not database_url or database_url.startswith('sqlite'):
+        return {}
+
+    if config.get('DB_PGBOUNCER'):
+        return {'poolclass': NullPool}
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True)
+    }
+
+    statement_timeout = config.get('DB_STATEMENT_TIMEOUT_MS', 0)
+    if statement_timeout and database_url.startswith('postgres'):
+        options['connect_args'] = {'options': f'-c statement_timeout={int(statement_timeout)}'}
+
+    return options
+
+
+def register_pool_metrics(engine):
+    """Count checkouts, checkins and newly opened connections for an engine"""
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        metrics.increment('db_pool.connections_opened')
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment('db_pool.checkouts')
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.increment('db_pool.checkins')
+
+
+def pool_status(engine):
+    """Current pool state (sizes only exist on queue-style pools)"""
+    pool = engine.pool
+    status = {'class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow
+        })
+    return status
+
+
+def database_roundtrip_ms(engine):
+    """Time a trivial query; returns milliseconds, or None if the database is unreachable"""
+    start = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+    except exc.SQLAlchemyError:
+        return None
+    return round((time.perf_counter() - start) * 1000, 3)
@@ -0,0 +1,74 @@
+"""
+Read Replica Routing
+Send read-only GET endpoints to a replica, everything else to the primary
+
+Enabled by setting DATABASE_REPLICA_URL. After a client writes, its reads
+stay on the primary for DB_REPLICA_STICKY_SECONDS so it always sees its own
+changes even while the replica is catching up.
+"""
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, request, current_app, has_app_context
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+STICKY_COOKIE = 'db_primary_until'
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+class RoutingSession(Session):
+    """Session that uses the replica engine while a read-only endpoint is running"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and has_app_context()
+                and g.get('db_use_replica') and REPLICA_BIND in self._db.engines):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def is_sticky_to_primary():
+    """True if this client wrote recently and must read from the primary"""
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_only(f):
+    """Mark an endpoint as safe to serve from the read replica"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.db_use_replica = (current_app.config.get('DATABASE_REPLICA_URL') is not None
+                            and not is_sticky_to_primary())
+        return f(*args, **kwargs)
+
+    return decorated
+
+
+@contextmanager
+def use_primary():
+    """Run the queries in this block on the primary, even inside a read-only endpoint"""
+    previous = g.get('db_use_replica', False)
+    g.db_use_replica = False
+    try:
+        yield
+    finally:
+        g.db_use_replica = previous
+
+
+def init_replica_routing(app):
+    """Pin clients to the primary for a short while after each successful write"""
+    @app.after_request
+    def mark_primary_after_write(response):
+        if (app.config.get('DATABASE_REPLICA_URL') and request.method in WRITE_METHODS
+                and response.status_code < 400):
+            sticky_seconds = app.config['DB_REPLICA_STICKY_SECONDS']
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(time.time() + sticky_seconds),
+                max_age=sticky_seconds,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
@@ -54,6 +54,24 @@ def token_required(f):
     return decorated
 
 
+def optional_user():
+    """
+    User of a valid Bearer token, for public endpoints that behave differently when logged in
+
+    Returns:
+        User or None: None without a token or with an invalid or expired one
+    """
+    auth_header = request.headers.get('Authorization', '')
+    parts = auth_header.split(' ')
+    if len(parts) != 2 or parts[0] != 'Bearer':
+        return None
+    try:
+        data = jwt.decode(parts[1], current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return None
+    return User.query.filter_by(id=data.get('user_id')).first()
+
+
 def admin_required(f):
     """Require admin role"""
     @wraps(f)
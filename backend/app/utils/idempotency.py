@@ -0,0 +1,148 @@
+"""
+Idempotency Keys
+Replay the stored response when a client retries a POST with the same Idempotency-Key
+
+The first request with a key claims it by inserting a placeholder row (the
+unique constraint on scope + key decides the winner), runs normally and stores
+its response. Retries with the same key get that response back without
+re-running validation, conflict checks or file writes. A logged-in client's
+keys are scoped to its user id, so they never replay to anyone else.
+Anonymous keys share one scope: they are random (a UUID per attempt) and a
+different payload is rejected anyway, while the caller's IP changes between
+a retry and the original on mobile networks. Put rate_limit outside this
+decorator so retries count against the limit too:
+
+- same key while the first request is still running -> 409, retry shortly
+- same key with a different payload -> 422
+- server errors (5xx) and rate limiting (429) are not stored, so the retry runs again
+
+Stored responses expire after IDEMPOTENCY_TTL_HOURS (`flask idempotency purge`
+deletes expired rows).
+"""
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import request, jsonify, current_app, make_response, Response
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import IdempotencyKey
+from app.utils import metrics
+from app.utils.decorators import optional_user
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint():
+    """Hash of the method, path and payload (JSON body, or form fields plus file contents)"""
+    digest = hashlib.sha256(f'{request.method} {request.path}\n'.encode('utf-8'))
+    if request.is_json:
+        digest.update(request.get_data())
+    else:
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f'{name}={value}\n'.encode('utf-8'))
+        for name, file in sorted(request.files.items(multi=True)):
+            digest.update(f'{name}:{file.filename}\n'.encode('utf-8'))
+            for chunk in iter(lambda: file.stream.read(65536), b''):
+                digest.update(chunk)
+            file.stream.seek(0)
+    return digest.hexdigest()
+
+
+def client_identity():
+    """The logged-in user, or 'anonymous' (not the IP address, which changes between retries)"""
+    user = optional_user()
+    if user:
+        return f'user:{user.id}'
+    return 'anonymous'
+
+
+def claim_key(key, scope, request_hash):
+    """
+    Insert the placeholder row for key, or return the row that already holds it
+
+    Returns:
+        tuple: (record: IdempotencyKey or None, claimed: bool)
+    """
+    now = datetime.utcnow()
+    existing = None
+    for _ in range(3):
+        record = IdempotencyKey(
+            key=key,
+            scope=scope,
+            request_hash=request_hash,
+            expires_at=now + timedelta(hours=current_app.config['IDEMPOTENCY_TTL_HOURS'])
+        )
+        db.session.add(record)
+        try:
+            db.session.commit()
+            return record, True
+        except IntegrityError:
+            db.session.rollback()
+
+        existing = IdempotencyKey.query.filter_by(scope=scope, key=key).first()
+        if existing is None:
+            continue  # deleted in the meantime, try again
+
+        # Expired, or abandoned by a request that never finished: free the key
+        abandoned = (existing.status_code is None and existing.created_at
+                     < now - timedelta(seconds=current_app.config['IDEMPOTENCY_LOCK_SECONDS']))
+        if existing.expires_at < now or abandoned:
+            db.session.delete(existing)
+            db.session.commit()
+            continue
+        return existing, False
+    return existing, False
+
+
+def replay(record):
+    """Rebuild the stored response"""
+    metrics.increment('idempotency.replays')
+    response = Response(record.response_body, status=record.status_code, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(f):
+    """Honour an optional Idempotency-Key header on a POST endpoint"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+        scope = f'{request.method} {request.path} {client_identity()}'
+        request_hash = request_fingerprint()
+        record, claimed = claim_key(key, scope, request_hash)
+
+        if not claimed:
+            if record is not None and record.request_hash != request_hash:
+                return jsonify({'error': f'{HEADER} was already used with a different request'}), 422
+            if record is None or record.status_code is None:
+                response = jsonify({'error': 'A request with this Idempotency-Key is still in progress'})
+                response.headers['Retry-After'] = '1'
+                return response, 409
+            return replay(record)
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            db.session.delete(record)
+            db.session.commit()
+            raise
+
+        # Keep the outcome for retries; release the key if a retry should run again
+        db.session.rollback()  # discard anything the view left uncommitted
+        if response.status_code >= 500 or response.status_code == 429:
+            db.session.delete(record)
+        else:
+            record.status_code = response.status_code
+            record.response_body = response.get_data(as_text=True)
+            metrics.increment('idempotency.stored')
+        db.session.commit()
+        return response
+
+    return decorated
@@ -0,0 +1,40 @@
+"""
+Metrics Utilities
+Simple in-process counters reported by /api/health
+
+Counters are per worker process (each gunicorn worker keeps its own).
+"""
+import threading
+from collections import defaultdict
+
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+
+
+def increment(name, value=1):
+    """Add value to a named counter"""
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot(prefix=None):
+    """
+    Copy of the current counters, optionally only those starting with prefix
+
+    Returns:
+        dict: counter name -> value (whole numbers as int)
+    """
+    with _lock:
+        items = list(_counters.items())
+    return {
+        name: int(value) if float(value).is_integer() else round(value, 3)
+        for name, value in sorted(items)
+        if prefix is None or name.startswith(prefix)
+    }
+
+
+def reset():
+    """Clear all counters (used by benchmarks between runs)"""
+    with _lock:
+        _counters.clear()
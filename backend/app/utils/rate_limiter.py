@@ -25,6 +25,10 @@ def rate_limit(max_requests=5, window_seconds=60, key_func=None):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
+            # Load tests on localhost would otherwise all share one IP bucket
+            if not current_app.config.get('RATELIMIT_ENABLED', True):
+                return f(*args, **kwargs)
+            
             # Generate rate limit key
             if key_func:
                 key = key_func()
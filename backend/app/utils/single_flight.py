@@ -0,0 +1,162 @@
+"""
+Single-Flight Coalescing
+Let identical concurrent computations share one in-flight call
+
+When many clients ask for the same thing at the same moment, the first caller
+(the leader) computes it and everyone who arrives while it is running waits
+for that result instead of repeating the work. Nothing is cached afterwards:
+a caller that arrives after the leader finished starts a new computation.
+
+Within a worker this uses threads (gevent-safe once monkeypatched). With
+SINGLE_FLIGHT_SHARED=true, leaders of different workers on one host also
+coalesce through lock files in SINGLE_FLIGHT_FOLDER. Keys are hashed onto a
+fixed set of SINGLE_FLIGHT_LOCK_FILES files, so the folder never grows; keys
+that share a file just take turns.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from flask import current_app
+from app.utils import metrics
+
+# Optional cross-worker coalescing (POSIX only)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOCK_POLL_SECONDS = 0.005
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """In-process coalescing of calls by key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Run fn() unless a call with the same key is already in flight,
+        in which case wait for it and return (or raise) its outcome
+
+        Returns:
+            tuple: (result, shared: bool)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+def _lock_path(folder, key, lock_files):
+    """One of lock_files fixed paths; the same key always maps to the same one"""
+    os.makedirs(folder, exist_ok=True)
+    stripe = int(hashlib.sha1(key.encode('utf-8')).hexdigest(), 16) % lock_files
+    return os.path.join(folder, f'{stripe:04d}.lock')
+
+
+def _acquire(lock_file, timeout):
+    """Poll for the lock so a gevent worker keeps serving other requests while it waits"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(LOCK_POLL_SECONDS)
+
+
+def shared_do(key, fn, folder, timeout, lock_files):
+    """
+    Coalesce across worker processes with a lock file holding the last result.
+    fn() must return something JSON-serializable.
+
+    A waiter reuses the stored result only if it is for the same key and was
+    finished after the waiter arrived, i.e. the computation was in flight while
+    it waited. On lock timeout the caller computes on its own rather than failing.
+
+    Returns:
+        tuple: (result, shared: bool)
+    """
+    arrived = time.time()
+    with open(_lock_path(folder, key, lock_files), 'a+') as lock_file:
+        if not _acquire(lock_file, timeout):
+            metrics.increment('single_flight.lock_timeouts')
+            return fn(), False
+        try:
+            lock_file.seek(0)
+            try:
+                stored = json.loads(lock_file.read() or 'null')
+            except ValueError:
+                stored = None
+            if stored and stored.get('key') == key and stored['finished_at'] >= arrived:
+                return stored['result'], True
+
+            result = fn()
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(json.dumps({'key': key, 'finished_at': time.time(), 'result': result}))
+            lock_file.flush()
+            return result, False
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+_flights = SingleFlight()
+
+
+def coalesce(key, fn):
+    """
+    Run fn() once for all concurrent callers with the same key.
+    Callers share the returned object, so they must not mutate it.
+    """
+    config = current_app.config
+    if not config['SINGLE_FLIGHT_ENABLED']:
+        return fn()
+
+    if config['SINGLE_FLIGHT_SHARED'] and fcntl is not None:
+        folder = config['SINGLE_FLIGHT_FOLDER']
+        timeout = config['SINGLE_FLIGHT_TIMEOUT']
+        lock_files = config['SINGLE_FLIGHT_LOCK_FILES']
+        leader_fn = lambda: shared_do(key, fn, folder, timeout, lock_files)
+    else:
+        leader_fn = lambda: (fn(), False)
+
+    (result, shared_across_workers), shared = _flights.do(key, leader_fn)
+    if shared:
+        metrics.increment('single_flight.shared')
+    elif shared_across_workers:
+        metrics.increment('single_flight.shared_across_workers')
+    else:
+        metrics.increment('single_flight.computed')
+    return result
@@ -15,13 +15,42 @@ def validate_email(email):
     return validate_email_strict(email)
 
 
-def validate_phone(phone):
-    """Validate phone number (basic check)"""
+DEFAULT_COUNTRY_CODE = '251'  # Ethiopia: local numbers are 0 + 9 digits
+NATIONAL_NUMBER_LENGTH = 9
+MIN_PHONE_DIGITS = 10
+MAX_PHONE_DIGITS = 15  # longest international number (E.164)
+
+
+def normalize_phone(phone):
+    """
+    One canonical form per number: international digits without the "+"
+    (E.164), so "0911 23 45 67", "+251 91-123 4567" and "00251911234567"
+    are all 251911234567 and the same customer
+
+    Returns:
+        str or None: The digits, or None if the number is too short, too long
+                     or a local number of the wrong length
+    """
     if not phone:
-        return False
-    # Remove common characters and check if it's mostly digits
+        return None
     cleaned = ''.join(filter(str.isdigit, phone))
-    return len(cleaned) >= 10
+    if cleaned.startswith('00'):
+        cleaned = cleaned[2:]  # international call prefix, same as "+"
+    elif cleaned.startswith('0'):
+        # Local number: trunk prefix 0, then the national number
+        if len(cleaned) != NATIONAL_NUMBER_LENGTH + 1:
+            return None
+        cleaned = DEFAULT_COUNTRY_CODE + cleaned[1:]
+    if not MIN_PHONE_DIGITS <= len(cleaned) <= MAX_PHONE_DIGITS:
+        return None
+    if cleaned.startswith(DEFAULT_COUNTRY_CODE) and len(cleaned) != len(DEFAULT_COUNTRY_CODE) + NATIONAL_NUMBER_LENGTH:
+        return None
+    return cleaned
+
+
+def validate_phone(phone):
+    """Validate phone number (basic check)"""
+    return normalize_phone(phone) is not None
 
 
 def validate_date(date_string, format='%Y-%m-%d'):
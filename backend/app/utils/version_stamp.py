@@ -0,0 +1,48 @@
+"""
+Version Stamps
+Tiny files that tell every worker process when a cached snapshot is stale
+
+A writer calls bump(name); readers compare current(name) with the version
+their snapshot was built from. Reading a stamp is a small file read, so
+cache hits never touch the database. Stamps live in CACHE_STAMP_FOLDER,
+which must be shared by all workers of a deployment (one host by default).
+Process-wide caches are also keyed by database_key(), so two apps (or a
+test and a benchmark) on different databases never share a snapshot.
+Bulk loads that write the cached tables directly must bump the stamp too.
+"""
+import os
+import uuid
+from flask import current_app
+
+
+def _stamp_path(name):
+    folder = current_app.config['CACHE_STAMP_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f'{name}.stamp')
+
+
+def current(name):
+    """Current version token for name ('' if it was never bumped)"""
+    try:
+        with open(_stamp_path(name)) as f:
+            return f.read()
+    except FileNotFoundError:
+        return ''
+
+
+def bump(name):
+    """Mark everything cached under name as stale; returns the new version"""
+    version = uuid.uuid4().hex
+    path = _stamp_path(name)
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    # Atomic swap so readers never see a half-written stamp
+    os.replace(tmp_path, path)
+    return version
+
+
+def database_key():
+    """The primary database of the current app, for keying process-wide caches"""
+    from app import db
+    return str(db.engine.url)
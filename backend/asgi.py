@@ -0,0 +1,9 @@
+"""
+Async (ASGI) Entry Point
+Serves the public read endpoints from app/async_api.py:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5001 --workers 2
+"""
+from app.async_api import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,4 @@
+"""
+Benchmarks
+Performance tooling for the booking and availability hot paths
+"""
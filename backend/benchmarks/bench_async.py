@@ -0,0 +1,136 @@
+"""
+Async vs Sync Concurrency Benchmark
+Fire many concurrent slot lookups at the Flask app (gunicorn) and the ASGI app (uvicorn)
+
+Usage (from the backend folder):
+    DATABASE_URL=sqlite:///salon_scale.db python -m benchmarks.bench_async --concurrency 50,200,1000
+
+Both servers are started against the same database and stopped afterwards.
+The client is a plain asyncio HTTP/1.1 client so it never becomes the bottleneck
+at high connection counts.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import time as timer
+from datetime import date, timedelta
+
+from benchmarks.loadtest import wait_for_server
+from benchmarks.run_benchmarks import percentile
+
+SERVERS = {
+    'sync': 'gunicorn -c gunicorn.conf.py -b 127.0.0.1:{port} wsgi:app',
+    'async': 'uvicorn asgi:app --host 127.0.0.1 --port {port} --log-level warning'
+}
+
+
+async def fetch(reader, writer, host, path):
+    """One keep-alive GET; returns the status code"""
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode())
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith('content-length:'):
+            length = int(line.split(':', 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def run_level(port, concurrency, requests_per_client, paths, timeout):
+    """Open `concurrency` connections at once, each sending requests back to back"""
+    latencies = []
+    errors = [0]
+
+    async def client(index):
+        rng = random.Random(index)
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            errors[0] += requests_per_client
+            return
+        try:
+            for _ in range(requests_per_client):
+                start = timer.perf_counter()
+                try:
+                    status = await asyncio.wait_for(fetch(reader, writer, '127.0.0.1', rng.choice(paths)), timeout)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    errors[0] += 1
+                    return
+                if status != 200:
+                    errors[0] += 1
+                latencies.append((timer.perf_counter() - start) * 1000)
+        finally:
+            writer.close()
+
+    started = timer.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = timer.perf_counter() - started
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99), 2) if latencies else None
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare sync and async serving of slot lookups')
+    parser.add_argument('--concurrency', default='50,200,1000', help='Comma-separated connection counts')
+    parser.add_argument('--requests', type=int, default=5, help='Requests per connection')
+    parser.add_argument('--service-ids', default='1,2,3', help='Services to query')
+    parser.add_argument('--days', type=int, default=14, help='Query this many days ahead')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--modes', default='sync,async')
+    parser.add_argument('--output', help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    if not os.getenv('DATABASE_URL'):
+        parser.error('DATABASE_URL must point at a seeded database')
+
+    paths = [f'/api/appointments/available-slots?date={date.today() + timedelta(days=d)}&service_id={s}'
+             for d in range(1, args.days + 1) for s in args.service_ids.split(',')]
+    levels = [int(c) for c in args.concurrency.split(',')]
+
+    results = []
+    for offset, mode in enumerate(args.modes.split(',')):
+        port = 8200 + offset
+        server = subprocess.Popen(shlex.split(SERVERS[mode].format(port=port)),
+                                  env=dict(os.environ, GUNICORN_ACCESS_LOG='/dev/null'))
+        try:
+            if not wait_for_server(f'http://127.0.0.1:{port}', 30):
+                print(f'{mode} server did not start', file=sys.stderr)
+                continue
+            for level in levels:
+                result = asyncio.run(run_level(port, level, args.requests, paths, args.timeout))
+                result['mode'] = mode
+                results.append(result)
+                print(f'  {mode:<6} c={level:<6} {result["throughput_rps"]:>9} req/s  '
+                      f'p50={result["p50_ms"]}ms p95={result["p95_ms"]}ms errors={result["errors"]}',
+                      file=sys.stderr)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    output = json.dumps({'requests_per_connection': args.requests, 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Availability Engine Benchmark
+Time the NumPy engine against the find_free_slots loop for a long range × all services
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_availability_engine --days 90 --step 15
+    python -m benchmarks.bench_availability_engine --database-url sqlite:///salon_scale.db
+
+Without --database-url the calendar and bookings are synthetic (the generator's
+weekly hours and service catalog), so only the computation is timed. With it,
+compute_availability() runs end to end against the database, queries included.
+Every run also checks that both engines return exactly the same slots.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time as timer
+from datetime import date, timedelta
+
+from benchmarks.generate_data import WEEKLY_HOURS, SERVICE_CATALOG
+from benchmarks.run_benchmarks import percentile
+
+
+def synthetic_calendar(start_date, days, services, utilization, seed):
+    """Opening minutes per day and random non-overlapping bookings per service"""
+    from app.services.availability_engine import to_minute
+    rng = random.Random(seed)
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    open_minutes, close_minutes = [], []
+    for day in dates:
+        hours = WEEKLY_HOURS[day.strftime('%A')]
+        open_minutes.append(to_minute(hours[0]) if hours else None)
+        close_minutes.append(to_minute(hours[1]) if hours else None)
+
+    durations, bookings = {}, {}
+    for service_id in range(1, services + 1):
+        duration = SERVICE_CATALOG[(service_id - 1) % len(SERVICE_CATALOG)][2]
+        durations[service_id] = duration
+        booked = []
+        for index, (open_minute, close_minute) in enumerate(zip(open_minutes, close_minutes)):
+            if open_minute is None:
+                continue
+            start = open_minute
+            while start + duration <= close_minute:
+                if rng.random() < utilization:
+                    booked.append((index, start))
+                    start += duration
+                else:
+                    start += 15
+        bookings[service_id] = booked
+    return dates, open_minutes, close_minutes, durations, bookings
+
+
+def time_runs(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = timer.perf_counter()
+        result = func()
+        timings.append((timer.perf_counter() - started) * 1000)
+    return result, {
+        'min_ms': round(min(timings), 2),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'max_ms': round(max(timings), 2)
+    }
+
+
+def bench_synthetic(args):
+    from app.services.availability_engine import free_starts_numpy, free_starts_python
+    dates, open_minutes, close_minutes, durations, bookings = synthetic_calendar(
+        date.today(), args.days, args.services, args.utilization, args.seed)
+
+    def run_python():
+        return {s: free_starts_python(open_minutes, close_minutes, bookings[s], d, args.step, dates)
+                for s, d in durations.items()}
+
+    def run_numpy():
+        return {s: free_starts_numpy(open_minutes, close_minutes, bookings[s], d, args.step)
+                for s, d in durations.items()}
+
+    loop_result, loop_timing = time_runs(run_python, args.repeat)
+    numpy_result, numpy_timing = time_runs(run_numpy, args.repeat)
+    return loop_result == numpy_result, loop_timing, numpy_timing, {
+        'slots': sum(len(day) for per_service in numpy_result.values() for day in per_service),
+        'bookings': sum(len(b) for b in bookings.values())
+    }
+
+
+def bench_database(args):
+    os.environ['DATABASE_URL'] = args.database_url
+    from app import create_app, db
+    from app.models import Service
+    from app.services.availability_engine import compute_availability
+
+    app = create_app()
+    with app.app_context():
+        service_ids = [s for (s,) in db.session.query(Service.id).all()]
+        start_date = date.today()
+
+        def run(use_numpy):
+            def call():
+                result = compute_availability(start_date, args.days, service_ids, args.step, use_numpy=use_numpy)
+                db.session.remove()
+                return result
+            return call
+
+        loop_result, loop_timing = time_runs(run(False), args.repeat)
+        numpy_result, numpy_timing = time_runs(run(True), args.repeat)
+    return loop_result == numpy_result, loop_timing, numpy_timing, {'services': len(service_ids)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the NumPy availability engine with the Python loop')
+    parser.add_argument('--days', type=int, default=90, help='Length of the date range')
+    parser.add_argument('--services', type=int, default=len(SERVICE_CATALOG), help='Synthetic services')
+    parser.add_argument('--step', type=int, default=15, help='Slot granularity in minutes')
+    parser.add_argument('--utilization', type=float, default=0.4, help='Synthetic booking density')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per engine')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', help='Benchmark compute_availability against this database')
+    parser.add_argument('--output', help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    from app.services.availability_engine import NUMPY_AVAILABLE
+    if not NUMPY_AVAILABLE:
+        parser.error('NumPy is not installed (pip install numpy)')
+
+    if args.database_url:
+        identical, loop_timing, numpy_timing, info = bench_database(args)
+    else:
+        identical, loop_timing, numpy_timing, info = bench_synthetic(args)
+
+    result = dict({
+        'mode': 'database' if args.database_url else 'synthetic',
+        'days': args.days,
+        'step_minutes': args.step,
+        'identical': identical,
+        'python_loop': loop_timing,
+        'numpy': numpy_timing,
+        'speedup_p50': round(loop_timing['p50_ms'] / numpy_timing['p50_ms'], 1)
+    }, **info)
+    print(f'  loop p50={loop_timing["p50_ms"]}ms  numpy p50={numpy_timing["p50_ms"]}ms  '
+          f'speedup={result["speedup_p50"]}x  identical={identical}', file=sys.stderr)
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
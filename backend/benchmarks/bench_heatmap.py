@@ -0,0 +1,58 @@
+"""
+Heatmap Benchmark
+Time the utilization heatmaps (weekday × hour and service × month) for a year of data
+
+Usage (from the backend folder):
+    python -m benchmarks.generate_data --database-url sqlite:///salon_scale.db --years 1 --services 20
+    python -m benchmarks.bench_heatmap --database-url sqlite:///salon_scale.db --days 365
+"""
+import argparse
+import json
+import os
+import sys
+import time as timer
+from datetime import date, timedelta
+
+from benchmarks.run_benchmarks import percentile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time utilization_heatmaps() against a database')
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'), help='Database (default: DATABASE_URL)')
+    parser.add_argument('--days', type=int, default=365, help='Length of the date range, ending today')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs')
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error('--database-url or DATABASE_URL is required')
+
+    os.environ['DATABASE_URL'] = args.database_url
+    from app import create_app, db
+    from app.services.heatmap_service import utilization_heatmaps, NUMPY_AVAILABLE
+    if not NUMPY_AVAILABLE:
+        parser.error('NumPy is not installed (pip install numpy)')
+
+    app = create_app()
+    last = date.today()
+    first = last - timedelta(days=args.days - 1)
+    timings = []
+    with app.app_context():
+        for _ in range(args.repeat):
+            started = timer.perf_counter()
+            payload = utilization_heatmaps(first, last)
+            timings.append((timer.perf_counter() - started) * 1000)
+            db.session.remove()
+
+    result = {
+        'days': args.days,
+        'bookings': payload['bookings'],
+        'payload_bytes': len(json.dumps(payload)),
+        'min_ms': round(min(timings), 2),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'max_ms': round(max(timings), 2)
+    }
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Typeahead Search Benchmark
+Time GET /api/appointments/search keystroke by keystroke against a million appointments
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_search --rows 1000000
+    python -m benchmarks.bench_search --database-url sqlite:///search_bench.db --rows 1000000
+    python -m benchmarks.bench_search --database-url sqlite:///search_bench.db --no-seed
+
+Seeds --rows appointments for --customers repeat customers (names drawn from
+a few thousand first/last name pairs, local phone numbers, references like
+APT-YYYYMMDD-XXXXX); completed and cancelled bookings older than
+ARCHIVE_AFTER_DAYS go straight into appointments_archive. Then, for sampled
+customers, it "types" their name, phone number and a reference number one
+character at a time and times every request through the Flask test client.
+The first request (which builds the in-process name index on SQLite) is
+reported on its own. Exits with 1 if the p95 is above --max-p95-ms.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time as timer
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from benchmarks.run_benchmarks import percentile
+
+FIRST_NAMES = [
+    'Abebe', 'Almaz', 'Amanuel', 'Betty', 'Bethlehem', 'Dawit', 'Eden', 'Eyerusalem', 'Fikru', 'Genet',
+    'Hana', 'Helen', 'Kalkidan', 'Kebede', 'Liya', 'Mahlet', 'Meron', 'Michael', 'Mulu', 'Nahom',
+    'Rahel', 'Ruth', 'Samuel', 'Sara', 'Selam', 'Semira', 'Solomon', 'Tigist', 'Tsion', 'Yared',
+    'Yonas', 'Zewditu', 'Aster', 'Biniam', 'Daniel', 'Elsa', 'Feven', 'Girma', 'Hiwot', 'Israel',
+    'Kidist', 'Lulit', 'Martha', 'Nardos', 'Robel', 'Saron', 'Tewodros', 'Wubet', 'Yohannes', 'Zelalem'
+]
+LAST_NAMES = [
+    'Abera', 'Alemu', 'Asfaw', 'Ayele', 'Bekele', 'Belay', 'Demissie', 'Desta', 'Gebre', 'Gebremedhin',
+    'Getachew', 'Girma', 'Haile', 'Hailu', 'Kassa', 'Kebede', 'Lemma', 'Mekonnen', 'Mengistu', 'Negash',
+    'Tadesse', 'Tefera', 'Tesfaye', 'Wolde', 'Worku', 'Yilma', 'Zewde', 'Assefa', 'Berhane', 'Dagne',
+    'Eshetu', 'Fantahun', 'Gashaw', 'Habte', 'Jemal', 'Kifle', 'Legesse', 'Mulugeta', 'Nigussie', 'Shiferaw',
+    'Tilahun', 'Woldemariam', 'Yohannes', 'Zeleke', 'Adane', 'Birhanu', 'Chala', 'Derese', 'Endale', 'Fikre',
+    'Gizaw', 'Hailemariam', 'Kahsay', 'Mamo', 'Regassa', 'Seyoum', 'Tamrat', 'Teshome', 'Wondimu', 'Yimer'
+]
+STATUSES = ['completed', 'completed', 'completed', 'cancelled', 'confirmed', 'pending']
+
+
+def seed(app, rows, customers, batch_size=20000):
+    """Customers first, then appointments linked to them, old finished ones straight into the archive"""
+    from werkzeug.security import generate_password_hash
+    from app import db
+    from app.utils.validators import normalize_phone
+    from app.models import Appointment, AppointmentArchive, Customer, Service, User
+
+    rng = random.Random(42)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        with db.engine.begin() as connection:
+            connection.execute(User.__table__.insert(), [{
+                'name': 'Search Bench', 'email': 'search-bench@example.com', 'role': 'receptionist',
+                'password_hash': generate_password_hash('search-bench'), 'must_change_password': False
+            }])
+            connection.execute(Service.__table__.insert(), [{
+                'name': f'Service {i}', 'category': 'Bench', 'duration_minutes': 30 + 15 * i,
+                'price': Decimal(20 + 5 * i), 'is_active': True
+            } for i in range(8)])
+            service_ids = [row.id for row in connection.execute(Service.__table__.select())]
+
+        created = datetime.utcnow() - timedelta(days=1100)
+        for start in range(0, customers, batch_size):
+            batch = []
+            for n in range(start, min(start + batch_size, customers)):
+                phone = f'09{(n * 7919 + 12345) % 10 ** 8:08d}'  # distinct for every n below 10^8
+                name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+                batch.append({'phone_normalized': normalize_phone(phone), 'phone': phone, 'name': name,
+                              'created_at': created, 'updated_at': created})
+            with db.engine.begin() as connection:
+                connection.execute(Customer.__table__.insert(), batch)
+        with db.engine.connect() as connection:
+            people = connection.execute(
+                Customer.__table__.select().with_only_columns(Customer.id, Customer.name, Customer.phone)
+            ).all()
+
+        today = date.today()
+        first_day = today - timedelta(days=1000)
+        cutoff = today - timedelta(days=app.config['ARCHIVE_AFTER_DAYS'])
+        counters = {}
+        for start in range(0, rows, batch_size):
+            hot, archived = [], []
+            for n in range(start, min(start + batch_size, rows)):
+                person = people[rng.randrange(len(people))]
+                day = first_day + timedelta(days=rng.randrange(1030))
+                status = STATUSES[n % len(STATUSES)] if day < today else 'confirmed'
+                counter = counters.get(day, 0)
+                counters[day] = counter + 1
+                row = {
+                    'id': n + 1,
+                    'customer_name': person.name,
+                    'customer_phone': person.phone,
+                    'customer_id': person.id,
+                    'service_id': service_ids[n % len(service_ids)],
+                    'appointment_date': day,
+                    'appointment_time': time(9 + n % 9, (n % 4) * 15),
+                    'status': status,
+                    'created_by': 'customer',
+                    'created_at': datetime.combine(day, time(8, 0)) - timedelta(days=3),
+                    'reference_number': f'APT-{day:%Y%m%d}-{counter:05X}'
+                }
+                (archived if day < cutoff and status in ('completed', 'cancelled') else hot).append(row)
+            with db.engine.begin() as connection:
+                if hot:
+                    connection.execute(Appointment.__table__.insert(), hot)
+                if archived:
+                    connection.execute(AppointmentArchive.__table__.insert(),
+                                       [dict(row, archived_at=datetime.utcnow()) for row in archived])
+
+
+def keystrokes(text, shortest):
+    """Every prefix of text from `shortest` characters on, as typed"""
+    return [text[:length] for length in range(shortest, len(text) + 1)]
+
+
+def workload(app, samples):
+    """(kind, query) pairs: names, phone numbers and references of sampled customers, typed out"""
+    from sqlalchemy import select, func
+    from app import db
+    from app.models import Appointment, Customer
+
+    rng = random.Random(7)
+    queries = []
+    with app.app_context():
+        people = db.session.execute(
+            select(Customer.name, Customer.phone).order_by(func.random()).limit(samples)
+        ).all()
+        references = db.session.execute(
+            select(Appointment.reference_number).order_by(func.random()).limit(samples)
+        ).scalars().all()
+    for person in people:
+        queries.extend(('name', query) for query in keystrokes(person.name, 2))
+        queries.extend(('phone', query) for query in keystrokes(person.phone, 3))
+    for reference in references:
+        queries.extend(('reference', query) for query in keystrokes(reference.lower(), 3))
+    rng.shuffle(queries)
+    return queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time the typeahead appointment search')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Appointments to seed')
+    parser.add_argument('--customers', type=int, default=200_000, help='Distinct customers to seed')
+    parser.add_argument('--samples', type=int, default=40, help='Customers and references typed out')
+    parser.add_argument('--limit', type=int, default=10, help='Results per request')
+    parser.add_argument('--max-p95-ms', type=float, default=50, help='Fail above this p95')
+    parser.add_argument('--database-url', help='Database to seed (default: temporary SQLite file); it is reset')
+    parser.add_argument('--no-seed', action='store_true', help='Search --database-url as it is')
+    parser.add_argument('--output', help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args(argv)
+    if args.no_seed and not args.database_url:
+        parser.error('--no-seed needs --database-url')
+
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = f'sqlite:///{os.path.join(temp_dir.name, "search.db")}'
+
+    os.environ['DATABASE_URL'] = database_url
+    import jwt
+    from app import create_app
+    from app.models import User
+
+    app = create_app()
+    app.config['COMPRESSION_ENABLED'] = False
+    if not args.no_seed:
+        started = timer.perf_counter()
+        seed(app, args.rows, args.customers)
+        print(f'  seeded {args.rows:,} appointments, {args.customers:,} customers '
+              f'in {timer.perf_counter() - started:.1f}s', file=sys.stderr)
+
+    queries = workload(app, args.samples)
+    with app.app_context():
+        user = User.query.filter(User.role.in_(('admin', 'manager', 'receptionist'))).first()
+        token = jwt.encode({'user_id': user.id, 'exp': datetime.utcnow() + timedelta(hours=1)},
+                           app.config['SECRET_KEY'], algorithm='HS256')
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def timed(query):
+        started = timer.perf_counter()
+        response = client.get('/api/appointments/search', query_string={'q': query, 'limit': args.limit},
+                              headers=headers)
+        elapsed = (timer.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f'search {query!r} returned {response.status_code}')
+        return elapsed, len(response.get_json()['results'])
+
+    first_ms, _ = timed('sa')
+    timings = {'name': [], 'phone': [], 'reference': []}
+    empty = 0
+    for kind, query in queries:
+        elapsed, found = timed(query)
+        timings[kind].append(elapsed)
+        empty += found == 0
+
+    every = [ms for values in timings.values() for ms in values]
+    result = {
+        'database': database_url.split(':', 1)[0],
+        'rows': None if args.no_seed else args.rows,
+        'requests': len(every),
+        'empty_results': empty,
+        'first_request_ms': round(first_ms, 1),
+        'p50_ms': round(percentile(every, 50), 2),
+        'p95_ms': round(percentile(every, 95), 2),
+        'p99_ms': round(percentile(every, 99), 2),
+        'by_kind': {kind: {
+            'requests': len(values),
+            'p50_ms': round(percentile(values, 50), 2),
+            'p95_ms': round(percentile(values, 95), 2)
+        } for kind, values in timings.items()},
+        'max_p95_ms': args.max_p95_ms
+    }
+    result['passed'] = result['p95_ms'] <= args.max_p95_ms
+    print(f'  {len(every):,} searches: p50 {result["p50_ms"]} ms, p95 {result["p95_ms"]} ms '
+          f'(first request {result["first_request_ms"]} ms)', file=sys.stderr)
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if temp_dir:
+        temp_dir.cleanup()
+    return 0 if result['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+Synthetic Salon Data Generator
+Bulk-insert realistic services, users, working hours and years of appointments
+
+Usage (from the backend folder):
+    python -m benchmarks.generate_data --database-url sqlite:///salon_scale.db --reset
+    python -m benchmarks.generate_data --years 5 --services 40 --utilization 0.8 --seed 7
+
+Rows are written with batched core INSERTs (not ORM objects), so millions of
+appointments load in minutes. The same seed and --today always produce the same
+rows (password hash salts aside). Without --reset the rows are added to what is
+there: user accounts that already exist (same email) are skipped and reference
+numbers continue after the existing appointments.
+Appointments respect working hours and never overlap for the same service.
+"""
+import argparse
+import os
+import random
+import sys
+import time as timer
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select, func
+from werkzeug.security import generate_password_hash
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Same defaults as POST /api/working-hours/initialize, with a longer Saturday
+WEEKLY_HOURS = {
+    'Monday': (time(9, 0), time(18, 0)),
+    'Tuesday': (time(9, 0), time(18, 0)),
+    'Wednesday': (time(9, 0), time(18, 0)),
+    'Thursday': (time(9, 0), time(20, 0)),
+    'Friday': (time(9, 0), time(20, 0)),
+    'Saturday': (time(8, 0), time(18, 0)),
+    'Sunday': None
+}
+
+# (name, category, duration_minutes, price)
+SERVICE_CATALOG = [
+    ('Women\'s Haircut', 'Haircuts', 45, Decimal('35.00')),
+    ('Men\'s Haircut', 'Haircuts', 30, Decimal('25.00')),
+    ('Kids Haircut', 'Haircuts', 30, Decimal('18.00')),
+    ('Blow Dry', 'Styling', 30, Decimal('30.00')),
+    ('Updo', 'Styling', 60, Decimal('65.00')),
+    ('Full Color', 'Coloring', 120, Decimal('95.00')),
+    ('Root Touch-up', 'Coloring', 90, Decimal('70.00')),
+    ('Balayage', 'Coloring', 180, Decimal('160.00')),
+    ('Highlights', 'Coloring', 150, Decimal('130.00')),
+    ('Deep Conditioning', 'Treatments', 45, Decimal('40.00')),
+    ('Keratin Treatment', 'Treatments', 180, Decimal('200.00')),
+    ('Box Braids', 'Braiding', 240, Decimal('180.00')),
+    ('Cornrows', 'Braiding', 120, Decimal('80.00')),
+    ('Beard Trim', 'Grooming', 15, Decimal('12.00')),
+    ('Shave', 'Grooming', 30, Decimal('22.00'))
+]
+
+FIRST_NAMES = ['Abebe', 'Almaz', 'Betty', 'Dawit', 'Hana', 'Selam', 'Yonas', 'Meron', 'Sara', 'Daniel',
+               'Liya', 'Samuel', 'Ruth', 'Kebede', 'Tigist', 'Michael', 'Helen', 'Eden', 'Nahom', 'Mahlet']
+LAST_NAMES = ['Tesfaye', 'Bekele', 'Haile', 'Girma', 'Alemu', 'Tadesse', 'Mekonnen', 'Wolde', 'Assefa',
+              'Negash', 'Desta', 'Lemma', 'Kassa', 'Abera', 'Mengistu']
+
+# Status mixes by whether the appointment date has passed
+PAST_STATUSES = (['completed'] * 82) + (['cancelled'] * 15) + (['confirmed'] * 3)
+FUTURE_STATUSES = (['pending'] * 35) + (['confirmed'] * 55) + (['cancelled'] * 10)
+CREATED_BY = (['customer'] * 70) + (['receptionist'] * 25) + (['admin'] * 5)
+
+SLOT_STEP = 15
+
+
+def build_services(count):
+    """Service rows cycling through the catalog (numbered after the first pass)"""
+    rows = []
+    for i in range(count):
+        name, category, duration, price = SERVICE_CATALOG[i % len(SERVICE_CATALOG)]
+        if i >= len(SERVICE_CATALOG):
+            name = f'{name} {i // len(SERVICE_CATALOG) + 1}'
+        rows.append({
+            'name': name,
+            'description': f'{name} ({duration} minutes)',
+            'category': category,
+            'image_url': None,
+            'duration_minutes': duration,
+            'price': price,
+            'is_active': True
+        })
+    return rows
+
+
+def build_users(rng, clients, created_at):
+    """A small staff plus client accounts; one shared hash keeps this fast"""
+    password_hash = generate_password_hash('Password123')
+    rows = []
+    for role, count in (('admin', 1), ('manager', 2), ('receptionist', 4), ('client', clients)):
+        for i in range(count):
+            name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+            rows.append({
+                'name': name,
+                'email': f'{role}{i + 1}@salon.test',
+                'password_hash': password_hash,
+                'role': role,
+                'must_change_password': False,
+                'email_verified': True,
+                'created_at': created_at
+            })
+    return rows
+
+
+def payment_fields(rng, status, price, appointment_dt):
+    """Payment columns consistent with the appointment status"""
+    deposit = (price * Decimal('0.10')).quantize(Decimal('0.01'))
+    fields = {
+        'payment_screenshot_url': None,
+        'payment_amount': None,
+        'payment_verification_status': 'pending',
+        'payment_verified_at': None,
+        'payment_verified_by': None,
+        'payment_verification_notes': None
+    }
+    uploaded = status in ('confirmed', 'completed') or rng.random() < 0.3
+    if not uploaded:
+        return fields
+
+    fields['payment_screenshot_url'] = f'/uploads/payments/generated_{rng.getrandbits(48):012x}.png'
+    fields['payment_amount'] = deposit if rng.random() < 0.8 else (price * Decimal('0.5')).quantize(Decimal('0.01'))
+    if status in ('confirmed', 'completed'):
+        fields['payment_verification_status'] = 'verified'
+        fields['payment_verified_at'] = appointment_dt - timedelta(days=rng.randint(1, 5))
+        fields['payment_verified_by'] = 'ai' if rng.random() < 0.6 else 'manager_2'
+        fields['payment_verification_notes'] = 'Deposit received'
+    elif status == 'cancelled' and rng.random() < 0.3:
+        fields['payment_verification_status'] = 'rejected'
+        fields['payment_verified_at'] = appointment_dt - timedelta(days=rng.randint(1, 5))
+        fields['payment_verified_by'] = 'manager_2'
+        fields['payment_verification_notes'] = 'Amount does not match'
+    return fields
+
+
+def generate_appointments(rng, services, start_date, end_date, utilization, today, reference_offset=0):
+    """
+    Yield appointment rows day by day.
+
+    For each open day and service, bookings are laid out back to back from
+    opening time with random gaps, so they stay inside working hours and never
+    overlap. `utilization` is the chance that each free slot gets booked.
+    Reference counters start at reference_offset (the appointments already in
+    the database), so a run without --reset never repeats an earlier run's references.
+    """
+    reference_counts = {}
+    day = start_date
+    while day <= end_date:
+        hours = WEEKLY_HOURS[DAYS[day.weekday()]]
+        if hours:
+            open_minutes = hours[0].hour * 60 + hours[0].minute
+            close_minutes = hours[1].hour * 60 + hours[1].minute
+            # Weekends and Fridays are busier
+            day_factor = 1.2 if day.weekday() >= 4 else 0.9
+            for service in services:
+                minute = open_minutes
+                while minute + service['duration_minutes'] <= close_minutes:
+                    if rng.random() >= utilization * day_factor:
+                        minute += SLOT_STEP
+                        continue
+
+                    appointment_dt = datetime.combine(day, time(minute // 60, minute % 60))
+                    statuses = PAST_STATUSES if day < today else FUTURE_STATUSES
+                    status = rng.choice(statuses)
+                    created_at = appointment_dt - timedelta(days=rng.randint(0, 21), minutes=rng.randint(0, 600))
+
+                    # Unique per booking day, in the older hex format (never equal to a generated one)
+                    created_day = created_at.strftime('%Y%m%d')
+                    count = reference_counts.get(created_day, reference_offset)
+                    reference_counts[created_day] = count + 1
+                    # 19 characters when appending: never the length of an app-issued reference (18 or 20)
+                    reference_number = f'APT-{created_day}-{count:06X}' if reference_offset else f'APT-{created_day}-{count:04X}'
+
+                    row = {
+                        'customer_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                        'customer_phone': f'09{rng.randint(10000000, 99999999)}',
+                        'customer_email': None,
+                        'service_id': service['id'],
+                        'charged_price': service['price'],
+                        'booked_minutes': service['duration_minutes'],
+                        'appointment_date': day,
+                        'appointment_time': appointment_dt.time(),
+                        'status': status,
+                        'created_by': rng.choice(CREATED_BY),
+                        'created_at': created_at,
+                        'reference_number': reference_number
+                    }
+                    if rng.random() < 0.4:
+                        row['customer_email'] = f'{row["customer_name"].split()[0].lower()}{rng.randint(1, 9999)}@example.com'
+                    row.update(payment_fields(rng, status, service['price'], appointment_dt))
+                    yield row
+
+                    minute += service['duration_minutes']
+                    # Leave a random gap after each booking
+                    minute += SLOT_STEP * rng.choice((0, 0, 0, 1, 2))
+        day += timedelta(days=1)
+
+
+def insert_batches(connection, table, rows, batch_size):
+    """Insert a list of row dicts in batches; returns the row count"""
+    for i in range(0, len(rows), batch_size):
+        connection.execute(table.insert(), rows[i:i + batch_size])
+    return len(rows)
+
+
+def generate(database_url, years=2, future_days=60, services=12, clients=500, utilization=0.55,
+             batch_size=10000, seed=42, reset=False, today=None, quiet=False):
+    """
+    Generate a full synthetic data set into `database_url`.
+
+    Returns:
+        dict: Row counts per table and the elapsed time
+    """
+    os.environ['DATABASE_URL'] = database_url
+    from app import create_app, db
+    from app.models import Appointment, Service, User, WorkingHour
+    from app.services.dashboard_service import recount
+    from app.services.rollup_service import backfill
+    from app.services.archive_service import appointment_rows
+    from app.services import customer_service
+    from app.services.catalog_service import refresh_catalog
+    from app.services.calendar_service import refresh_calendar
+
+    rng = random.Random(seed)
+    today = today or date.today()
+    start_date = today - timedelta(days=int(365 * years))
+    end_date = today + timedelta(days=future_days)
+
+    app = create_app()
+    started = timer.perf_counter()
+    counts = {}
+
+    with app.app_context():
+        if reset:
+            db.drop_all()
+        db.create_all()
+
+        engine = db.engine
+        with engine.begin() as connection:
+            if not connection.execute(WorkingHour.__table__.select().limit(1)).first():
+                counts['working_hours'] = insert_batches(connection, WorkingHour.__table__, [{
+                    'day_of_week': day,
+                    'open_time': (WEEKLY_HOURS[day] or (time(9, 0), time(18, 0)))[0],
+                    'close_time': (WEEKLY_HOURS[day] or (time(9, 0), time(18, 0)))[1],
+                    'is_closed': WEEKLY_HOURS[day] is None
+                } for day in DAYS], batch_size)
+            # Staff and client emails are fixed, so a rerun without --reset adds only the missing accounts
+            users = build_users(rng, clients, datetime.combine(start_date, time(8, 0)))
+            existing = set(connection.execute(select(User.__table__.c.email).where(
+                User.__table__.c.email.in_([user['email'] for user in users])
+            )).scalars())
+            counts['users'] = insert_batches(connection, User.__table__,
+                                             [user for user in users if user['email'] not in existing], batch_size)
+            counts['services'] = insert_batches(connection, Service.__table__, build_services(services), batch_size)
+
+            service_rows = [dict(r._mapping) for r in connection.execute(
+                Service.__table__.select().order_by(Service.__table__.c.id)
+            ).fetchall()[-services:]]
+        # Core INSERTs skip add_service and the hours endpoints, so tell running workers
+        refresh_catalog()
+        refresh_calendar()
+
+        def progress(total):
+            if not quiet:
+                elapsed = timer.perf_counter() - started
+                print(f'\r  appointments: {total:,} ({total / max(elapsed, 1e-9):,.0f} rows/s)',
+                      end='', file=sys.stderr)
+
+        # One transaction per batch keeps memory flat for very large runs
+        table = Appointment.__table__
+        with engine.connect() as connection:
+            existing = connection.execute(select(func.count()).select_from(appointment_rows(('id',)))).scalar()
+        rows = generate_appointments(rng, service_rows, start_date, end_date, utilization, today, existing)
+        total = 0
+        while True:
+            batch = [row for _, row in zip(range(batch_size), rows)]
+            if not batch:
+                break
+            with engine.begin() as connection:
+                connection.execute(table.insert(), batch)
+            total += len(batch)
+            progress(total)
+        counts['appointments'] = total
+        if not quiet:
+            print(file=sys.stderr)
+
+        # Bulk inserts bypass the session hooks (dashboard counts, rollups) and the customer linking
+        with engine.begin() as connection:
+            recount(connection)
+            backfill(connection)
+            customer_service.backfill(connection)
+            customer_service.link_user_appointments(connection)
+
+    counts['elapsed_seconds'] = round(timer.perf_counter() - started, 2)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic salon data for scale testing')
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'),
+                        help='Target database (default: DATABASE_URL)')
+    parser.add_argument('--years', type=float, default=2, help='Years of appointment history')
+    parser.add_argument('--future-days', type=int, default=60, help='Days of future bookings')
+    parser.add_argument('--services', type=int, default=12, help='Number of services')
+    parser.add_argument('--clients', type=int, default=500, help='Number of client accounts')
+    parser.add_argument('--utilization', type=float, default=0.55,
+                        help='Chance each free slot is booked (0-1); drives appointment volume')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Rows per INSERT batch')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed, same data)')
+    parser.add_argument('--today', help='Pin "today" (YYYY-MM-DD) for fully reproducible output')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+    args = parser.parse_args(argv)
+
+    if not args.database_url:
+        parser.error('--database-url or DATABASE_URL is required')
+
+    counts = generate(
+        args.database_url,
+        years=args.years,
+        future_days=args.future_days,
+        services=args.services,
+        clients=args.clients,
+        utilization=args.utilization,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        reset=args.reset,
+        today=datetime.strptime(args.today, '%Y-%m-%d').date() if args.today else None
+    )
+    for name, value in counts.items():
+        print(f'{name}: {value:,}' if isinstance(value, int) else f'{name}: {value}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,392 @@
+"""
+HTTP Load Test
+Replay a realistic traffic mix against a running server and report per-endpoint latency
+
+Usage (from the backend folder, with the API served by a production WSGI server):
+    RATELIMIT_ENABLED=false gunicorn -c gunicorn.conf.py -w 4 -b 127.0.0.1:8000 wsgi:app
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 --users 50 --duration 60 \\
+        --staff-email admin1@salon.test --staff-password Password123
+
+    # Or let the harness start and stop the server itself
+    python -m benchmarks.loadtest --server-cmd "gunicorn -c gunicorn.conf.py -w 4 -b 127.0.0.1:8000 wsgi:app"
+
+The booking endpoint is rate limited per IP, so start the server with
+RATELIMIT_ENABLED=false when measuring bookings from one machine.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time as timer
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+
+from benchmarks.run_benchmarks import percentile
+
+# action name -> default weight
+DEFAULT_MIX = {
+    'services': 30,
+    'slots': 30,
+    'hours': 5,
+    'book': 10,
+    'reference': 15,
+    'dashboard': 10
+}
+
+
+def parse_mix(text):
+    """Parse 'services=40,slots=30,book=10' (or a JSON file path) into weights"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    if os.path.exists(text):
+        with open(text) as f:
+            mix = json.load(f)
+    else:
+        mix = {}
+        for part in text.split(','):
+            name, _, weight = part.partition('=')
+            mix[name.strip()] = float(weight)
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise ValueError(f'Unknown actions in mix: {", ".join(sorted(unknown))}')
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+# Safe to send twice; a POST is only retried if it never left this machine
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class Client:
+    """One keep-alive HTTP connection per simulated user"""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            sent = False
+            try:
+                self.connection.request(method, path, body=payload, headers=headers)
+                sent = True
+                response = self.connection.getresponse()
+                data = response.read()
+                return response.status, data
+            except (http.client.HTTPException, ConnectionError, OSError):
+                self.connection.close()
+                self.connection = None
+                # A sent POST (a booking) may have been committed: repeating it would book twice
+                if attempt or (sent and method not in IDEMPOTENT_METHODS):
+                    raise
+        return None, b''
+
+
+class Stats:
+    """Thread-safe latency and status collection per endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, status, elapsed_ms):
+        with self.lock:
+            self.latencies[endpoint].append(elapsed_ms)
+            self.statuses[endpoint][status] += 1
+
+    def error(self, endpoint):
+        with self.lock:
+            self.errors[endpoint] += 1
+
+    def report(self, duration):
+        endpoints = {}
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies.get(endpoint, [])
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'errors': self.errors.get(endpoint, 0),
+                'throughput_rps': round(len(values) / duration, 2),
+                'status_codes': {str(k): v for k, v in sorted(self.statuses[endpoint].items())},
+                'p50_ms': round(percentile(values, 50), 2) if values else None,
+                'p90_ms': round(percentile(values, 90), 2) if values else None,
+                'p95_ms': round(percentile(values, 95), 2) if values else None,
+                'p99_ms': round(percentile(values, 99), 2) if values else None,
+                'max_ms': round(max(values), 2) if values else None
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        return {
+            'total_requests': total,
+            'total_throughput_rps': round(total / duration, 2),
+            'endpoints': endpoints
+        }
+
+
+class LoadTest:
+    """Simulated users picking actions from the weighted mix until the deadline"""
+
+    def __init__(self, args, mix):
+        self.args = args
+        self.mix = mix
+        self.stats = Stats()
+        self.token = args.token
+        self.services = []
+        self.dates = [date.today() + timedelta(days=i) for i in range(1, args.days + 1)]
+        self.references = []
+        self.bookings = []
+        self.lock = threading.Lock()
+
+    def call(self, client, endpoint, method, path, body=None, headers=None):
+        start = timer.perf_counter()
+        try:
+            status, data = client.request(method, path, body, headers)
+        except Exception:
+            self.stats.error(endpoint)
+            return None, None
+        self.stats.record(endpoint, status, (timer.perf_counter() - start) * 1000)
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+    def auth_headers(self):
+        return {'Authorization': f'Bearer {self.token}'} if self.token else {}
+
+    def setup(self):
+        client = Client(self.args.base_url, self.args.timeout)
+        status, data = client.request('GET', '/api/services/')
+        if status != 200:
+            raise RuntimeError(f'GET /api/services/ returned {status}')
+        self.services = {s['id']: s for s in json.loads(data)}
+        if not self.services:
+            raise RuntimeError('No active services; seed data with benchmarks.generate_data first')
+
+        if not self.token and self.args.staff_email:
+            status, data = client.request('POST', '/api/auth/login', {
+                'email': self.args.staff_email,
+                'password': self.args.staff_password
+            })
+            body = json.loads(data) if data else {}
+            if status != 200 or not body.get('token'):
+                raise RuntimeError(f'Staff login failed ({status}): {body.get("error")}')
+            self.token = body['token']
+
+        if not self.token and 'dashboard' in self.mix:
+            print('No staff credentials; dropping "dashboard" from the mix', file=sys.stderr)
+            del self.mix['dashboard']
+
+    # ---- actions -------------------------------------------------------
+
+    def action_services(self, client, rng):
+        self.call(client, 'GET /api/services/', 'GET', '/api/services/')
+
+    def action_hours(self, client, rng):
+        self.call(client, 'GET /api/working-hours/', 'GET', '/api/working-hours/')
+
+    def action_slots(self, client, rng):
+        service_id = rng.choice(list(self.services))
+        day = rng.choice(self.dates)
+        status, data = self.call(client, 'GET /available-slots', 'GET',
+                                 f'/api/appointments/available-slots?date={day}&service_id={service_id}')
+        return service_id, day, (data or {}).get('available_slots', []) if status == 200 else []
+
+    def action_book(self, client, rng):
+        # Customers look at the free slots first, then pick one
+        service_id, day, slots = self.action_slots(client, rng)
+        if not slots:
+            return
+        slot = rng.choice(slots)
+        n = rng.getrandbits(32)
+        status, data = self.call(client, 'POST /api/appointments/', 'POST', '/api/appointments/', {
+            'customer_name': f'Load Test {n}',
+            'customer_phone': f'09{n % 100000000:08d}',
+            'service_id': service_id,
+            'appointment_date': str(day),
+            'appointment_time': slot
+        })
+        if status == 201 and data:
+            with self.lock:
+                self.bookings.append((service_id, str(day), slot, data['appointment']['id']))
+                self.references.append(data['appointment']['reference_number'])
+
+    def action_reference(self, client, rng):
+        with self.lock:
+            reference = rng.choice(self.references) if self.references else None
+        if reference is None:
+            reference = f'APT-{date.today():%Y%m%d}-{rng.getrandbits(16):04X}'
+        self.call(client, 'GET /reference/<ref>', 'GET', f'/api/appointments/reference/{reference}')
+
+    def action_dashboard(self, client, rng):
+        # What the staff dashboards load on every visit
+        headers = self.auth_headers()
+        self.call(client, 'GET /api/auth/me', 'GET', '/api/auth/me', headers=headers)
+        self.call(client, 'GET /api/appointments/ (today)', 'GET',
+                  f'/api/appointments/?date={date.today()}', headers=headers)
+        self.call(client, 'GET /api/appointments/', 'GET', '/api/appointments/', headers=headers)
+
+    # ---- driver --------------------------------------------------------
+
+    def user_loop(self, index, deadline):
+        rng = random.Random(self.args.seed + index)
+        client = Client(self.args.base_url, self.args.timeout)
+        names = list(self.mix)
+        weights = [self.mix[n] for n in names]
+        while timer.perf_counter() < deadline:
+            action = rng.choices(names, weights)[0]
+            getattr(self, f'action_{action}')(client, rng)
+            if self.args.think_ms:
+                timer.sleep(rng.uniform(0, 2 * self.args.think_ms) / 1000.0)
+
+    def run(self):
+        self.setup()
+        started = timer.perf_counter()
+        deadline = started + self.args.duration
+        threads = []
+        for i in range(self.args.users):
+            thread = threading.Thread(target=self.user_loop, args=(i, deadline), daemon=True)
+            threads.append(thread)
+            thread.start()
+            if self.args.ramp_up:
+                timer.sleep(self.args.ramp_up / self.args.users)
+        for thread in threads:
+            thread.join()
+        return timer.perf_counter() - started
+
+    def find_double_bookings(self):
+        """
+        Look for overlapping active bookings of the same service.
+        Checks the bookings this run created, and with a staff token also
+        every appointment the server holds for the touched dates.
+        """
+        def overlaps(rows):
+            found = []
+            by_key = defaultdict(list)
+            for service_id, day, start, appointment_id in rows:
+                start_dt = datetime.strptime(f'{day} {start[:5]}', '%Y-%m-%d %H:%M')
+                end_dt = start_dt + timedelta(minutes=self.services[service_id]['duration_minutes'])
+                by_key[(service_id, day)].append((start_dt, end_dt, appointment_id))
+            for (service_id, day), intervals in by_key.items():
+                intervals.sort()
+                for (s1, e1, id1), (s2, e2, id2) in zip(intervals, intervals[1:]):
+                    if s2 < e1:
+                        found.append({'service_id': service_id, 'date': day,
+                                      'appointment_ids': [id1, id2]})
+            return found
+
+        result = {'checked_bookings': len(self.bookings), 'run_overlaps': overlaps(self.bookings)}
+
+        if self.token:
+            client = Client(self.args.base_url, self.args.timeout)
+            server_rows = []
+            for service_id, day in sorted({(b[0], b[1]) for b in self.bookings}):
+                status, data = client.request(
+                    'GET', f'/api/appointments/?date={day}&service_id={service_id}',
+                    headers=self.auth_headers()
+                )
+                if status != 200:
+                    continue
+                for a in json.loads(data):
+                    if a['status'] != 'cancelled' and a['service_id'] in self.services:
+                        server_rows.append((a['service_id'], a['appointment_date'],
+                                            a['appointment_time'], a['id']))
+            result['server_overlaps'] = overlaps(server_rows)
+
+        result['double_bookings'] = len(result['run_overlaps']) + len(result.get('server_overlaps', []))
+        return result
+
+
+def wait_for_server(base_url, timeout):
+    client = Client(base_url, 2)
+    deadline = timer.perf_counter() + timeout
+    while timer.perf_counter() < deadline:
+        try:
+            status, _ = client.request('GET', '/api/health')
+            if status == 200:
+                return True
+        except Exception:
+            pass
+        timer.sleep(0.25)
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the salon API with a realistic traffic mix')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to test')
+    parser.add_argument('--mix', help='Weights like "services=40,slots=30,book=10" or a JSON file '
+                                      f'(actions: {", ".join(DEFAULT_MIX)})')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent simulated users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--ramp-up', type=float, default=0, help='Seconds to start all users')
+    parser.add_argument('--think-ms', type=float, default=0, help='Mean pause between actions')
+    parser.add_argument('--days', type=int, default=14, help='Book and query this many days ahead')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--staff-email', default=os.getenv('LOADTEST_STAFF_EMAIL'))
+    parser.add_argument('--staff-password', default=os.getenv('LOADTEST_STAFF_PASSWORD'))
+    parser.add_argument('--token', default=os.getenv('LOADTEST_TOKEN'), help='Staff JWT instead of logging in')
+    parser.add_argument('--server-cmd', help='Start this server command before the run and stop it after')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the JSON report to this file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    server = None
+    if args.server_cmd:
+        env = dict(os.environ, RATELIMIT_ENABLED=os.getenv('RATELIMIT_ENABLED', 'false'))
+        server = subprocess.Popen(shlex.split(args.server_cmd), env=env)
+        if not wait_for_server(args.base_url, 30):
+            server.terminate()
+            print(f'Server did not become healthy at {args.base_url}', file=sys.stderr)
+            return 2
+
+    try:
+        test = LoadTest(args, mix)
+        duration = test.run()
+        report = test.stats.report(duration)
+        report['double_booking_check'] = test.find_double_bookings()
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report['meta'] = {
+        'base_url': args.base_url,
+        'users': args.users,
+        'duration_seconds': round(duration, 2),
+        'mix': mix,
+        'server_cmd': args.server_cmd
+    }
+
+    print(f'\n{"endpoint":<34}{"req":>8}{"rps":>9}{"p50":>9}{"p95":>9}{"p99":>9}  codes', file=sys.stderr)
+    for endpoint, row in report['endpoints'].items():
+        print(f'{endpoint:<34}{row["requests"]:>8}{row["throughput_rps"]:>9}'
+              f'{row["p50_ms"] or 0:>9}{row["p95_ms"] or 0:>9}{row["p99_ms"] or 0:>9}  '
+              f'{row["status_codes"]}', file=sys.stderr)
+    print(f'double bookings: {report["double_booking_check"]["double_bookings"]}', file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 1 if report['double_booking_check']['double_bookings'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Benchmark Seeder
+Fill a throwaway database with services, working hours and appointments
+"""
+import random
+from datetime import date, datetime, time, timedelta
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import Appointment, Service, User, WorkingHour
+from app.services.dashboard_service import recount
+from app.services.rollup_service import backfill
+from app.services import customer_service
+from app.services.catalog_service import refresh_catalog
+from app.services.calendar_service import refresh_calendar
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+OPEN_TIME = time(9, 0)
+CLOSE_TIME = time(18, 0)
+SERVICE_DURATIONS = [30, 45, 60, 90, 120]
+
+STAFF_EMAIL = 'bench-admin@salon.test'
+
+
+def seed_database(services=5, days=14, appointments=500, seed=42, start_date=None):
+    """
+    Drop and recreate all tables, then insert benchmark data.
+    Must be called inside an application context.
+
+    Appointments are spread over `days` days starting tomorrow and never
+    overlap for the same service, so the booking checks see realistic rows.
+
+    Returns:
+        dict: Summary of what was seeded (ids and dates used by the benchmarks)
+    """
+    rng = random.Random(seed)
+    start_date = start_date or (date.today() + timedelta(days=1))
+
+    db.drop_all()
+    db.create_all()
+
+    # Open every day so every seeded date can be booked
+    db.session.execute(WorkingHour.__table__.insert(), [
+        {'day_of_week': day, 'open_time': OPEN_TIME, 'close_time': CLOSE_TIME, 'is_closed': False}
+        for day in DAYS
+    ])
+
+    service_rows = [{
+        'name': f'Bench Service {i + 1}',
+        'description': 'Seeded for benchmarks',
+        'category': 'Benchmark',
+        'duration_minutes': SERVICE_DURATIONS[i % len(SERVICE_DURATIONS)],
+        'price': 20 + 5 * i,
+        'is_active': True
+    } for i in range(services)]
+    db.session.execute(Service.__table__.insert(), service_rows)
+
+    db.session.execute(User.__table__.insert(), [{
+        'name': 'Benchmark Admin',
+        'email': STAFF_EMAIL,
+        'password_hash': generate_password_hash('Benchmark123'),
+        'role': 'admin',
+        'must_change_password': False,
+        'email_verified': True,
+        'created_at': datetime.utcnow()
+    }])
+    db.session.commit()
+    # Core INSERTs skip add_service and the hours endpoints, so tell every worker
+    refresh_catalog()
+    refresh_calendar()
+
+    service_list = Service.query.order_by(Service.id).all()
+
+    # Candidate (service, date, time) starts on a 15 minute grid that never overlap
+    open_minutes = OPEN_TIME.hour * 60 + OPEN_TIME.minute
+    close_minutes = CLOSE_TIME.hour * 60 + CLOSE_TIME.minute
+    candidates = []
+    for day_offset in range(days):
+        day = start_date + timedelta(days=day_offset)
+        for service in service_list:
+            minute = open_minutes
+            while minute + service.duration_minutes <= close_minutes:
+                candidates.append((service.id, day, minute))
+                minute += service.duration_minutes
+
+    rng.shuffle(candidates)
+    chosen = candidates[:appointments]
+
+    statuses = ['pending', 'confirmed', 'confirmed', 'completed', 'cancelled']
+    rows = []
+    for i, (service_id, day, minute) in enumerate(chosen):
+        rows.append({
+            'customer_name': f'Bench Customer {i}',
+            'customer_phone': f'555{i:07d}',
+            'customer_email': None,
+            'service_id': service_id,
+            'appointment_date': day,
+            'appointment_time': time(minute // 60, minute % 60),
+            'status': rng.choice(statuses),
+            'created_by': 'customer',
+            'created_at': datetime.utcnow(),
+            'reference_number': f'BEN-{i:010d}',
+            'payment_verification_status': 'pending'
+        })
+    for i in range(0, len(rows), 1000):
+        db.session.execute(Appointment.__table__.insert(), rows[i:i + 1000])
+    # Bulk inserts bypass the counter and rollup hooks and the customer linking in the routes
+    recount(db.session.connection())
+    backfill(db.session.connection())
+    customer_service.backfill(db.session.connection())
+    customer_service.link_user_appointments(db.session.connection())
+    db.session.commit()
+
+    return {
+        'service_ids': [s.id for s in service_list],
+        'start_date': start_date,
+        'days': days,
+        'appointments': len(rows),
+        'staff_user_id': User.query.filter_by(email=STAFF_EMAIL).first().id
+    }
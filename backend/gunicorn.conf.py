@@ -0,0 +1,58 @@
+"""
+Gunicorn Configuration
+Production server settings, all overridable with environment variables
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+See DEPLOYMENT.md for choosing a worker model.
+"""
+import multiprocessing
+import os
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+
+# gevent must patch the standard library before the app (and its DB driver) is preloaded
+if worker_class == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        # Make psycopg2 cooperative so a DB wait yields to other greenlets
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        pass
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '4' if worker_class == 'gthread' else '1'))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))  # gevent only
+
+# Import create_app once in the master; workers fork with the app already loaded
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() != 'false'
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers now and then so slow leaks cannot build up
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+pidfile = os.getenv('GUNICORN_PIDFILE')
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """
+    Drop database connections inherited from the master.
+    A pooled connection shared by two processes corrupts both sides, so each
+    worker starts with an empty pool (close=False leaves the parent's sockets alone).
+    """
+    from app import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,46 @@
+"""Link appointments to the client account that owns them
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a3b4c5d6e7'
+down_revision = 'e1f2a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('appointments', 'appointments_archive'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+            batch_op.create_index(batch_op.f(f'ix_{table}_user_id'), ['user_id'], unique=False)
+            batch_op.create_foreign_key(f'fk_{table}_user_id_users', 'users', ['user_id'], ['id'])
+
+    # ### end Alembic commands ###
+
+    # Existing bookings belong to the verified client account with the same email
+    for table in ('appointments', 'appointments_archive'):
+        op.get_bind().execute(sa.text(f"""
+            UPDATE {table} SET user_id = (
+                SELECT u.id FROM users u
+                WHERE u.role = 'client' AND u.email_verified = :verified AND u.email = LOWER({table}.customer_email)
+            )
+            WHERE customer_email IS NOT NULL
+        """), {'verified': True})
+
+
+def downgrade():
+    for table in ('appointments_archive', 'appointments'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_user_id_users', type_='foreignkey')
+            batch_op.drop_index(batch_op.f(f'ix_{table}_user_id'))
+            batch_op.drop_column('user_id')
+
+    # ### end Alembic commands ###
@@ -0,0 +1,57 @@
+"""Add appointments_archive (partitioned by month on PostgreSQL)
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0e1f2a3b4c5'
+down_revision = 'c9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Monthly partitions are created by `flask archive run` as rows arrive
+    op.create_table('appointments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('appointment_date', sa.Date(), nullable=False),
+    sa.Column('customer_name', sa.String(length=100), nullable=False),
+    sa.Column('customer_phone', sa.String(length=20), nullable=False),
+    sa.Column('customer_email', sa.String(length=120), nullable=True),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('appointment_time', sa.Time(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('created_by', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('reference_number', sa.String(length=20), nullable=True),
+    sa.Column('payment_screenshot_url', sa.String(length=255), nullable=True),
+    sa.Column('payment_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('payment_verification_status', sa.String(length=20), nullable=True),
+    sa.Column('payment_verified_at', sa.DateTime(), nullable=True),
+    sa.Column('payment_verified_by', sa.String(length=50), nullable=True),
+    sa.Column('payment_verification_notes', sa.Text(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.PrimaryKeyConstraint('id', 'appointment_date'),
+    postgresql_partition_by='RANGE (appointment_date)'
+    )
+    with op.batch_alter_table('appointments_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_appointments_archive_appointment_date'), ['appointment_date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_appointments_archive_reference_number'), ['reference_number'], unique=False)
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    with op.batch_alter_table('appointments_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_appointments_archive_reference_number'))
+        batch_op.drop_index(batch_op.f('ix_appointments_archive_appointment_date'))
+
+    op.drop_table('appointments_archive')
+    # ### end Alembic commands ###
@@ -0,0 +1,48 @@
+"""Store the charged price and booked minutes on appointments
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-20 00:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d6e7f8a9b0'
+down_revision = 'b4c5d6e7f8a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('charged_price', sa.Numeric(precision=10, scale=2), nullable=True))
+        batch_op.add_column(sa.Column('booked_minutes', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('appointments_archive', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('charged_price', sa.Numeric(precision=10, scale=2), nullable=True))
+        batch_op.add_column(sa.Column('booked_minutes', sa.Integer(), nullable=True))
+
+    # ### end Alembic commands ###
+
+    # Existing bookings keep the list price the rollups were last computed with
+    for table in ('appointments', 'appointments_archive'):
+        op.execute(
+            f'UPDATE {table} SET '
+            f'charged_price = (SELECT price FROM services WHERE services.id = {table}.service_id), '
+            f'booked_minutes = (SELECT duration_minutes FROM services WHERE services.id = {table}.service_id)'
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('appointments_archive', schema=None) as batch_op:
+        batch_op.drop_column('booked_minutes')
+        batch_op.drop_column('charged_price')
+
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.drop_column('booked_minutes')
+        batch_op.drop_column('charged_price')
+
+    # ### end Alembic commands ###
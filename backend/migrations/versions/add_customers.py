@@ -0,0 +1,118 @@
+"""Add customers keyed by normalized phone and link appointments to them
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f2a3b4c5d6'
+down_revision = 'd0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def normalize_phone(phone):
+    """Same rule as app.utils.validators.normalize_phone when this migration was written"""
+    cleaned = ''.join(filter(str.isdigit, phone or ''))
+    if len(cleaned) < 10:
+        return None
+    if cleaned.startswith('00'):
+        cleaned = cleaned[2:]
+    return cleaned[:20]
+
+
+def upgrade():
+    op.create_table('customers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('phone_normalized', sa.String(length=20), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('phone_normalized')
+    )
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_customers_email'), ['email'], unique=False)
+
+    for table in ('appointments', 'appointments_archive'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('customer_id', sa.Integer(), nullable=True))
+            batch_op.create_index(batch_op.f(f'ix_{table}_customer_id'), ['customer_id'], unique=False)
+            batch_op.create_foreign_key(f'fk_{table}_customer_id_customers', 'customers', ['customer_id'], ['id'])
+
+    # ### end Alembic commands ###
+
+    # One customer per normalized phone; name and email from the latest booking
+    connection = op.get_bind()
+    customers = {}
+    phones = {}
+    now = datetime.utcnow()
+    selects = []
+    for table in ('appointments', 'appointments_archive'):
+        appointments = sa.table(table, sa.column('customer_name', sa.String), sa.column('customer_phone', sa.String),
+                                sa.column('customer_email', sa.String), sa.column('created_at', sa.DateTime))
+        selects.append(sa.select(appointments.c.customer_name, appointments.c.customer_phone,
+                                 appointments.c.customer_email, appointments.c.created_at))
+    result = connection.execute(sa.union_all(*selects).order_by(sa.text('created_at')))
+    for name, phone, email, created_at in result:
+        normalized = normalize_phone(phone)
+        if not normalized:
+            continue
+        phones[phone] = normalized
+        known = customers.get(normalized)
+        email = email.strip().lower() if email and email.strip() else None
+        customers[normalized] = {
+            'phone_normalized': normalized,
+            'phone': phone,
+            'name': name,
+            'email': email or (known['email'] if known else None),
+            'created_at': known['created_at'] if known else (created_at or now),
+            'updated_at': created_at or now
+        }
+
+    customer_table = sa.table('customers', sa.column('id', sa.Integer), sa.column('phone_normalized', sa.String),
+                              sa.column('phone', sa.String), sa.column('name', sa.String), sa.column('email', sa.String),
+                              sa.column('created_at', sa.DateTime), sa.column('updated_at', sa.DateTime))
+    rows = list(customers.values())
+    for start in range(0, len(rows), BATCH_SIZE):
+        connection.execute(customer_table.insert(), rows[start:start + BATCH_SIZE])
+    ids = dict(connection.execute(sa.select(customer_table.c.phone_normalized, customer_table.c.id)).all())
+
+    # Raw phone -> customer id in a temporary table, then one UPDATE per table
+    connection.execute(sa.text('CREATE TEMPORARY TABLE customer_phone_map '
+                               '(phone VARCHAR(20) PRIMARY KEY, customer_id INTEGER NOT NULL)'))
+    mapping = [{'phone': phone, 'customer_id': ids[normalized]} for phone, normalized in phones.items()]
+    for start in range(0, len(mapping), BATCH_SIZE):
+        connection.execute(sa.text('INSERT INTO customer_phone_map (phone, customer_id) VALUES (:phone, :customer_id)'),
+                           mapping[start:start + BATCH_SIZE])
+    for table in ('appointments', 'appointments_archive'):
+        connection.execute(sa.text(f"""
+            UPDATE {table} SET customer_id = (
+                SELECT m.customer_id FROM customer_phone_map m WHERE m.phone = {table}.customer_phone
+            )
+        """))
+    connection.execute(sa.text('DROP TABLE customer_phone_map'))
+
+
+def downgrade():
+    for table in ('appointments_archive', 'appointments'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_customer_id_customers', type_='foreignkey')
+            batch_op.drop_index(batch_op.f(f'ix_{table}_customer_id'))
+            batch_op.drop_column('customer_id')
+
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_customers_email'))
+
+    op.drop_table('customers')
+    # ### end Alembic commands ###
@@ -0,0 +1,51 @@
+"""Add daily_service_rollups for revenue and utilization analytics
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d0e1f2a3b4'
+down_revision = 'b8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_service_rollups',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('bookings', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('cancelled', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('deposits_verified', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('minutes_booked', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.PrimaryKeyConstraint('date', 'service_id')
+    )
+    # ### end Alembic commands ###
+
+    # Start from the existing appointments (same rules as `flask rollups backfill`)
+    op.execute("""
+        INSERT INTO daily_service_rollups
+            (date, service_id, bookings, completed, cancelled, revenue, deposits_verified, minutes_booked)
+        SELECT a.appointment_date, a.service_id, COUNT(*),
+               SUM(CASE WHEN COALESCE(a.status, 'pending') = 'completed' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN COALESCE(a.status, 'pending') = 'cancelled' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN COALESCE(a.status, 'pending') = 'completed' THEN s.price ELSE 0 END),
+               SUM(CASE WHEN a.payment_verification_status = 'verified' THEN COALESCE(a.payment_amount, 0) ELSE 0 END),
+               SUM(CASE WHEN COALESCE(a.status, 'pending') = 'cancelled' THEN 0 ELSE s.duration_minutes END)
+        FROM appointments a JOIN services s ON s.id = a.service_id
+        GROUP BY a.appointment_date, a.service_id
+    """)
+
+
+def downgrade():
+    op.drop_table('daily_service_rollups')
+    # ### end Alembic commands ###
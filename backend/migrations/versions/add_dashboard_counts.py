@@ -0,0 +1,42 @@
+"""Add appointment_status_counts for the dashboard summary and index appointment_date
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('appointment_status_counts',
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('status')
+    )
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_appointments_appointment_date'), ['appointment_date'], unique=False)
+
+    # ### end Alembic commands ###
+
+    # Start the counters from the existing appointments
+    op.execute(
+        "INSERT INTO appointment_status_counts (status, count) "
+        "SELECT COALESCE(status, 'pending'), COUNT(*) FROM appointments GROUP BY COALESCE(status, 'pending')"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_appointments_appointment_date'))
+
+    op.drop_table('appointment_status_counts')
+    # ### end Alembic commands ###
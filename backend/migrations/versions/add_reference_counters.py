@@ -0,0 +1,30 @@
+"""Add reference_counters table for collision-free reference numbers
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reference_counters',
+    sa.Column('scope', sa.String(length=20), nullable=False),
+    sa.Column('next_value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    op.drop_table('reference_counters')
+    # ### end Alembic commands ###
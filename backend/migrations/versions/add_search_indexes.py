@@ -0,0 +1,45 @@
+"""Add indexes for the typeahead appointment search
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3b4c5d6e7f8'
+down_revision = 'f2a3b4c5d6e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_customers_updated_at'), ['updated_at'], unique=False)
+
+    # ### end Alembic commands ###
+
+    # Trigram and prefix indexes exist on PostgreSQL only (SQLite searches names in process)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE INDEX ix_customers_name_trgm ON customers USING gin (lower(name) gin_trgm_ops)')
+        op.execute('CREATE INDEX ix_customers_phone_normalized_pattern ON customers (phone_normalized varchar_pattern_ops)')
+        op.execute('CREATE INDEX ix_appointments_reference_number_pattern ON appointments (reference_number varchar_pattern_ops)')
+        op.execute('CREATE INDEX ix_appointments_archive_reference_number_pattern '
+                   'ON appointments_archive (reference_number varchar_pattern_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_appointments_archive_reference_number_pattern')
+        op.execute('DROP INDEX IF EXISTS ix_appointments_reference_number_pattern')
+        op.execute('DROP INDEX IF EXISTS ix_customers_phone_normalized_pattern')
+        op.execute('DROP INDEX IF EXISTS ix_customers_name_trgm')
+
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_customers_updated_at'))
+
+    # ### end Alembic commands ###
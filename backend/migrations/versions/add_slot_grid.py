@@ -0,0 +1,41 @@
+"""Add slot_grid and slot_grid_days tables for materialized availability
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('slot_grid',
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('slot_time', sa.Time(), nullable=False),
+    sa.Column('is_free', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.PrimaryKeyConstraint('service_id', 'date', 'slot_time')
+    )
+    op.create_table('slot_grid_days',
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('built_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.PrimaryKeyConstraint('service_id', 'date')
+    )
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    op.drop_table('slot_grid_days')
+    op.drop_table('slot_grid')
+    # ### end Alembic commands ###
@@ -0,0 +1,46 @@
+"""Split appointment_status_counts into buckets per status
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-19 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4c5d6e7f8a9'
+down_revision = 'a3b4c5d6e7f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing totals become bucket 0
+    with op.batch_alter_table('appointment_status_counts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('bucket', sa.SmallInteger(), nullable=False, server_default='0'))
+        if op.get_bind().dialect.name == 'postgresql':
+            batch_op.drop_constraint('appointment_status_counts_pkey', type_='primary')
+        batch_op.create_primary_key('appointment_status_counts_pkey', ['status', 'bucket'])
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    # Fold the buckets back into one row per status
+    totals = op.get_bind().execute(sa.text(
+        'SELECT status, SUM(count) FROM appointment_status_counts GROUP BY status'
+    )).all()
+    op.execute('DELETE FROM appointment_status_counts')
+
+    with op.batch_alter_table('appointment_status_counts', schema=None) as batch_op:
+        batch_op.drop_constraint('appointment_status_counts_pkey', type_='primary')
+        batch_op.create_primary_key('appointment_status_counts_pkey', ['status'])
+        batch_op.drop_column('bucket')
+
+    # ### end Alembic commands ###
+
+    counts = sa.table('appointment_status_counts', sa.column('status', sa.String), sa.column('count', sa.BigInteger))
+    if totals:
+        op.bulk_insert(counts, [{'status': status, 'count': int(count)} for status, count in totals])
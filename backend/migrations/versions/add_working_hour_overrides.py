@@ -0,0 +1,40 @@
+"""Add working_hour_overrides table for holidays and one-off closures
+
+Revision ID: d4e5f6a7b8c9
+Revises: add_email_verification_fields
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = 'add_email_verification_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('working_hour_overrides',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('open_time', sa.Time(), nullable=True),
+    sa.Column('close_time', sa.Time(), nullable=True),
+    sa.Column('is_closed', sa.Boolean(), nullable=False),
+    sa.Column('reason', sa.String(length=200), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('working_hour_overrides', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_working_hour_overrides_date'), ['date'], unique=True)
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    with op.batch_alter_table('working_hour_overrides', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_working_hour_overrides_date'))
+
+    op.drop_table('working_hour_overrides')
+    # ### end Alembic commands ###
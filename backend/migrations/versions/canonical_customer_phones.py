@@ -0,0 +1,70 @@
+"""Re-key customers on the canonical (E.164) phone number and merge duplicates
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-10-20 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6e7f8a9b0c1'
+down_revision = 'c5d6e7f8a9b0'
+branch_labels = None
+depends_on = None
+
+
+def normalize_phone(phone):
+    """Same rule as app.utils.validators.normalize_phone when this migration was written"""
+    cleaned = ''.join(filter(str.isdigit, phone or ''))
+    if cleaned.startswith('00'):
+        cleaned = cleaned[2:]
+    elif cleaned.startswith('0'):
+        if len(cleaned) != 10:
+            return None
+        cleaned = '251' + cleaned[1:]
+    if not 10 <= len(cleaned) <= 15:
+        return None
+    if cleaned.startswith('251') and len(cleaned) != 12:
+        return None
+    return cleaned
+
+
+customers = sa.table('customers', sa.column('id', sa.Integer), sa.column('phone_normalized', sa.String),
+                     sa.column('phone', sa.String), sa.column('email', sa.String),
+                     sa.column('created_at', sa.DateTime), sa.column('updated_at', sa.DateTime))
+
+
+def upgrade():
+    # "0911234567" and "251911234567" were two customers; keep the most recently updated one
+    connection = op.get_bind()
+    groups = {}
+    for row in connection.execute(sa.select(customers).order_by(customers.c.updated_at, customers.c.id)):
+        key = normalize_phone(row.phone) or normalize_phone(row.phone_normalized) or row.phone_normalized
+        groups.setdefault(key, []).append(row)
+
+    for key, rows in groups.items():
+        survivor, merged = rows[-1], rows[:-1]
+        if merged:
+            ids = [row.id for row in merged]
+            for table in ('appointments', 'appointments_archive'):
+                appointments = sa.table(table, sa.column('customer_id', sa.Integer))
+                connection.execute(sa.update(appointments).where(appointments.c.customer_id.in_(ids))
+                                   .values(customer_id=survivor.id))
+            connection.execute(sa.delete(customers).where(customers.c.id.in_(ids)))
+        created = [row.created_at for row in rows if row.created_at]
+        email = survivor.email or next((row.email for row in reversed(merged) if row.email), None)
+        if merged or key != survivor.phone_normalized:
+            connection.execute(sa.update(customers).where(customers.c.id == survivor.id).values(
+                phone_normalized=key, email=email, created_at=min(created) if created else None
+            ))
+
+
+def downgrade():
+    # Local numbers go back to 0 + national number; merged customers stay merged
+    connection = op.get_bind()
+    connection.execute(sa.update(customers).where(
+        customers.c.phone_normalized.like('251_________'), sa.func.length(customers.c.phone_normalized) == 12
+    ).values(phone_normalized=sa.literal('0').concat(sa.func.substr(customers.c.phone_normalized, 4))))
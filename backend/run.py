@@ -1,6 +1,7 @@
 """
 Application Entry Point
 Run this file to start the Flask development server
+(production: gunicorn -c gunicorn.conf.py wsgi:app, see DEPLOYMENT.md)
 """
 from app import create_app
 
@@ -0,0 +1,35 @@
+"""
+Test Fixtures
+Apps on throwaway SQLite files, one per test
+"""
+import pytest
+from app.config import Config
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """
+    Build an app on a fresh SQLite file (and optionally a second one as the read replica)
+
+    Returns:
+        function: make_app(replica=False, **config) -> Flask app with all tables created
+    """
+    from app import create_app, db
+
+    def factory(replica=False, **config):
+        monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "primary.db"}')
+        monkeypatch.setenv('RATELIMIT_ENABLED', 'false')
+        settings = dict(
+            CACHE_STAMP_FOLDER=str(tmp_path / 'stamps'),
+            SINGLE_FLIGHT_FOLDER=str(tmp_path / 'single_flight'),
+            DATABASE_REPLICA_URL=f'sqlite:///{tmp_path / "replica.db"}' if replica else None,
+            **config
+        )
+        app = create_app(type('TestConfig', (Config,), settings))
+        app.config['TESTING'] = True
+        with app.app_context():
+            for engine in db.engines.values():
+                db.metadata.create_all(engine)
+        return app
+
+    return factory
@@ -0,0 +1,47 @@
+"""
+Booking Query Budget
+POST /api/appointments/ reads the booked service from the database once
+"""
+from datetime import date, time, timedelta
+from sqlalchemy import event
+from app import db
+from app.models import Service, WorkingHour
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def test_booking_selects_the_service_once(make_app):
+    app = make_app()
+    with app.app_context():
+        with db.engine.begin() as connection:
+            service_id = connection.execute(Service.__table__.insert().values(
+                name='Haircut', duration_minutes=30, price=20, is_active=True
+            )).inserted_primary_key[0]
+            connection.execute(WorkingHour.__table__.insert(), [
+                {'day_of_week': day, 'open_time': time(9), 'close_time': time(18), 'is_closed': False} for day in DAYS
+            ])
+        engine = db.engine
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    day = date.today() + timedelta(days=1)
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = app.test_client().post('/api/appointments/', json={
+            'customer_name': 'Abebe Kebede',
+            'customer_phone': '0911000000',
+            'service_id': service_id,
+            'appointment_date': str(day),
+            'appointment_time': '10:00'
+        })
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 201, response.get_data(as_text=True)
+    body = response.get_json()['appointment']
+    assert body['service_price'] == 20.0 and body['required_deposit'] == 2.0
+    service_selects = [s for s in statements if s.lstrip().upper().startswith('SELECT') and 'FROM services' in s]
+    assert len(service_selects) <= 1, service_selects
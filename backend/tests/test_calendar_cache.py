@@ -0,0 +1,51 @@
+"""
+Working Hours Calendar
+One compiled calendar per database, replaced after bulk loads
+"""
+from datetime import date, time
+from app import create_app, db
+from app.config import Config
+from app.models import WorkingHour
+from app.services.calendar_service import get_open_interval, refresh_calendar
+
+MONDAY = date(2030, 1, 7)
+
+
+def set_monday(app, open_time, close_time):
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(WorkingHour.__table__.delete())
+            connection.execute(WorkingHour.__table__.insert().values(
+                day_of_week='Monday', open_time=open_time, close_time=close_time, is_closed=False
+            ))
+
+
+def monday(app):
+    with app.app_context():
+        return get_open_interval(MONDAY)
+
+
+def test_apps_on_different_databases_do_not_share_a_calendar(make_app, tmp_path_factory, monkeypatch):
+    first = make_app()
+    set_monday(first, time(9), time(18))
+    assert monday(first) == (time(9), time(18), None)
+
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path_factory.mktemp("other") / "other.db"}')
+    second = create_app(type('OtherConfig', (Config,), {'CACHE_STAMP_FOLDER': first.config['CACHE_STAMP_FOLDER']}))
+    with second.app_context():
+        db.metadata.create_all(db.engine)
+    set_monday(second, time(10), time(16))
+    assert monday(second) == (time(10), time(16), None)
+    assert monday(first) == (time(9), time(18), None)
+
+
+def test_bulk_load_followed_by_refresh_is_seen(make_app):
+    app = make_app()
+    set_monday(app, time(9), time(18))
+    assert monday(app) == (time(9), time(18), None)
+
+    set_monday(app, time(8), time(20))
+    assert monday(app) == (time(9), time(18), None)  # cached until the stamp moves
+    with app.app_context():
+        refresh_calendar()
+    assert monday(app) == (time(8), time(20), None)
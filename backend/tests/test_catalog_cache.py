@@ -0,0 +1,51 @@
+"""
+Service Catalog Snapshot
+One snapshot per database, replaced after bulk loads
+"""
+from app import db
+from app.models import Service
+from app.services.catalog_service import refresh_catalog
+
+
+def add_services(app, *names):
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(Service.__table__.insert(), [
+                {'name': name, 'duration_minutes': 30, 'price': 20, 'is_active': True} for name in names
+            ])
+
+
+def catalog_names(app):
+    return [s['name'] for s in app.test_client().get('/api/services/').get_json()]
+
+
+def test_apps_on_different_databases_do_not_share_a_snapshot(make_app, tmp_path_factory, monkeypatch):
+    first = make_app()
+    add_services(first, 'Haircut')
+    assert catalog_names(first) == ['Haircut']
+
+    # Same process, same (empty) stamp, other database
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path_factory.mktemp("other") / "other.db"}')
+    from app import create_app
+    from app.config import Config
+    second = create_app(type('OtherConfig', (Config,), {'CACHE_STAMP_FOLDER': first.config['CACHE_STAMP_FOLDER']}))
+    with second.app_context():
+        db.metadata.create_all(db.engine)
+    add_services(second, 'Braids')
+    assert catalog_names(second) == ['Braids']
+    assert catalog_names(first) == ['Haircut']
+
+
+def test_bulk_load_followed_by_refresh_changes_the_etag(make_app):
+    app = make_app()
+    add_services(app, 'Haircut')
+    client = app.test_client()
+    etag = client.get('/api/services/').headers['ETag']
+    assert client.get('/api/services/', headers={'If-None-Match': etag}).status_code == 304
+
+    add_services(app, 'Braids')
+    with app.app_context():
+        refresh_catalog()
+    response = client.get('/api/services/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [s['name'] for s in response.get_json()] == ['Haircut', 'Braids']
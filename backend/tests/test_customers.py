@@ -0,0 +1,98 @@
+"""
+Customers
+One customer per canonical phone number, whichever way the number was typed
+"""
+from datetime import date, datetime, time
+import pytest
+from app import db
+from app.models import Appointment, Customer, Service
+from app.services.customer_service import backfill, find_customers, link_customer, upsert_customer
+from app.utils.validators import normalize_phone
+
+
+@pytest.mark.parametrize('phone', [
+    '0911234567', '0911 23 45 67', '+251911234567', '251 91 123 4567', '+251 91-123 4567', '00251911234567'
+])
+def test_every_form_of_an_ethiopian_number_has_one_key(phone):
+    assert normalize_phone(phone) == '251911234567'
+
+
+def test_international_numbers_keep_their_country_code():
+    assert normalize_phone('+44 20 7946 0958') == '442079460958'
+    assert normalize_phone('0044 20 7946 0958') == '442079460958'
+
+
+@pytest.mark.parametrize('phone', [
+    None, '', '0911',
+    '0012345678',  # 8 digits once the 00 prefix is gone
+    '09112345678',  # local number one digit too long
+    '2519112345678',  # Ethiopian number one digit too long
+    '+1234567890123456',  # over 15 digits: rejected, not truncated
+])
+def test_invalid_numbers_are_rejected(phone):
+    assert normalize_phone(phone) is None
+
+
+def add_service():
+    service = Service(name='Haircut', duration_minutes=30, price=20, is_active=True)
+    db.session.add(service)
+    db.session.commit()
+    return service
+
+
+def test_upsert_finds_the_same_customer_for_local_and_international_forms(make_app):
+    app = make_app()
+    with app.app_context():
+        connection = db.session.connection()
+        first = upsert_customer(connection, 'Abebe', '0911234567')
+        second = upsert_customer(connection, 'Abebe Kebede', '+251 91 123 4567', 'abebe@example.com')
+        db.session.commit()
+
+        assert first == second
+        customer = db.session.get(Customer, first)
+        assert (customer.phone_normalized, customer.name, customer.email) == \
+            ('251911234567', 'Abebe Kebede', 'abebe@example.com')
+        assert [c.id for c in find_customers(phone='00251911234567')] == [first]
+        assert upsert_customer(connection, 'Nobody', '0012345678') is None
+
+
+def test_changing_the_phone_relinks_the_appointment(make_app):
+    app = make_app()
+    with app.app_context():
+        service = add_service()
+        appointment = Appointment(customer_name='Abebe', customer_phone='0911234567', service_id=service.id,
+                                  appointment_date=date(2030, 1, 7), appointment_time=time(10), created_by='customer')
+        link_customer(appointment)
+        db.session.add(appointment)
+        db.session.commit()
+        original = appointment.customer_id
+
+        appointment.customer_phone = '+251 91 123 4567'  # same number
+        link_customer(appointment)
+        assert appointment.customer_id == original
+
+        appointment.customer_phone = '0922000000'  # another number
+        link_customer(appointment)
+        db.session.commit()
+        assert appointment.customer_id != original
+        assert db.session.get(Customer, appointment.customer_id).phone_normalized == '251922000000'
+
+
+def test_backfill_links_every_form_to_one_customer(make_app):
+    app = make_app()
+    with app.app_context():
+        service = add_service()
+        with db.engine.begin() as connection:
+            connection.execute(Appointment.__table__.insert(), [{
+                'customer_name': name, 'customer_phone': phone, 'service_id': service.id,
+                'appointment_date': date(2030, 1, 7), 'appointment_time': time(9 + n), 'status': 'pending',
+                'created_by': 'customer', 'created_at': datetime(2029, 12, 1 + n)
+            } for n, (name, phone) in enumerate([
+                ('Abebe', '0911234567'), ('Abebe K.', '+251911234567'), ('Abebe Kebede', '251 91 123 4567')
+            ])])
+        with db.engine.begin() as connection:
+            assert backfill(connection) == (1, 3)
+
+        customer = Customer.query.one()
+        assert (customer.phone_normalized, customer.name) == ('251911234567', 'Abebe Kebede')
+        assert {a.customer_id for a in Appointment.query} == {customer.id}
@@ -0,0 +1,45 @@
+"""
+Dashboard Status Counts
+Writes spread over bucket rows; the summary and recount add them up
+"""
+from datetime import date, time
+from itertools import count
+from app import db
+from app.models import Appointment, AppointmentStatusCount, Service
+from app.services import dashboard_service
+from app.services.dashboard_service import dashboard_summary, recount
+
+DAY = date(2030, 1, 7)
+
+
+def test_writes_spread_over_buckets_and_reads_sum_them(make_app, monkeypatch):
+    buckets = count()
+    monkeypatch.setattr(dashboard_service.random, 'randrange', lambda n: next(buckets) % n)
+    app = make_app()
+    with app.app_context():
+        service = Service(name='Haircut', duration_minutes=30, price=20, is_active=True)
+        db.session.add(service)
+        db.session.commit()
+
+        appointments = []
+        for n in range(6):  # one flush (and bucket) per booking
+            appointment = Appointment(customer_name=f'Customer {n}', customer_phone='0911000000', service_id=service.id,
+                                      appointment_date=DAY, appointment_time=time(9 + n), created_by='customer')
+            db.session.add(appointment)
+            db.session.commit()
+            appointments.append(appointment)
+        appointments[0].status = 'completed'
+        appointments[1].status = 'cancelled'
+        db.session.commit()
+        db.session.delete(appointments[2])
+        db.session.commit()
+
+        rows = AppointmentStatusCount.query.filter_by(status='pending').all()
+        assert len(rows) > 1
+        expected = {'pending': 3, 'confirmed': 0, 'completed': 1, 'cancelled': 1}
+        assert dashboard_summary(DAY)['appointments'] == {'total': 5, 'by_status': expected}
+
+        assert recount(db.session.connection()) == {'pending': 3, 'completed': 1, 'cancelled': 1}
+        db.session.commit()
+        assert AppointmentStatusCount.query.count() == 3
+        assert dashboard_summary(DAY)['appointments']['by_status'] == expected
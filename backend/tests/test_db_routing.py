@@ -0,0 +1,137 @@
+"""
+Read Replica Routing
+Two SQLite files stand in for the primary and the replica; the same appointment
+is stored in both under a different customer name, so every response shows
+which database served it.
+"""
+from datetime import date, datetime, time
+import pytest
+from flask import jsonify
+from app import db
+from app.models import Appointment, Service
+from app.utils import db_routing
+from app.utils.db_routing import read_only, use_primary, REPLICA_BIND, STICKY_COOKIE
+
+REFERENCE = 'APT-20300101-0000'
+
+
+def served_by():
+    return db.session.query(Appointment.customer_name).filter_by(reference_number=REFERENCE).scalar()
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(replica=True, DB_REPLICA_STICKY_SECONDS=10)
+    with app.app_context():
+        for name, engine in (('primary', db.engines[None]), ('replica', db.engines[REPLICA_BIND])):
+            with engine.begin() as connection:
+                service_id = connection.execute(Service.__table__.insert().values(
+                    name='Haircut', duration_minutes=30, price=20, is_active=True
+                )).inserted_primary_key[0]
+                connection.execute(Appointment.__table__.insert().values(
+                    customer_name=name, customer_phone='0911000000', service_id=service_id,
+                    appointment_date=date(2030, 1, 1), appointment_time=time(10), status='pending',
+                    created_by='customer', created_at=datetime(2029, 12, 1), reference_number=REFERENCE
+                ))
+
+    @app.route('/test/read')
+    @read_only
+    def read():
+        return jsonify(served_by=served_by())
+
+    @app.route('/test/read-primary')
+    @read_only
+    def read_primary():
+        with use_primary():
+            primary = served_by()
+        return jsonify(served_by=primary, afterwards=served_by())
+
+    @app.route('/test/write', methods=['POST'])
+    def write():
+        return jsonify(served_by=served_by())
+
+    @app.route('/test/failed-write', methods=['POST'])
+    def failed_write():
+        return jsonify(error='nope'), 400
+
+    return app
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the sticky window"""
+    class Clock:
+        now = 1_000_000.0
+
+        def time(self):
+            return self.now
+
+    fake = Clock()
+    monkeypatch.setattr(db_routing, 'time', fake)
+    return fake
+
+
+def test_read_only_get_uses_replica(app):
+    client = app.test_client()
+    assert client.get('/test/read').get_json() == {'served_by': 'replica'}
+    # A real read-only endpoint
+    assert client.get(f'/api/appointments/reference/{REFERENCE}').get_json()['customer_name'] == 'replica'
+
+
+def test_endpoint_without_read_only_uses_primary(app):
+    assert app.test_client().post('/test/write').get_json() == {'served_by': 'primary'}
+
+
+def test_use_primary_inside_read_only(app):
+    response = app.test_client().get('/test/read-primary').get_json()
+    assert response == {'served_by': 'primary', 'afterwards': 'replica'}
+
+
+def test_writes_use_primary(app):
+    with app.test_request_context('/test/read'):
+        read_only(lambda: None)()
+        appointment = Appointment.query.filter_by(reference_number=REFERENCE).one()
+        assert appointment.customer_name == 'replica'
+        appointment.customer_name = 'changed'
+        db.session.commit()
+
+    with app.app_context():
+        with db.engines[None].connect() as connection:
+            primary = connection.execute(Appointment.__table__.select()).one()
+        with db.engines[REPLICA_BIND].connect() as connection:
+            replica = connection.execute(Appointment.__table__.select()).one()
+    # The flush went to the primary even though the reads came from the replica
+    assert primary.customer_name == 'changed'
+    assert replica.customer_name == 'replica'
+
+
+def test_successful_write_pins_client_to_primary_for_sticky_window(app, clock):
+    client = app.test_client()
+    response = client.post('/test/write')
+    cookie = response.headers['Set-Cookie']
+    assert cookie.startswith(f'{STICKY_COOKIE}=') and 'Max-Age=10' in cookie and 'HttpOnly' in cookie
+
+    clock.now += 9
+    assert client.get('/test/read').get_json() == {'served_by': 'primary'}
+
+    clock.now += 2
+    assert client.get('/test/read').get_json() == {'served_by': 'replica'}
+
+
+def test_failed_write_does_not_pin(app, clock):
+    client = app.test_client()
+    response = client.post('/test/failed-write')
+    assert 'Set-Cookie' not in response.headers
+    assert client.get('/test/read').get_json() == {'served_by': 'replica'}
+
+
+def test_without_replica_everything_uses_primary(make_app):
+    app = make_app(replica=False)
+
+    @app.route('/test/read')
+    @read_only
+    def read():
+        return jsonify(bind=str(db.session.get_bind().url))
+
+    response = app.test_client().get('/test/read')
+    assert response.get_json()['bind'].endswith('primary.db')
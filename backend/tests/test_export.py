@@ -0,0 +1,100 @@
+"""
+Appointment Export
+Streamed batch by batch, filtered in the query, priced as charged
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+import jwt
+import pytest
+from app import db
+from app.models import Appointment, AppointmentArchive, Service, User
+from app.services import export_service
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        haircut = Service(name='Haircut', duration_minutes=30, price=20, is_active=True)
+        braids = Service(name='Braids', duration_minutes=120, price=80, is_active=True)
+        staff = User(name='Reception', email='reception@example.com', password_hash='x', role='receptionist',
+                     must_change_password=False)
+        db.session.add_all([haircut, braids, staff])
+        db.session.commit()
+
+        bookings = [
+            (haircut, date(2030, 1, 7), time(9), 'completed'),
+            (braids, date(2030, 1, 7), time(10), 'cancelled'),
+            (haircut, date(2030, 1, 8), time(9), 'pending'),
+            (haircut, date(2030, 1, 9), time(11), 'completed'),
+            (braids, date(2030, 1, 10), time(9), 'confirmed'),
+        ]
+        for n, (service, day, start, status) in enumerate(bookings):
+            db.session.add(Appointment(customer_name=f'Customer {n}', customer_phone='0911000000', service_id=service.id,
+                                       appointment_date=day, appointment_time=start, status=status,
+                                       created_by='customer', reference_number=f'APT-{day:%Y%m%d}-{n:04X}'))
+        db.session.commit()
+        # An old booking that has been archived
+        db.session.add(AppointmentArchive(id=99, customer_name='Archived', customer_phone='0911000000',
+                                          service_id=haircut.id, appointment_date=date(2029, 6, 3),
+                                          appointment_time=time(9), status='completed', created_by='customer',
+                                          charged_price=15, booked_minutes=30))
+        # Raised after the bookings were made
+        haircut.price = 35
+        db.session.commit()
+        app.token = jwt.encode({'user_id': staff.id, 'exp': datetime.utcnow() + timedelta(hours=1)},
+                               app.config['SECRET_KEY'], algorithm='HS256')
+    return app
+
+
+def export(app, **params):
+    return app.test_client().get('/api/appointments/export', query_string=params,
+                                 headers={'Authorization': f'Bearer {app.token}'}, buffered=False)
+
+
+def ndjson(app, **params):
+    response = export(app, format='ndjson', **params)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_rows_are_streamed_one_batch_per_chunk(app, monkeypatch):
+    monkeypatch.setattr(export_service, 'YIELD_PER', 2)
+    response = export(app, format='ndjson')
+    assert response.is_streamed
+    chunks = [chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in response.response]
+    response.close()
+    assert [chunk.count('\n') for chunk in chunks] == [2, 2, 2]  # 6 rows, never more than YIELD_PER at a time
+
+
+def test_csv_has_the_header_then_every_row(app):
+    response = export(app)
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert tuple(rows[0]) == export_service.FIELDS
+    assert len(rows) == 7
+
+
+def test_filters_and_order(app):
+    everything = ndjson(app)
+    assert [row['customer_name'] for row in everything] == ['Archived'] + [f'Customer {n}' for n in range(5)]
+    assert [row['archived'] for row in everything] == [True] + [False] * 5
+
+    in_range = ndjson(app, **{'from': '2030-01-07', 'to': '2030-01-09'})  # both ends included
+    assert [row['appointment_date'] for row in in_range] == ['2030-01-07', '2030-01-07', '2030-01-08', '2030-01-09']
+
+    completed = ndjson(app, status='completed,cancelled')
+    assert [row['customer_name'] for row in completed] == ['Archived', 'Customer 0', 'Customer 1', 'Customer 3']
+
+    braids = ndjson(app, service_id=everything[2]['service_id'])
+    assert [row['service_name'] for row in braids] == ['Braids', 'Braids']
+
+    assert ndjson(app, status='completed', **{'from': '2030-01-08'})[0]['customer_name'] == 'Customer 3'
+    assert export(app, status='done').status_code == 400
+
+
+def test_prices_are_what_each_booking_was_charged(app):
+    prices = {row['customer_name']: (row['service_price'], row['service_duration']) for row in ndjson(app)}
+    assert prices['Archived'] == (15.0, 30)
+    assert prices['Customer 0'] == (20.0, 30)  # booked before the price went up to 35
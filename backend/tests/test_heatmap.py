@@ -0,0 +1,33 @@
+"""
+Utilization Heatmaps
+Bookings weigh what they were booked for, like the daily rollups
+"""
+from datetime import date, time
+import pytest
+from app import db
+from app.models import Appointment, Service, WorkingHour
+from app.services import heatmap_service
+
+MONDAY = date(2030, 1, 7)
+
+pytestmark = pytest.mark.skipif(not heatmap_service.NUMPY_AVAILABLE, reason='heatmaps need NumPy')
+
+
+def test_duration_change_does_not_reweigh_past_bookings(make_app):
+    app = make_app()
+    with app.app_context():
+        service = Service(name='Haircut', duration_minutes=30, price=20, is_active=True)
+        db.session.add(service)
+        db.session.add(WorkingHour(day_of_week='Monday', open_time=time(9), close_time=time(18), is_closed=False))
+        db.session.commit()
+        db.session.add(Appointment(customer_name='Abebe', customer_phone='0911000000', service_id=service.id,
+                                   appointment_date=MONDAY, appointment_time=time(10), created_by='customer'))
+        db.session.commit()
+
+        service.duration_minutes = 60
+        db.session.commit()
+
+        durations = heatmap_service.load_bookings(MONDAY, MONDAY)[3]
+        assert durations.tolist() == [30]
+        heatmaps = heatmap_service.utilization_heatmaps(MONDAY, MONDAY, as_json=True)
+        assert heatmaps['weekday_hour']['values'][0][10] == 0.5  # 30 of 60 minutes, not the new 60
@@ -0,0 +1,91 @@
+"""
+Idempotency Keys
+Stored responses are replayed to the same user (any anonymous caller), behind the rate limit
+"""
+from datetime import date, datetime, time, timedelta
+import jwt
+import pytest
+from app import db
+from app.models import Service, User, WorkingHour
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def make_booking_app(make_app):
+    app = make_app()
+    with app.app_context():
+        with db.engine.begin() as connection:
+            service_id = connection.execute(Service.__table__.insert().values(
+                name='Haircut', duration_minutes=30, price=20, is_active=True
+            )).inserted_primary_key[0]
+            connection.execute(WorkingHour.__table__.insert(), [
+                {'day_of_week': day, 'open_time': time(9), 'close_time': time(18), 'is_closed': False} for day in DAYS
+            ])
+    app.booking = lambda appointment_time: {
+        'customer_name': 'Abebe Kebede',
+        'customer_phone': '0911000000',
+        'service_id': service_id,
+        'appointment_date': str(date.today() + timedelta(days=1)),
+        'appointment_time': appointment_time
+    }
+    return app
+
+
+@pytest.fixture
+def app(make_app):
+    return make_booking_app(make_app)
+
+
+def book(client, app, ip, appointment_time='10:00', key='booking-1', token=None):
+    headers = {'Idempotency-Key': key}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    return client.post('/api/appointments/', json=app.booking(appointment_time),
+                       headers=headers, environ_base={'REMOTE_ADDR': ip})
+
+
+def client_token(app, email):
+    with app.app_context():
+        user = User(name='Client', email=email, password_hash='x', role='client')
+        db.session.add(user)
+        db.session.commit()
+        payload = {'user_id': user.id, 'exp': datetime.utcnow() + timedelta(hours=1)}
+        return jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
+
+
+def test_retry_from_the_same_client_is_replayed(app):
+    client = app.test_client()
+    first = book(client, app, '203.0.113.1')
+    retry = book(client, app, '203.0.113.1')
+    assert first.status_code == 201
+    assert retry.headers.get('Idempotent-Replayed') == 'true'
+    assert retry.get_json() == first.get_json()
+
+
+def test_anonymous_retry_from_a_new_ip_is_replayed(app):
+    # Switched from WiFi to cellular (or a proxy in front): the key alone identifies the attempt
+    client = app.test_client()
+    first = book(client, app, '203.0.113.1')
+    retry = book(client, app, '198.51.100.7')
+    assert first.status_code == 201
+    assert retry.headers.get('Idempotent-Replayed') == 'true'
+    assert retry.get_json() == first.get_json()
+
+
+def test_logged_in_clients_key_is_not_replayed_to_anyone_else(app):
+    client = app.test_client()
+    first = book(client, app, '203.0.113.1', token=client_token(app, 'first@example.com'))
+    other = book(client, app, '203.0.113.1', appointment_time='11:00', token=client_token(app, 'other@example.com'))
+    anonymous = book(client, app, '203.0.113.1', appointment_time='12:00')
+    assert first.status_code == other.status_code == anonymous.status_code == 201
+    assert 'Idempotent-Replayed' not in other.headers and 'Idempotent-Replayed' not in anonymous.headers
+    assert other.get_json()['appointment']['reference_number'] != first.get_json()['appointment']['reference_number']
+
+
+def test_replays_count_against_the_rate_limit(make_app):
+    app = make_booking_app(make_app)
+    app.config['RATELIMIT_ENABLED'] = True
+    client = app.test_client()
+    statuses = [book(client, app, '198.51.100.41').status_code for _ in range(11)]
+    assert statuses[:10] == [201] * 10
+    assert statuses[10] == 429
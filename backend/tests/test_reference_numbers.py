@@ -0,0 +1,82 @@
+"""
+Reference Numbers
+Unique across threads and databases, with a check character, fresh blocks after a fork
+"""
+import threading
+from datetime import datetime
+from app import db
+from app.models import ReferenceCounter
+from app.services import reference_service
+from app.services.reference_service import ALPHABET, is_valid_reference, next_reference
+
+NOW = datetime(2030, 1, 7, 9)
+
+
+def counter_value(app):
+    with app.app_context():
+        return db.session.query(ReferenceCounter.next_value).filter_by(scope='APT-20300107').scalar()
+
+
+def test_unique_across_threads(make_app):
+    app = make_app(REFERENCE_BLOCK_SIZE=7)
+    results = [None] * 8
+
+    def run(index):
+        with app.app_context():
+            results[index] = [next_reference(NOW) for _ in range(300)]
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    references = [reference for batch in results for reference in batch]
+    assert len(set(references)) == len(references) == 2400
+    assert all(is_valid_reference(reference) and reference.startswith('APT-20300107-') for reference in references)
+    # Every value handed out was reserved in the counter (at most one unused block per thread)
+    assert 2400 <= counter_value(app) < 2400 + 8 * 7
+
+
+def test_check_character_catches_a_mistyped_character(make_app):
+    app = make_app()
+    with app.app_context():
+        reference = next_reference(NOW)
+    assert is_valid_reference(reference) and len(reference) == 18
+    code_start = reference.rindex('-') + 1
+    for position in range(code_start, len(reference)):
+        for char in ALPHABET:
+            if char != reference[position]:
+                assert not is_valid_reference(reference[:position] + char + reference[position + 1:])
+
+
+def test_each_database_reserves_its_own_blocks(make_app, tmp_path_factory, monkeypatch):
+    first = make_app(REFERENCE_BLOCK_SIZE=10)
+    with first.app_context():
+        first_reference = next_reference(NOW)
+
+    # Same process, same day, another database
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path_factory.mktemp("other") / "other.db"}')
+    from app import create_app
+    from app.config import Config
+    second = create_app(type('OtherConfig', (Config,), {'REFERENCE_BLOCK_SIZE': 10}))
+    with second.app_context():
+        db.metadata.create_all(db.engine)
+        second_reference = next_reference(NOW)
+
+    assert counter_value(second) == 10  # reserved there, not taken from the first database's block
+    assert second_reference == first_reference  # both databases start their day at counter 0
+    with first.app_context():
+        next_reference(NOW)
+    assert counter_value(first) == 10  # still inside its own first block
+
+
+def test_forked_process_reserves_a_fresh_block(make_app, monkeypatch):
+    app = make_app(REFERENCE_BLOCK_SIZE=10)
+    with app.app_context():
+        parent = next_reference(NOW)
+        monkeypatch.setattr(reference_service.os, 'getpid', lambda: -1)  # now "in the child"
+        child = next_reference(NOW)
+
+    assert child != parent
+    assert counter_value(app) == 20  # the child did not continue the parent's block
@@ -0,0 +1,68 @@
+"""
+Daily Rollups
+Revenue stays at the price charged when booked; list-price changes apply going forward
+"""
+from datetime import date, time
+from decimal import Decimal
+from app import db
+from app.models import Appointment, DailyServiceRollup, Service
+from app.services.rollup_service import backfill
+
+DAY = date(2030, 1, 7)
+
+
+def book(service, hour, status='pending'):
+    appointment = Appointment(customer_name='Abebe Kebede', customer_phone='0911000000', service_id=service.id,
+                              appointment_date=DAY, appointment_time=time(hour), status=status, created_by='customer')
+    db.session.add(appointment)
+    db.session.commit()
+    return appointment
+
+
+def rollup(service):
+    row = db.session.get(DailyServiceRollup, (DAY, service.id))
+    return row.revenue, row.minutes_booked
+
+
+def test_price_change_applies_to_new_bookings_only(make_app):
+    app = make_app()
+    with app.app_context():
+        service = Service(name='Haircut', duration_minutes=30, price=Decimal('20.00'), is_active=True)
+        db.session.add(service)
+        db.session.commit()
+
+        first = book(service, 9)
+        assert (first.charged_price, first.booked_minutes) == (Decimal('20.00'), 30)
+        first.status = 'completed'
+        db.session.commit()
+        assert rollup(service) == (Decimal('20.00'), 30)
+
+        service.price = Decimal('35.00')
+        service.duration_minutes = 45
+        db.session.commit()
+        assert rollup(service) == (Decimal('20.00'), 30)
+
+        book(service, 11, status='completed')
+        assert rollup(service) == (Decimal('55.00'), 75)
+
+        # A full recompute agrees with the incremental rollups
+        backfill(db.session.connection())
+        db.session.commit()
+        db.session.expire_all()
+        assert rollup(service) == (Decimal('55.00'), 75)
+
+
+def test_moving_to_another_service_charges_its_price(make_app):
+    app = make_app()
+    with app.app_context():
+        haircut = Service(name='Haircut', duration_minutes=30, price=Decimal('20.00'), is_active=True)
+        braids = Service(name='Braids', duration_minutes=120, price=Decimal('80.00'), is_active=True)
+        db.session.add_all([haircut, braids])
+        db.session.commit()
+
+        appointment = book(haircut, 9, status='completed')
+        appointment.service_id = braids.id
+        db.session.commit()
+        assert (appointment.charged_price, appointment.booked_minutes) == (Decimal('80.00'), 120)
+        assert rollup(haircut) == (Decimal('0.00'), 0)
+        assert rollup(braids) == (Decimal('80.00'), 120)
@@ -0,0 +1,140 @@
+"""
+Typeahead Search
+Exact matches before prefixes before names, archived bookings included, names kept current
+"""
+from datetime import date, time
+import pytest
+from app import db
+from app.models import Appointment, AppointmentArchive, Service
+from app.services import search_service
+from app.services.customer_service import upsert_customer
+from app.services.search_service import NameIndex, phone_prefixes, search_appointments
+
+TODAY = date(2030, 1, 7)
+
+
+def test_name_index_finds_partial_names_best_first():
+    index = NameIndex('')
+    for customer_id, name in [(1, 'Sara Tesfaye'), (2, 'Sarah Bekele'), (3, 'Abebe Kebede'), (4, 'Sara Tesfaye')]:
+        index.add(customer_id, name)
+
+    matches = index.search('sara', 10)
+    assert [customer_id for customer_id, _ in matches] == [4, 1, 2]  # newest first on a tie
+    assert matches[0][1] == 1.0 and matches[2][1] < 1.0
+    assert [customer_id for customer_id, _ in index.search('sar', 10)] == [4, 2, 1]
+    assert index.search('sara', 1) == [(4, 1.0)]
+    assert index.search('xyz', 10) == []
+
+
+def test_name_index_drops_the_old_name_on_rename():
+    index = NameIndex('')
+    index.add(5, 'Sara Tesfaye')
+    index.add(2, 'Abebe Kebede')
+    index.add(5, 'Abebe Kebede')  # an older customer renamed onto an indexed name
+
+    assert index.search('sara', 10) == []
+    assert [customer_id for customer_id, _ in index.search('abebe', 10)] == [5, 2]
+    assert index.customers[index.name_of[5]].tolist() == [2, 5]
+
+
+@pytest.mark.parametrize('typed, prefixes', [
+    ('0911', ['251911']),
+    ('00251911', ['251911']),
+    ('251911', ['251911']),
+    ('911', ['911', '251911']),
+    ('4420794609', ['4420794609']),
+])
+def test_typed_digits_map_to_canonical_phone_prefixes(typed, prefixes):
+    assert phone_prefixes(typed) == prefixes
+
+
+@pytest.fixture
+def app(make_app, monkeypatch):
+    monkeypatch.setattr(search_service, 'REFRESH_INTERVAL', 0)  # top up the name index on every search
+    app = make_app()
+    with app.app_context():
+        service = Service(name='Haircut', duration_minutes=30, price=20, is_active=True)
+        db.session.add(service)
+        db.session.commit()
+        app.service_id = service.id
+    return app
+
+
+def book(app, name, phone, day, hour, reference, archived_id=None):
+    connection = db.session.connection()
+    customer_id = upsert_customer(connection, name, phone)
+    fields = dict(customer_name=name, customer_phone=phone, customer_id=customer_id, service_id=app.service_id,
+                  appointment_date=day, appointment_time=time(hour), status='pending', created_by='customer',
+                  reference_number=reference)
+    if archived_id:
+        db.session.add(AppointmentArchive(id=archived_id, charged_price=20, booked_minutes=30, **fields))
+    else:
+        db.session.add(Appointment(**fields))
+    db.session.commit()
+    return customer_id
+
+
+def search(query, limit=10):
+    return [(row['reference_number'], row['match'], row['score']) for row in
+            search_appointments(query, limit, today=TODAY)]
+
+
+def test_exact_matches_rank_before_prefixes(app):
+    with app.app_context():
+        book(app, 'Sara Tesfaye', '0911000000', date(2030, 1, 8), 9, 'APT-20300108-0001')
+        book(app, 'Sarah Bekele', '0911000001', date(2030, 1, 8), 10, 'APT-20300108-00012')
+        book(app, 'John Smith', '+44 20 7946 0958', date(2030, 1, 9), 9, 'APT-20300109-0001')
+        book(app, 'Jane Smith', '+44 20 7946 09581', date(2030, 1, 9), 10, 'APT-20300109-0002')
+
+        assert search('apt-20300108-0001') == [
+            ('APT-20300108-0001', 'reference', 1.0), ('APT-20300108-00012', 'reference', 0.9)
+        ]
+        assert search('+44 20 7946 0958') == [
+            ('APT-20300109-0001', 'phone', 0.95), ('APT-20300109-0002', 'phone', 0.85)
+        ]
+        assert search('0911 000 000') == [('APT-20300108-0001', 'phone', 0.95)]
+        # Every way of typing the start of the number finds the canonical 2519… phones
+        for typed in ('0911', '+251 911', '00251911', '911 00'):
+            assert [match for _, match, _ in search(typed)] == ['phone', 'phone'], typed
+
+
+def test_names_rank_after_phone_and_reference_matches(app):
+    with app.app_context():
+        book(app, 'Sara Tesfaye', '0911000000', date(2030, 1, 8), 9, 'APT-20300108-0001')
+        book(app, 'Sarah Bekele', '0911000001', date(2030, 1, 9), 9, 'APT-20300109-0001')
+
+        results = search('sara')
+        assert [(reference, match) for reference, match, _ in results] == [
+            ('APT-20300108-0001', 'name'), ('APT-20300109-0001', 'name')
+        ]
+        assert results[0][2] == search_service.NAME_WEIGHT > results[1][2]
+        assert results[0][2] < search_service.PHONE_PREFIX < search_service.PHONE_EXACT
+
+
+def test_customer_matches_bring_archived_bookings(app):
+    with app.app_context():
+        book(app, 'Abebe Kebede', '0922000000', date(2029, 6, 3), 9, 'APT-20290603-0001', archived_id=99)
+        book(app, 'Abebe Kebede', '0922000000', date(2030, 1, 5), 9, 'APT-20300105-0001')
+        book(app, 'Abebe Kebede', '0922000000', date(2030, 1, 9), 9, 'APT-20300109-0001')
+
+        for query in ('abebe', '0922000000'):
+            rows = search_appointments(query, today=TODAY)
+            # Upcoming first, then the latest past ones
+            assert [row['reference_number'] for row in rows] == \
+                ['APT-20300109-0001', 'APT-20300105-0001', 'APT-20290603-0001']
+            assert [row['archived'] for row in rows] == [False, False, True]
+        assert search_appointments('APT-20290603', today=TODAY)[0]['archived'] is True
+
+
+def test_renamed_and_new_customers_are_found_after_a_top_up(app):
+    with app.app_context():
+        book(app, 'Sara Tesfaye', '0911000000', date(2030, 1, 8), 9, 'APT-20300108-0001')
+        assert [match for _, match, _ in search('sara')] == ['name']
+
+        # Same phone, new name: the booking upserts the customer under it
+        book(app, 'Tigist Alemu', '+251 911 000 000', date(2030, 1, 9), 9, 'APT-20300109-0001')
+        assert search('sara') == []
+        assert {reference for reference, _, _ in search('tigist')} == {'APT-20300108-0001', 'APT-20300109-0001'}
+
+        book(app, 'Hana Girma', '0933000000', date(2030, 1, 10), 9, 'APT-20300110-0001')
+        assert [reference for reference, _, _ in search('hana')] == ['APT-20300110-0001']
@@ -0,0 +1,51 @@
+"""
+Single-Flight Coalescing
+Slot lookups coalesce per database, through a bounded set of lock files
+"""
+import json
+import os
+import time
+from datetime import date
+import pytest
+from app.services import appointment_service
+from app.utils import single_flight
+from app.utils.db_routing import read_only, use_primary
+
+needs_fcntl = pytest.mark.skipif(single_flight.fcntl is None, reason='lock files need fcntl')
+
+
+def test_replica_and_primary_reads_use_different_keys(make_app, monkeypatch):
+    app = make_app(replica=True)
+    keys = []
+    monkeypatch.setattr(appointment_service, 'coalesce', lambda key, fn: keys.append(key) or [])
+
+    with app.test_request_context('/'):
+        read_only(lambda: None)()
+        appointment_service.get_available_time_slots(date(2030, 1, 7), 1)
+        with use_primary():
+            appointment_service.get_available_time_slots(date(2030, 1, 7), 1)
+
+    replica_key, primary_key = keys
+    assert replica_key != primary_key
+    assert 'replica.db' in replica_key and 'primary.db' in primary_key
+
+
+@needs_fcntl
+def test_lock_files_are_a_fixed_pool(tmp_path):
+    folder = str(tmp_path)
+    for n in range(50):
+        assert single_flight.shared_do(f'slots:{n}', lambda: n, folder, 1, 4) == (n, False)
+    assert len(os.listdir(folder)) <= 4
+
+
+@needs_fcntl
+def test_waiter_only_reuses_a_result_for_its_own_key(tmp_path):
+    folder = str(tmp_path)
+    with open(single_flight._lock_path(folder, 'slots:a', 1), 'w') as f:
+        # A computation for another key on the same lock file finished while we waited
+        f.write(json.dumps({'key': 'slots:b', 'finished_at': time.time() + 60, 'result': 'b'}))
+    assert single_flight.shared_do('slots:a', lambda: 'a', folder, 1, 1) == ('a', False)
+
+    with open(single_flight._lock_path(folder, 'slots:a', 1), 'w') as f:
+        f.write(json.dumps({'key': 'slots:a', 'finished_at': time.time() + 60, 'result': 'shared'}))
+    assert single_flight.shared_do('slots:a', lambda: 'a', folder, 1, 1) == ('shared', True)
@@ -0,0 +1,9 @@
+"""
+Production WSGI Entry Point
+Served by gunicorn with the settings in gunicorn.conf.py:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from app import create_app
+
+app = create_app()
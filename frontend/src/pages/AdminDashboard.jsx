@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react'
 import { useNavigate } from 'react-router-dom'
-import { authAPI, appointmentsAPI, servicesAPI, usersAPI } from '../services/api'
+import { authAPI, appointmentsAPI } from '../services/api'
 import { getUser } from '../utils/auth'
 import NavigationBar from '../components/NavigationBar'
 import { API_URL } from '../utils/constants'
@@ -24,7 +24,7 @@ function AdminDashboard() {
       client: 0,
     },
   })
-  const [upcomingAppointments, setUpcomingAppointments] = useState([])
+  const [upcomingCount, setUpcomingCount] = useState(0)
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
@@ -44,52 +44,22 @@ function AdminDashboard() {
       const userData = await authAPI.getCurrentUser()
       setUser(userData)
 
-      // Get all stats
-      const [appointments, servicesData, users] = await Promise.all([
-        appointmentsAPI.getAll(),
-        servicesAPI.getAll(),
-        usersAPI.getAll(),
-      ])
-
+      // Get all stats (counts only, computed by the server)
       const today = new Date().toISOString().split('T')[0]
-      const todayApps = appointments.filter((apt) => apt.appointment_date === today)
-      const pendingApps = appointments.filter((apt) => apt.status === 'pending')
-      const confirmedApps = appointments.filter((apt) => apt.status === 'confirmed')
-      const completedApps = appointments.filter((apt) => apt.status === 'completed')
-      const cancelledApps = appointments.filter((apt) => apt.status === 'cancelled')
-
-      // User breakdown by role
-      const userBreakdown = {
-        admin: users.filter((u) => u.role === 'admin').length,
-        manager: users.filter((u) => u.role === 'manager').length,
-        receptionist: users.filter((u) => u.role === 'receptionist').length,
-        client: users.filter((u) => u.role === 'client').length,
-      }
-
-      // Get upcoming appointments count (next 7 days)
-      const todayDate = new Date()
-      todayDate.setHours(0, 0, 0, 0)
-      const nextWeek = new Date(todayDate)
-      nextWeek.setDate(nextWeek.getDate() + 7)
-
-      const upcoming = appointments
-        .filter((apt) => {
-          const aptDate = new Date(apt.appointment_date)
-          return aptDate >= todayDate && aptDate <= nextWeek && apt.status !== 'cancelled'
-        })
+      const summary = await appointmentsAPI.getSummary(today)
 
-      setUpcomingAppointments(upcoming)
+      setUpcomingCount(summary.upcoming.total)
 
       setStats({
-        appointments: appointments.length,
-        services: servicesData.length,
-        users: users.length,
-        todayAppointments: todayApps.length,
-        pendingAppointments: pendingApps.length,
-        confirmedAppointments: confirmedApps.length,
-        completedAppointments: completedApps.length,
-        cancelledAppointments: cancelledApps.length,
-        userBreakdown,
+        appointments: summary.appointments.total,
+        services: summary.services,
+        users: summary.users.total,
+        todayAppointments: summary.today.total,
+        pendingAppointments: summary.appointments.by_status.pending,
+        confirmedAppointments: summary.appointments.by_status.confirmed,
+        completedAppointments: summary.appointments.by_status.completed,
+        cancelledAppointments: summary.appointments.by_status.cancelled,
+        userBreakdown: summary.users.by_role,
       })
     } catch (error) {
       console.error('Error loading dashboard:', error)
@@ -285,7 +255,7 @@ function AdminDashboard() {
                 <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M12 8v4l3 3m6-3a9 9 0 11-18 0 9 9 0 0118 0z" />
               </svg>
             </div>
-            <p className="text-2xl md:text-3xl font-bold text-blue-600 mb-2">{upcomingAppointments.length}</p>
+            <p className="text-2xl md:text-3xl font-bold text-blue-600 mb-2">{upcomingCount}</p>
             <p className="text-xs md:text-sm text-gray-500">Next 7 days →</p>
           </div>
 
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { appointmentsAPI, servicesAPI } from '../services/api'
-import { getErrorMessage, formatDate, getToday, isValidPhone, isValidEmail } from '../utils/helpers'
+import { getErrorMessage, formatDate, getToday, isValidPhone, isValidEmail, newIdempotencyKey } from '../utils/helpers'
 import BackButton from '../components/BackButton'
 import ErrorMessage from '../components/ErrorMessage'
 import SuccessMessage from '../components/SuccessMessage'
@@ -21,6 +21,9 @@ function NewAppointment() {
   const [selectedService, setSelectedService] = useState(null)
   const [paymentFile, setPaymentFile] = useState(null)
   const [paymentPreview, setPaymentPreview] = useState(null)
+  // Kept across retries after a network failure; replaced once the server has answered
+  const [bookingKey, setBookingKey] = useState(newIdempotencyKey)
+  const [paymentKey, setPaymentKey] = useState(newIdempotencyKey)
   const [formData, setFormData] = useState({
     customer_name: '',
     customer_phone: '',
@@ -159,12 +162,16 @@ function NewAppointment() {
         appointment_date: formData.appointment_date,
         appointment_time: formData.appointment_time,
         created_by: 'customer',
-      })
+      }, bookingKey)
 
       setCreatedAppointment(response.appointment)
       setStep(2) // Move to payment step
       setSuccess('Appointment created! Please upload payment screenshot to confirm.')
     } catch (err) {
+      // The server answered, so a resubmit is a new request (409: first attempt still running, keep the key)
+      if (err.response && err.response.status !== 409) {
+        setBookingKey(newIdempotencyKey())
+      }
       setError(getErrorMessage(err))
     } finally {
       setLoading(false)
@@ -188,7 +195,7 @@ function NewAppointment() {
 
     try {
       setLoading(true)
-      await appointmentsAPI.uploadPayment(createdAppointment.id, paymentFile, formData.payment_amount)
+      await appointmentsAPI.uploadPayment(createdAppointment.id, paymentFile, formData.payment_amount, paymentKey)
       
       setSuccess('Payment screenshot uploaded successfully! Your appointment is pending verification. You will receive a confirmation once verified.')
       
@@ -198,6 +205,9 @@ function NewAppointment() {
         navigate('/')
       }, 2000)
     } catch (err) {
+      if (err.response && err.response.status !== 409) {
+        setPaymentKey(newIdempotencyKey())
+      }
       setError(getErrorMessage(err))
     } finally {
       setLoading(false)
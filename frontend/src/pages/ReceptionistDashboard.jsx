@@ -14,6 +14,7 @@ function ReceptionistDashboard() {
     completedAppointments: 0,
   })
   const [upcomingAppointments, setUpcomingAppointments] = useState([])
+  const [upcomingCount, setUpcomingCount] = useState(0)
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
@@ -33,35 +34,18 @@ function ReceptionistDashboard() {
       const userData = await authAPI.getCurrentUser()
       setUser(userData)
 
-      // Get today's appointments
+      // Get today's counts and the next appointments (computed by the server)
       const today = new Date().toISOString().split('T')[0]
-      const appointments = await appointmentsAPI.getAll({ date: today })
-      
-      const pendingApps = appointments.filter((apt) => apt.status === 'pending')
-      const confirmedApps = appointments.filter((apt) => apt.status === 'confirmed')
-      const completedApps = appointments.filter((apt) => apt.status === 'completed')
-
-      // Get upcoming appointments (next 7 days)
-      const todayDate = new Date()
-      todayDate.setHours(0, 0, 0, 0)
-      const nextWeek = new Date(todayDate)
-      nextWeek.setDate(nextWeek.getDate() + 7)
-
-      const allAppointments = await appointmentsAPI.getAll()
-      const upcoming = allAppointments
-        .filter((apt) => {
-          const aptDate = new Date(apt.appointment_date)
-          return aptDate >= todayDate && aptDate <= nextWeek && apt.status !== 'cancelled'
-        })
-        .slice(0, 7) // Show next 7 appointments
+      const summary = await appointmentsAPI.getSummary(today)
 
-      setUpcomingAppointments(upcoming)
+      setUpcomingAppointments(summary.upcoming.preview)
+      setUpcomingCount(summary.upcoming.total)
 
       setStats({
-        todayAppointments: appointments.length,
-        pendingAppointments: pendingApps.length,
-        confirmedAppointments: confirmedApps.length,
-        completedAppointments: completedApps.length,
+        todayAppointments: summary.today.total,
+        pendingAppointments: summary.today.by_status.pending,
+        confirmedAppointments: summary.today.by_status.confirmed,
+        completedAppointments: summary.today.by_status.completed,
       })
     } catch (error) {
       console.error('Error loading dashboard:', error)
@@ -208,7 +192,7 @@ function ReceptionistDashboard() {
                 <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M4 6h16M4 10h16M4 14h16M4 18h16" />
               </svg>
             </div>
-            <p className="text-2xl md:text-3xl font-bold text-purple-600 mb-2">{upcomingAppointments.length}+</p>
+            <p className="text-2xl md:text-3xl font-bold text-purple-600 mb-2">{upcomingCount}</p>
             <p className="text-xs md:text-sm text-gray-500">Manage all appointments →</p>
           </div>
         </div>
@@ -6,6 +6,8 @@ const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000'
 // Create axios instance
 const api = axios.create({
   baseURL: API_URL,
+  // Send cookies so reads stick to the primary database right after a write
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
@@ -221,6 +223,14 @@ export const appointmentsAPI = {
     return response.data
   },
 
+  // Get dashboard counts (staff only; includes user counts for admins)
+  getSummary: async (date) => {
+    const response = await api.get('/api/appointments/summary', {
+      params: date ? { date } : {},
+    })
+    return response.data
+  },
+
   // Get single appointment
   getById: async (id) => {
     const response = await api.get(`/api/appointments/${id}`)
@@ -228,8 +238,11 @@ export const appointmentsAPI = {
   },
 
   // Create appointment (public - no auth required)
-  create: async (appointmentData) => {
-    const response = await api.post('/api/appointments/', appointmentData)
+  // Reuse the same idempotencyKey when retrying so the booking is only made once
+  create: async (appointmentData, idempotencyKey) => {
+    const response = await api.post('/api/appointments/', appointmentData, {
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
+    })
     return response.data
   },
 
@@ -266,7 +279,7 @@ export const appointmentsAPI = {
   },
 
   // Upload payment screenshot (public - no auth required)
-  uploadPayment: async (appointmentId, paymentFile, paymentAmount) => {
+  uploadPayment: async (appointmentId, paymentFile, paymentAmount, idempotencyKey) => {
     const formData = new FormData()
     formData.append('payment_screenshot', paymentFile)
     if (paymentAmount) {
@@ -275,6 +288,7 @@ export const appointmentsAPI = {
     const response = await api.post(`/api/appointments/${appointmentId}/upload-payment`, formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
+        ...(idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}),
       },
     })
     return response.data
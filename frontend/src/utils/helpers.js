@@ -10,6 +10,14 @@ export const formatDate = (date) => {
   return `${year}-${month}-${day}`
 }
 
+// Unique Idempotency-Key so a retried request is not applied twice
+export const newIdempotencyKey = () => {
+  if (window.crypto?.randomUUID) {
+    return window.crypto.randomUUID()
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`
+}
+
 // Format time to HH:MM
 export const formatTime = (time) => {
   if (!time) return ''
@@ -8,5 +8,7 @@ from app import create_app
 
 app = create_app()
 
+# Development server only - see backend/DEPLOYMENT.md for production
+
 if __name__ == "__main__":
     app.run(debug=True)